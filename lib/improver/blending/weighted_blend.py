@@ -220,16 +220,10 @@ class PercentileBlendingAggregator(object):
                        np.prod(shape, dtype=int)]
         # Flatten the data that is not percentile or coord data
         data = data.reshape(input_shape)
-        # Create the resulting data array, which is the shape of the original
-        # data without dimension we are collapsing over
-        result = np.zeros(input_shape[1:])
-        # Loop over the flattened data, i.e. across all the data points in
-        # each slice of the coordinate we are collapsing over, finding the
-        # blended percentile values at each point.
-        for i in range(data.shape[-1]):
-            result[:, i] = (
-                PercentileBlendingAggregator.blend_percentiles(
-                    data[:, :, i], arr_percent, arr_weights))
+        # Find the blended percentile values at all the data points in each
+        # slice of the coordinate we are collapsing over at once.
+        result = PercentileBlendingAggregator.blend_percentiles(
+            data, arr_percent, arr_weights)
         # Reshape the data and put the percentile dimension
         # back in the right place
         shape = arr_percent.shape + shape
@@ -253,12 +247,16 @@ class PercentileBlendingAggregator(object):
     @staticmethod
     def blend_percentiles(perc_values, percentiles, weights):
         """ Blend percentiles function, to calculate the weighted blend across
-            a given axis of percentile data for a single grid point.
+            a given axis of percentile data for a single grid point, or for
+            many grid points at once.
 
         Args:
             perc_values (np.array):
                     Array containing the percentile values to blend, with
                     shape: (length of coord to blend, num of percentiles)
+                    for a single grid point, or with shape:
+                    (length of coord to blend, num of percentiles,
+                    num of grid points) for many grid points.
             percentiles (np.array):
                     Array of percentile values e.g
                     [0, 20.0, 50.0, 70.0, 100.0],
@@ -270,17 +268,25 @@ class PercentileBlendingAggregator(object):
         Returns:
             result (np.array):
                     containing the weighted percentile blend data
-                    across the chosen coord
+                    across the chosen coord, with shape:
+                    (num of percentiles,) or
+                    (num of percentiles, num of grid points).
         """
         # Find the size of the dimension we want to blend over.
         num = perc_values.shape[0]
+        # Shape the percentiles so that they broadcast against the
+        # percentile values at every grid point.
+        point_shape = perc_values.shape[2:]
+        percentiles = np.reshape(
+            percentiles, (len(percentiles),) + (1,)*len(point_shape))
         # Create an array to store the weighted blending pdf
-        combined_pdf = np.zeros((num, len(percentiles)))
+        combined_pdf = np.zeros(perc_values.shape)
         # Loop over the axis we are blending over finding the values for the
         # probability at each threshold in the pdf, for each of the other
         # points in the axis we are blending over. Use the values from the
         # percentiles if we are at the same point, otherwise use linear
-        # interpolation.
+        # interpolation. Each interpolation is done for all grid points at
+        # once.
         # Then add the probabilities multiplied by the correct weight to the
         # running total.
         for i in range(0, num):
@@ -288,27 +294,95 @@ class PercentileBlendingAggregator(object):
                 if i == j:
                     recalc_values_in_pdf = percentiles
                 else:
-                    recalc_values_in_pdf = np.interp(perc_values[i],
-                                                     perc_values[j],
-                                                     percentiles)
+                    recalc_values_in_pdf = (
+                        PercentileBlendingAggregator._interpolate(
+                            perc_values[i], perc_values[j], percentiles))
                 # Add the resulting probabilities multiplied by the right
                 # weight to the running total for the combined pdf.
                 combined_pdf[i] += recalc_values_in_pdf*weights[j]
 
         # Combine and sort the threshold values for all the points
-        # we are blending.
-        combined_perc_thres_data = np.sort(perc_values.flatten())
+        # we are blending, separately at each grid point.
+        combined_shape = (-1,) + point_shape
+        combined_perc_thres_data = np.sort(
+            perc_values.reshape(combined_shape), axis=0)
 
         # Combine and sort blended probability values.
-        combined_perc_values = np.sort(combined_pdf.flatten())
+        combined_perc_values = np.sort(
+            combined_pdf.reshape(combined_shape), axis=0)
 
         # Find the percentile values from this combined data by interpolating
         # back from probability values to the original percentiles.
-        new_combined_perc = np.interp(percentiles,
-                                      combined_perc_values,
-                                      combined_perc_thres_data)
+        new_combined_perc = PercentileBlendingAggregator._interpolate(
+            percentiles, combined_perc_values, combined_perc_thres_data)
         return new_combined_perc
 
+    @staticmethod
+    def _interpolate(x_values, xp_values, fp_values):
+        """ Linear interpolation along the leading axis of the arrays,
+            equivalent to calling np.interp separately for every index of the
+            trailing dimensions, but done for all of them at once.
+
+        Args:
+            x_values (np.array):
+                    Array of the values at which to interpolate, with the
+                    values to interpolate along the leading axis.
+            xp_values (np.array):
+                    Array of the data points, increasing along the leading
+                    axis.
+            fp_values (np.array):
+                    Array of the values at the data points, same length as
+                    xp_values along the leading axis.
+                    The trailing dimensions of the three arrays must
+                    broadcast against one another.
+
+        Returns:
+            result (np.array):
+                    The interpolated values, with the length of x_values along
+                    the leading axis. As with np.interp, values of x_values
+                    outside the range of xp_values take the first or last
+                    value of fp_values.
+        """
+        num_points = xp_values.shape[0]
+        if num_points == 1:
+            return np.broadcast_to(
+                fp_values[0], np.broadcast(x_values, fp_values[0]).shape)
+        # Flatten the trailing dimensions into columns, one for each
+        # separate interpolation.
+        trailing_shape = np.broadcast(
+            x_values[0], xp_values[0], fp_values[0]).shape
+        x_columns = np.broadcast_to(
+            x_values, x_values.shape[:1] + trailing_shape).reshape(
+                x_values.shape[0], -1)
+        xp_columns = np.broadcast_to(
+            xp_values, (num_points,) + trailing_shape).reshape(num_points, -1)
+        fp_columns = np.broadcast_to(
+            fp_values, (num_points,) + trailing_shape).reshape(num_points, -1)
+        columns = np.arange(xp_columns.shape[1])
+        # Count the data points in the same column that are less than or
+        # equal to each value, so that the value lies between the data
+        # points at index (count-1) and count. Each column is compared only
+        # with its own data points, so the range of values in one column
+        # cannot affect the result in another.
+        count = np.empty(x_columns.shape, dtype=np.int64)
+        for index, x_row in enumerate(x_columns):
+            count[index] = np.count_nonzero(xp_columns <= x_row, axis=0)
+        # Pick out the neighbouring data points, clipping to the first and
+        # last intervals.
+        lower = np.clip(count - 1, 0, num_points - 2)
+        x_lower = xp_columns[lower, columns]
+        x_upper = xp_columns[lower + 1, columns]
+        f_lower = fp_columns[lower, columns]
+        f_upper = fp_columns[lower + 1, columns]
+        # Intervals of zero width are only selected for values beyond the
+        # data points, which are replaced below.
+        with np.errstate(divide='ignore', invalid='ignore'):
+            result = f_lower + ((x_columns - x_lower) * (f_upper - f_lower) /
+                                (x_upper - x_lower))
+        result = np.where(count == 0, fp_columns[0], result)
+        result = np.where(count == num_points, fp_columns[-1], result)
+        return result.reshape(x_values.shape[:1] + trailing_shape)
+
 
 class MaxProbabilityAggregator(object):
     """Class for the Aggregator used to calculate the maximum weighted
@@ -419,6 +493,65 @@ class WeightedBlendAcrossWholeDimension(object):
                        ' coord_adjust = {2}>')
         return description.format(self.coord, self.mode, self.coord_adjust)
 
+    def weighted_blend(self, cube, weights=None):
+        """Calculate the weighted mean or the maximum of the weighted values
+           across the chosen coord, for all the other dimensions of the cube
+           (e.g. all thresholds) at once.
+
+           The blended data are calculated directly from the data array.
+           The metadata of the result are created by a single collapse of
+           the cube with lazy data, so that the data array is not collapsed
+           a second time.
+
+        Args:
+            cube (iris.cube.Cube):
+                   Cube to blend across the coord. The coord must be a
+                   dimension of the cube.
+
+        Keyword Args:
+            weights (Optional list or np.array of weights):
+                     or None (equivalent to equal weights).
+
+        Returns:
+            result (iris.cube.Cube):
+                     containing the weighted blend across the chosen coord.
+        """
+        coord_dim, = cube.coord_dims(self.coord)
+        # Set equal weights if none are provided
+        if weights is None:
+            num = len(cube.coord(self.coord).points)
+            weights = np.ones(num) / float(num)
+        weights = np.array(weights, dtype=float)
+
+        if self.mode == "weighted_mean":
+            if isinstance(cube.data, np.ma.core.MaskedArray):
+                # Masked points are excluded from the weighted average, so
+                # the sum of the weights varies between points.
+                blended_data = np.ma.average(
+                    cube.data, axis=coord_dim, weights=weights)
+            else:
+                blended_data = (
+                    np.tensordot(weights, cube.data, axes=([0], [coord_dim])) /
+                    np.sum(weights))
+            aggregator = iris.analysis.MEAN
+        else:
+            blended_data = MaxProbabilityAggregator.aggregate(
+                cube.data, coord_dim, weights)
+            aggregator = iris.analysis.MAX
+
+        orig_cell_methods = cube.cell_methods
+        result = cube.copy(data=cube.lazy_data()).collapsed(
+            self.coord, aggregator)
+        result.data = blended_data
+        if self.mode == "weighted_mean":
+            # Update the name of the cell_method created by Iris to
+            # 'weighted_mean' to be consistent.
+            new_cell_methods = result.cell_methods
+            extra_cm = (set(new_cell_methods) -
+                        set(orig_cell_methods)).pop()
+            add_renamed_cell_method(result, extra_cm, 'mean')
+        return result
+
     def process(self, cube, weights=None):
         """Calculate weighted blend across the chosen coord, for either
            probabilistic or percentile data. If there is a percentile
@@ -522,6 +655,13 @@ class WeightedBlendAcrossWholeDimension(object):
                    ' value. Returning original cube')
             warnings.warn(msg)
             result = cube
+        elif self.mode == "weighted_maximum" or not perc_coord:
+            # Blend all thresholds at once, directly on the data array.
+            result = self.weighted_blend(cube, weights)
+            result = conform_metadata(
+                result, cube, coord=self.coord,
+                cycletime=self.cycletime,
+                coords_for_bounds_removal=self.coords_for_bounds_removal)
         else:
             try:
                 cube.coord('threshold')
@@ -535,76 +675,35 @@ class WeightedBlendAcrossWholeDimension(object):
 
             cubelist = iris.cube.CubeList([])
             for cube_thres in slices_over_threshold:
-                # Blend the cube across the coordinate
-                # Use percentile Aggregator if required
-                if perc_coord and self.mode == "weighted_mean":
-                    percentiles = np.array(perc_coord.points, dtype=float)
-                    perc_dim, = cube_thres.coord_dims(perc_coord.name())
-
-                    # The iris.analysis.Aggregator moves the coordinate being
-                    # collapsed to index=-1 in initialisation, before the
-                    # aggregation method is called. This reduces by 1 the index
-                    # of all coordinates with an initial index higher than the
-                    # collapsing coordinate. As we need to know the index of
-                    # the percentile coordinate at a later step, if it will be
-                    # changed by this process, we adjust our record (perc_dim)
-                    # here.
-                    if cube_thres.coord_dims(self.coord)[0] < perc_dim:
-                        perc_dim -= 1
-
-                    # Set equal weights if none are provided
-                    if weights is None:
-                        num = len(cube_thres.coord(self.coord).points)
-                        weights = np.ones(num) / float(num)
-                    # Set up aggregator
-                    PERCENTILE_BLEND = (Aggregator(
-                        'mean',  # Use CF-compliant cell method.
-                        PercentileBlendingAggregator.aggregate))
-                    cube_new = cube_thres.collapsed(self.coord,
-                                                    PERCENTILE_BLEND,
-                                                    arr_percent=percentiles,
-                                                    arr_weights=weights,
-                                                    perc_dim=perc_dim)
-
-                # Else do a simple weighted average
-                elif self.mode == "weighted_mean":
-                    # Equal weights are used as default.
-                    weights_array = None
-                    # Else broadcast the weights to be used by the aggregator.
-                    coord_dim_thres = cube_thres.coord_dims(self.coord)
-                    if weights is not None:
-                        weights_array = (
-                            iris.util.broadcast_to_shape(np.array(weights),
-                                                         cube_thres.shape,
-                                                         coord_dim_thres))
-                    orig_cell_methods = cube_thres.cell_methods
-                    # Calculate the weighted average.
-                    cube_new = cube_thres.collapsed(self.coord,
-                                                    iris.analysis.MEAN,
-                                                    weights=weights_array)
-                    # Update the name of the cell_method created by Iris to
-                    # 'weighted_mean' to be consistent.
-                    new_cell_methods = cube_new.cell_methods
-                    extra_cm = (set(new_cell_methods) -
-                                set(orig_cell_methods)).pop()
-                    add_renamed_cell_method(cube_new,
-                                            extra_cm,
-                                            'mean')
-
-                # Else use the maximum probability aggregator.
-                elif self.mode == "weighted_maximum":
-                    # Set equal weights if none are provided
-                    if weights is None:
-                        num = len(cube_thres.coord(self.coord).points)
-                        weights = np.ones(num) / float(num)
-                    # Set up aggregator
-                    MAX_PROBABILITY = (Aggregator(
-                        'maximum',  # Use CF-compliant cell method.
-                        MaxProbabilityAggregator.aggregate))
-
-                    cube_new = cube_thres.collapsed(self.coord,
-                                                    MAX_PROBABILITY,
-                                                    arr_weights=weights)
+                # Blend the cube across the coordinate using the percentile
+                # Aggregator.
+                percentiles = np.array(perc_coord.points, dtype=float)
+                perc_dim, = cube_thres.coord_dims(perc_coord.name())
+
+                # The iris.analysis.Aggregator moves the coordinate being
+                # collapsed to index=-1 in initialisation, before the
+                # aggregation method is called. This reduces by 1 the index
+                # of all coordinates with an initial index higher than the
+                # collapsing coordinate. As we need to know the index of
+                # the percentile coordinate at a later step, if it will be
+                # changed by this process, we adjust our record (perc_dim)
+                # here.
+                if cube_thres.coord_dims(self.coord)[0] < perc_dim:
+                    perc_dim -= 1
+
+                # Set equal weights if none are provided
+                if weights is None:
+                    num = len(cube_thres.coord(self.coord).points)
+                    weights = np.ones(num) / float(num)
+                # Set up aggregator
+                PERCENTILE_BLEND = (Aggregator(
+                    'mean',  # Use CF-compliant cell method.
+                    PercentileBlendingAggregator.aggregate))
+                cube_new = cube_thres.collapsed(self.coord,
+                                                PERCENTILE_BLEND,
+                                                arr_percent=percentiles,
+                                                arr_weights=weights,
+                                                perc_dim=perc_dim)
                 cube_new = conform_metadata(
                     cube_new, cube_thres, coord=self.coord,
                     cycletime=self.cycletime,
@@ -612,13 +711,15 @@ class WeightedBlendAcrossWholeDimension(object):
                 cubelist.append(cube_new)
             result = cubelist.merge_cube()
 
+            if isinstance(cubelist[0].data, np.ma.core.MaskedArray):
+                result.data = np.ma.array(result.data)
+
+        if coord_dim:
             # Add a source realizations attribute if collapsing realizations.
             if self.coord == "realization":
                 result.attributes['source_realizations'] = (
                     cube.coord(self.coord).points)
 
-            if isinstance(cubelist[0].data, np.ma.core.MaskedArray):
-                result.data = np.ma.array(result.data)
         # If set adjust values of collapsed coordinates.
         if self.coord_adjust is not None:
             for crd in result.coords():
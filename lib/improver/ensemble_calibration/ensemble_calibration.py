@@ -32,6 +32,9 @@
 This module defines all the "plugins" specific for ensemble calibration.
 
 """
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import itertools
+
 import numpy as np
 from scipy import stats
 from scipy.optimize import minimize
@@ -41,6 +44,8 @@ import warnings
 import cf_units as unit
 import iris
 
+from improver.ensemble_calibration.ensemble_calibration_state import (
+    EnsembleCalibrationState)
 from improver.ensemble_calibration.ensemble_calibration_utilities import (
     convert_cube_data_to_2d, check_predictor_of_mean_flag)
 from improver.utilities.cube_manipulation import (
@@ -59,16 +64,24 @@ class ContinuousRankedProbabilityScoreMinimisers(object):
     The number of coefficients that will be optimised depend upon the initial
     guess.
 
-    Minimisation is performed using the Nelder-Mead algorithm for 200
-    iterations to limit the computational expense.
+    By default, minimisation is performed using the Nelder-Mead algorithm
+    for 200 iterations to limit the computational expense.
     Note that the BFGS algorithm was initially trialled but had a bug
     in comparison to comparative results generated in R.
 
+    Alternatively, a gradient-based algorithm (BFGS or L-BFGS-B) can be
+    used, supplied with the analytic gradient of the CRPS with respect to
+    the coefficients. If the gradient-based minimisation fails, the
+    Nelder-Mead algorithm is used instead.
+
     """
 
-    # Maximum iterations for minimisation using Nelder-Mead.
+    # Maximum iterations for minimisation.
     MAX_ITERATIONS = 200
 
+    # Minimisation methods that make use of the gradient of the CRPS.
+    GRADIENT_METHODS = ["BFGS", "L-BFGS-B"]
+
     # The tolerated percentage change for the final iteration when
     # performing the minimisation.
     TOLERATED_PERCENTAGE_CHANGE = 5
@@ -77,12 +90,43 @@ class ContinuousRankedProbabilityScoreMinimisers(object):
     # as part of the minimisation.
     BAD_VALUE = np.float64(999999)
 
-    def __init__(self):
+    def __init__(self, minimisation_method="Nelder-Mead"):
+        """
+        Initialise the class.
+
+        Keyword Args:
+            minimisation_method (String):
+                Name of the scipy.optimize.minimize method used to minimise
+                the CRPS. Either "Nelder-Mead", or one of the
+                GRADIENT_METHODS, which use the analytic gradient of the
+                CRPS.
+
+        Raises:
+            ValueError: If the minimisation method is not supported.
+        """
+        if minimisation_method not in ["Nelder-Mead"] + self.GRADIENT_METHODS:
+            msg = ("Minimisation method requested {} is not supported. "
+                   "Supported methods are {}".format(
+                       minimisation_method,
+                       ["Nelder-Mead"] + self.GRADIENT_METHODS))
+            raise ValueError(msg)
+        self.minimisation_method = minimisation_method
         # Dictionary containing the minimisation functions, which will
         # be used, depending upon the distribution, which is requested.
         self.minimisation_dict = {
             "gaussian": self.normal_crps_minimiser,
             "truncated gaussian": self.truncated_normal_crps_minimiser}
+        # Dictionary containing the functions that calculate the gradient
+        # of the corresponding minimisation functions.
+        self.gradient_dict = {
+            "gaussian": self.normal_crps_gradient,
+            "truncated gaussian": self.truncated_normal_crps_gradient}
+
+    def __repr__(self):
+        """Represent the configured plugin instance as a string."""
+        result = ('<ContinuousRankedProbabilityScoreMinimisers: '
+                  'minimisation_method: {}>')
+        return result.format(self.minimisation_method)
 
     def crps_minimiser_wrapper(
             self, initial_guess, forecast_predictor, truth, forecast_var,
@@ -128,6 +172,8 @@ class ContinuousRankedProbabilityScoreMinimisers(object):
                     List of numpy arrays containing the optimised coefficients,
                     after each iteration.
             """
+            if len(allvecs) < 2:
+                return
             last_iteration_percentage_change = np.absolute(
                 (allvecs[-1] - allvecs[-2]) / allvecs[-2])*100
             if (np.any(last_iteration_percentage_change >
@@ -168,26 +214,153 @@ class ContinuousRankedProbabilityScoreMinimisers(object):
                 forecast_predictor)
             forecast_var_data = forecast_var.data.flatten()
 
-        initial_guess = np.array(initial_guess, dtype=np.float32)
-        forecast_predictor_data = forecast_predictor_data.astype(np.float32)
-        forecast_var_data = forecast_var_data.astype(np.float32)
-        truth_data = truth_data.astype(np.float32)
-        sqrt_pi = np.sqrt(np.pi).astype(np.float32)
-
-        optimised_coeffs = minimize(
-            minimisation_function, initial_guess,
-            args=(forecast_predictor_data, truth_data,
-                  forecast_var_data, sqrt_pi, predictor_of_mean_flag),
-            method="Nelder-Mead",
-            options={"maxiter": self.MAX_ITERATIONS, "return_all": True})
+        if self.minimisation_method in self.GRADIENT_METHODS:
+            # The line searches within the gradient-based methods require
+            # the CRPS to be calculated at a higher precision.
+            dtype = np.float64
+        else:
+            dtype = np.float32
+        initial_guess = np.array(initial_guess, dtype=dtype)
+        forecast_predictor_data = forecast_predictor_data.astype(dtype)
+        forecast_var_data = forecast_var_data.astype(dtype)
+        truth_data = truth_data.astype(dtype)
+        sqrt_pi = np.sqrt(np.pi).astype(dtype)
+        args = (forecast_predictor_data, truth_data,
+                forecast_var_data, sqrt_pi, predictor_of_mean_flag)
+
+        optimised_coeffs = None
+        if self.minimisation_method in self.GRADIENT_METHODS:
+            allvecs = [initial_guess]
+            optimised_coeffs = minimize(
+                minimisation_function, initial_guess, args=args,
+                method=self.minimisation_method,
+                jac=self.gradient_dict[distribution],
+                callback=lambda coeffs: allvecs.append(np.copy(coeffs)),
+                options={"maxiter": self.MAX_ITERATIONS})
+            if (not optimised_coeffs.success or
+                    optimised_coeffs.fun == self.BAD_VALUE):
+                msg = ("Minimisation using {} did not succeed. \n{}\n"
+                       "Minimising using Nelder-Mead instead.".format(
+                           self.minimisation_method,
+                           optimised_coeffs.message))
+                warnings.warn(msg)
+                optimised_coeffs = None
+
+        if optimised_coeffs is None:
+            optimised_coeffs = minimize(
+                minimisation_function, initial_guess, args=args,
+                method="Nelder-Mead",
+                options={"maxiter": self.MAX_ITERATIONS, "return_all": True})
+            allvecs = optimised_coeffs.allvecs
+
         if not optimised_coeffs.success:
             msg = ("Minimisation did not result in convergence after "
                    "{} iterations. \n{}".format(
                        self.MAX_ITERATIONS, optimised_coeffs.message))
             warnings.warn(msg)
-        calculate_percentage_change_in_last_iteration(optimised_coeffs.allvecs)
+        calculate_percentage_change_in_last_iteration(allvecs)
         return optimised_coeffs.x
 
+    def crps_minimiser_wrapper_for_regions(
+            self, initial_guess, regions, predictor_of_mean_flag,
+            distribution):
+        """
+        Estimate optimised values for the coefficients for each of a
+        sequence of regions in turn. The minimisation for each region starts
+        from the coefficients optimised for the previous region, so the
+        regions are expected to be ordered such that consecutive regions are
+        neighbours.
+
+        Args:
+            initial_guess (List):
+                List of coefficients used as the starting point for the
+                first region, and for any region following a region for
+                which the optimised coefficients are not finite.
+                Order of coefficients is [c, d, a, b].
+            regions (List):
+                List of tuples, each containing the forecast predictor,
+                truth and forecast variance cubes for a region, as passed to
+                crps_minimiser_wrapper.
+            predictor_of_mean_flag (String):
+                String to specify the input to calculate the calibrated mean.
+                Currently the ensemble mean ("mean") and the ensemble
+                realizations ("realizations") are supported as the predictors.
+            distribution (String):
+                String used to access the appropriate minimisation function
+                within self.minimisation_dict.
+
+        Returns:
+            optimised_coeffs (List):
+                List containing the optimised coefficients for each region.
+
+        """
+        optimised_coeffs = []
+        guess = initial_guess
+        for forecast_predictor, truth, forecast_var in regions:
+            coeffs = self.crps_minimiser_wrapper(
+                guess, forecast_predictor, truth, forecast_var,
+                predictor_of_mean_flag, distribution)
+            optimised_coeffs.append(coeffs)
+            guess = coeffs if np.all(np.isfinite(coeffs)) else initial_guess
+        return optimised_coeffs
+
+    @staticmethod
+    def _crps_gradient_wrt_coefficients(
+            initial_guess, forecast_predictor, forecast_var, sigma,
+            crps_gradient_wrt_mu, crps_gradient_wrt_sigma,
+            predictor_of_mean_flag):
+        """
+        Use the chain rule to convert the gradient of the CRPS at each point
+        with respect to the mean and standard deviation of the distribution
+        into the gradient of the total CRPS with respect to the coefficients.
+        Points at which the gradient is NaN are ignored, in the same way as
+        the CRPS at these points is ignored by the minimisation functions.
+
+        Args:
+            initial_guess (Numpy array):
+                Coefficients. Order of coefficients is [c, d, a, b].
+            forecast_predictor (Numpy array):
+                Data to be used as the predictor,
+                either the ensemble mean or the ensemble realizations.
+            forecast_var (Numpy array):
+                Ensemble variance data.
+            sigma (Numpy array):
+                Standard deviation of the distribution at each point.
+            crps_gradient_wrt_mu (Numpy array):
+                Gradient of the CRPS at each point with respect to the mean.
+            crps_gradient_wrt_sigma (Numpy array):
+                Gradient of the CRPS at each point with respect to the
+                standard deviation.
+            predictor_of_mean_flag (String):
+                String to specify the input to calculate the calibrated mean.
+                Currently the ensemble mean ("mean") and the ensemble
+                realizations ("realizations") are supported as the predictors.
+
+        Returns:
+            gradient (Numpy array):
+                Gradient of the CRPS with respect to each coefficient.
+
+        """
+        # sigma = sqrt(c**2 + d**2 * forecast_var)
+        gradient_c = np.nansum(
+            crps_gradient_wrt_sigma * initial_guess[0] / sigma)
+        gradient_d = np.nansum(
+            crps_gradient_wrt_sigma * initial_guess[1] * forecast_var / sigma)
+
+        # mu = a + b * forecast_predictor, where each of the realizations
+        # has its own b, if the realizations are the predictor.
+        new_col = np.ones(crps_gradient_wrt_mu.shape)
+        all_data = np.column_stack((new_col, forecast_predictor))
+        gradient_beta = np.nansum(
+            all_data * crps_gradient_wrt_mu[:, np.newaxis], axis=0)
+        if predictor_of_mean_flag.lower() in ["realizations"]:
+            # The coefficients for each realization are squared when
+            # calculating the mean.
+            gradient_beta[1:] *= 2 * initial_guess[3:]
+
+        gradient = np.concatenate(([gradient_c, gradient_d], gradient_beta))
+        return gradient.astype(np.float64)
+
     def normal_crps_minimiser(
             self, initial_guess, forecast_predictor, truth, forecast_var,
             sqrt_pi, predictor_of_mean_flag):
@@ -305,6 +478,134 @@ class ContinuousRankedProbabilityScoreMinimisers(object):
             result = self.BAD_VALUE
         return result
 
+    def normal_crps_gradient(
+            self, initial_guess, forecast_predictor, truth, forecast_var,
+            sqrt_pi, predictor_of_mean_flag):
+        """
+        Calculate the gradient of the CRPS for a normal distribution, as
+        calculated by normal_crps_minimiser, with respect to the
+        coefficients.
+
+        Args:
+            initial_guess : List
+                List of optimised coefficients.
+                Order of coefficients is [c, d, a, b].
+            forecast_predictor : Numpy array
+                Data to be used as the predictor,
+                either the ensemble mean or the ensemble realizations.
+            truth : Numpy array
+                Data to be used as truth.
+            forecast_var : Numpy array
+                Ensemble variance data.
+            sqrt_pi : Numpy array
+                Square root of Pi
+            predictor_of_mean_flag : String
+                String to specify the input to calculate the calibrated mean.
+                Currently the ensemble mean ("mean") and the ensemble
+                realizations ("realizations") are supported as the predictors.
+
+        Returns:
+            gradient (Numpy array):
+                Gradient of the CRPS with respect to each coefficient. If the
+                CRPS is replaced by BAD_VALUE, the gradient is zero.
+
+        """
+        if predictor_of_mean_flag.lower() in ["mean"]:
+            beta = initial_guess[2:]
+        elif predictor_of_mean_flag.lower() in ["realizations"]:
+            beta = np.array([initial_guess[2]]+(initial_guess[3:]**2).tolist())
+
+        new_col = np.ones(truth.shape)
+        all_data = np.column_stack((new_col, forecast_predictor))
+        mu = np.dot(all_data, beta)
+        sigma = np.sqrt(
+            initial_guess[0]**2 + initial_guess[1]**2 * forecast_var)
+        if not np.isfinite(np.min(mu/sigma)):
+            return np.zeros(len(initial_guess))
+        xz = (truth - mu) / sigma
+        normal_cdf = norm.cdf(xz)
+        normal_pdf = norm.pdf(xz)
+        crps_gradient_wrt_mu = 1 - 2 * normal_cdf
+        crps_gradient_wrt_sigma = 2 * normal_pdf - 1 / sqrt_pi
+        return self._crps_gradient_wrt_coefficients(
+            initial_guess, forecast_predictor, forecast_var, sigma,
+            crps_gradient_wrt_mu, crps_gradient_wrt_sigma,
+            predictor_of_mean_flag)
+
+    def truncated_normal_crps_gradient(
+            self, initial_guess, forecast_predictor, truth, forecast_var,
+            sqrt_pi, predictor_of_mean_flag):
+        """
+        Calculate the gradient of the CRPS for a truncated normal
+        distribution, as calculated by truncated_normal_crps_minimiser, with
+        respect to the coefficients.
+
+        Args:
+            initial_guess (List):
+                List of optimised coefficients.
+                Order of coefficients is [c, d, a, b].
+            forecast_predictor (Numpy array):
+                Data to be used as the predictor,
+                either the ensemble mean or the ensemble realizations.
+            truth (Numpy array):
+                Data to be used as truth.
+            forecast_var (Numpy array):
+                Ensemble variance data.
+            sqrt_pi (Numpy array):
+                Square root of Pi
+            predictor_of_mean_flag (String):
+                String to specify the input to calculate the calibrated mean.
+                Currently the ensemble mean ("mean") and the ensemble
+                realizations ("realizations") are supported as the predictors.
+
+        Returns:
+            gradient (Numpy array):
+                Gradient of the CRPS with respect to each coefficient. If the
+                CRPS is replaced by BAD_VALUE, the gradient is zero.
+
+        """
+        if predictor_of_mean_flag.lower() in ["mean"]:
+            beta = initial_guess[2:]
+        elif predictor_of_mean_flag.lower() in ["realizations"]:
+            beta = np.array([initial_guess[2]]+(initial_guess[3:]**2).tolist())
+
+        new_col = np.ones(truth.shape)
+        all_data = np.column_stack((new_col, forecast_predictor))
+        mu = np.dot(all_data, beta)
+        sigma = np.sqrt(
+            initial_guess[0]**2 + initial_guess[1]**2 * forecast_var)
+        if not np.isfinite(np.min(mu/sigma)) or (np.min(mu/sigma) < -3):
+            return np.zeros(len(initial_guess))
+        xz = (truth - mu) / sigma
+        normal_cdf = norm.cdf(xz)
+        normal_pdf = norm.pdf(xz)
+        x0 = mu / sigma
+        normal_cdf_0 = norm.cdf(x0)
+        normal_pdf_0 = norm.pdf(x0)
+        normal_cdf_root_two = norm.cdf(np.sqrt(2) * x0)
+
+        # The CRPS is sigma * h(xz, x0), so calculate the partial
+        # derivatives of h with respect to xz and x0.
+        h = ((xz * normal_cdf_0 * (2 * normal_cdf + normal_cdf_0 - 2) +
+              2 * normal_pdf * normal_cdf_0 -
+              normal_cdf_root_two / sqrt_pi) / normal_cdf_0**2)
+        h_gradient_wrt_xz = (2 * normal_cdf + normal_cdf_0 - 2) / normal_cdf_0
+        h_gradient_wrt_x0 = (
+            -normal_pdf_0 * (xz * (2 * normal_cdf - 2) + 2 * normal_pdf) /
+            normal_cdf_0**2 -
+            np.exp(-x0**2) / (sqrt_pi * sqrt_pi * normal_cdf_0**2) +
+            2 * normal_cdf_root_two * normal_pdf_0 /
+            (sqrt_pi * normal_cdf_0**3))
+
+        # xz = (truth - mu) / sigma and x0 = mu / sigma.
+        crps_gradient_wrt_mu = h_gradient_wrt_x0 - h_gradient_wrt_xz
+        crps_gradient_wrt_sigma = (
+            h - xz * h_gradient_wrt_xz - x0 * h_gradient_wrt_x0)
+        return self._crps_gradient_wrt_coefficients(
+            initial_guess, forecast_predictor, forecast_var, sigma,
+            crps_gradient_wrt_mu, crps_gradient_wrt_sigma,
+            predictor_of_mean_flag)
+
 
 class EstimateCoefficientsForEnsembleCalibration(object):
     """
@@ -319,7 +620,9 @@ class EstimateCoefficientsForEnsembleCalibration(object):
     ESTIMATE_COEFFICIENTS_FROM_LINEAR_MODEL_FLAG = True
 
     def __init__(self, distribution, desired_units,
-                 predictor_of_mean_flag="mean"):
+                 predictor_of_mean_flag="mean",
+                 minimisation_method="Nelder-Mead", partition=None,
+                 tile_size=None, workers=1, executor="process"):
         """
         Create an ensemble calibration plugin that, for Nonhomogeneous Gaussian
         Regression, calculates coefficients based on historical forecasts and
@@ -337,12 +640,63 @@ class EstimateCoefficientsForEnsembleCalibration(object):
                 String to specify the input to calculate the calibrated mean.
                 Currently the ensemble mean ("mean") and the ensemble
                 realizations ("realizations") are supported as the predictors.
+            minimisation_method (String):
+                Name of the method used to minimise the CRPS. See
+                ContinuousRankedProbabilityScoreMinimisers for the supported
+                methods.
+            partition (String or None):
+                If None, one set of coefficients is estimated for the whole
+                grid. Otherwise, the grid is divided into regions and a set
+                of coefficients is estimated for each region, with the
+                estimation for each region starting from the coefficients
+                of a neighbouring region. Options: "point", to estimate
+                coefficients for each grid point, or "tile", to estimate
+                coefficients for square tiles of grid points.
+            tile_size (int or None):
+                Number of grid points along each spatial axis of a tile.
+                Required if partition is "tile".
+            workers (int):
+                Number of workers used to estimate the coefficients for the
+                regions concurrently, if the grid is partitioned.
+            executor (String):
+                The type of worker to use when workers is greater than one.
+                Options: "process" or "thread". The minimisation is largely
+                carried out in Python, so processes are usually faster.
+
+        Raises:
+            ValueError: If the partition, tile size, number of workers or
+                executor is not valid.
 
         """
+        if partition not in [None, "point", "tile"]:
+            msg = ("The partition requested: {} is not supported. "
+                   "Please choose from: {}".format(
+                       partition, [None, "point", "tile"]))
+            raise ValueError(msg)
+        if partition == "tile" and (tile_size is None or tile_size < 1):
+            msg = ("A tile size of at least 1 is required if the partition "
+                   "is tile, not {}".format(tile_size))
+            raise ValueError(msg)
+        if workers < 1:
+            msg = ("The number of workers must be at least 1, "
+                   "not {}".format(workers))
+            raise ValueError(msg)
+        executors = {"thread": ThreadPoolExecutor,
+                     "process": ProcessPoolExecutor}
+        if executor not in executors:
+            msg = ("The executor requested: {} is not a supported "
+                   "executor. Please choose from: {}".format(
+                       executor, list(executors.keys())))
+            raise ValueError(msg)
+        self.partition = partition
+        self.tile_size = 1 if partition == "point" else tile_size
+        self.workers = int(workers)
+        self.executor = executors[executor]
         self.distribution = distribution
         self.desired_units = desired_units
         self.predictor_of_mean_flag = predictor_of_mean_flag
-        self.minimiser = ContinuousRankedProbabilityScoreMinimisers()
+        self.minimiser = ContinuousRankedProbabilityScoreMinimisers(
+            minimisation_method=minimisation_method)
 
         import imp
         try:
@@ -462,6 +816,85 @@ class EstimateCoefficientsForEnsembleCalibration(object):
                         [1, 1, 0] + np.repeat(1, no_of_realizations).tolist())
         return initial_guess
 
+    def _estimate_local_coefficients(
+            self, initial_guess, forecast_predictor, truth, forecast_var):
+        """
+        Estimate a set of coefficients for each region of the grid. The
+        regions are visited in a serpentine order, so that consecutive
+        regions are neighbours, and the sequence of regions is divided into
+        contiguous batches that are processed concurrently. Within a batch,
+        the estimation for each region starts from the coefficients of the
+        previous region.
+
+        Args:
+            initial_guess (List):
+                List of coefficients to be used as the initial guess for the
+                first region in each batch.
+                Order of coefficients is [c, d, a, b].
+            forecast_predictor (iris.cube.Cube):
+                Cube containing the fields to be used as the predictor,
+                either the ensemble mean or the ensemble realizations.
+            truth (iris.cube.Cube):
+                Cube containing the field, which will be used as truth.
+            forecast_var (iris.cube.Cube):
+                Cube containg the field containing the ensemble variance.
+
+        Returns:
+            optimised_coeffs (numpy.ndarray):
+                Array of optimised coefficients with the coefficients as the
+                leading dimension, followed by the y and x dimensions.
+                Order of coefficients is [c, d, a, b].
+
+        """
+        spatial_coords = [truth.coord(axis=axis).name()
+                          for axis in ["y", "x"]]
+        for cube in [forecast_predictor, truth, forecast_var]:
+            enforce_coordinate_ordering(cube, spatial_coords, anchor="end")
+        n_rows, n_columns = truth.shape[-2:]
+
+        regions = []
+        row_starts = range(0, n_rows, self.tile_size)
+        for row_index, row in enumerate(row_starts):
+            column_starts = list(range(0, n_columns, self.tile_size))
+            if row_index % 2:
+                column_starts.reverse()
+            for column in column_starts:
+                regions.append((slice(row, row + self.tile_size),
+                                slice(column, column + self.tile_size)))
+
+        def extract_region(cube, region):
+            """Extract a region from a cube with the y and x dims last."""
+            return cube[(Ellipsis,) + region]
+
+        n_batches = min(self.workers, len(regions))
+        bounds = np.linspace(0, len(regions), n_batches + 1).astype(int)
+        batches = []
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            batches.append([
+                tuple(extract_region(cube, region) for cube in
+                      [forecast_predictor, truth, forecast_var])
+                for region in regions[start:stop]])
+
+        args = (initial_guess, self.predictor_of_mean_flag,
+                self.distribution.lower())
+        minimise = self.minimiser.crps_minimiser_wrapper_for_regions
+        if n_batches == 1:
+            results = [minimise(args[0], batches[0], *args[1:])]
+        else:
+            with self.executor(max_workers=n_batches) as executor:
+                futures = [executor.submit(minimise, args[0], batch,
+                                           *args[1:])
+                           for batch in batches]
+                results = [future.result() for future in futures]
+
+        optimised_coeffs = np.full(
+            (len(initial_guess), n_rows, n_columns), np.nan)
+        region_coeffs = [coeffs for result in results for coeffs in result]
+        for region, coeffs in zip(regions, region_coeffs):
+            optimised_coeffs[(slice(None),) + region] = (
+                np.array(coeffs)[:, np.newaxis, np.newaxis])
+        return optimised_coeffs
+
     def estimate_coefficients_for_ngr(
             self, current_forecast, historic_forecast, truth):
         """
@@ -500,7 +933,10 @@ class EstimateCoefficientsForEnsembleCalibration(object):
             (tuple): tuple containing:
                 **optimised_coeffs** (Dictionary):
                     Dictionary containing a list of the optimised coefficients
-                    for each date.
+                    for each date. If the grid is partitioned, the
+                    coefficients for each date are an array with the
+                    coefficients as the leading dimension, followed by the
+                    y and x dimensions.
                 **coeff_names** (List):
                     The name of each coefficient.
 
@@ -640,7 +1076,11 @@ class EstimateCoefficientsForEnsembleCalibration(object):
             if np.any(np.isnan(initial_guess)):
                 nan_in_initial_guess = True
 
-            if not nan_in_initial_guess:
+            if not nan_in_initial_guess and self.partition is not None:
+                optimised_coeffs[date] = self._estimate_local_coefficients(
+                    initial_guess, forecast_predictor, truth_cube,
+                    forecast_var)
+            elif not nan_in_initial_guess:
                 # Need to access the x attribute returned by the
                 # minimisation function.
                 optimised_coeffs[date] = (
@@ -655,6 +1095,178 @@ class EstimateCoefficientsForEnsembleCalibration(object):
 
         return optimised_coeffs, coeff_names
 
+    def estimate_coefficients_incrementally(
+            self, current_forecast, historic_forecast, truth, state):
+        """
+        Add the ensemble mean and variance of the historic forecasts, and
+        the matching truth, to the training data held within a calibration
+        state, and estimate the coefficients for each forecast period of the
+        current forecast from all the training data held for that forecast
+        period. The minimisation starts from the coefficients held within
+        the state for the forecast period, if available, so only the newest
+        historic forecasts need to be supplied.
+
+        Args:
+            current_forecast (Iris Cube or CubeList):
+                The cube containing the current forecast.
+            historic_forecast (Iris Cube or CubeList):
+                The cube or cubelist containing the historic forecasts to
+                add to the training data.
+            truth (Iris Cube or CubeList):
+                The cube or cubelist containing the truth for the historic
+                forecasts.
+            state (EnsembleCalibrationState):
+                Calibration state holding the training data and the
+                previously estimated coefficients. The state is updated with
+                the new training data and coefficients, but is not saved.
+
+        Returns:
+            (tuple): tuple containing:
+                **optimised_coeffs** (Dictionary):
+                    Dictionary containing the optimised coefficients for
+                    each date of the current forecast. If the grid is
+                    partitioned, the coefficients for each date are an array
+                    with the coefficients as the leading dimension, followed
+                    by the y and x dimensions.
+                **coeff_names** (List):
+                    The name of each coefficient.
+
+        Raises:
+            ValueError: If the ensemble realizations are the predictor, as
+                the state only holds the ensemble mean and variance.
+            ValueError: If the calibration state holds no training data.
+
+        """
+        def forecast_period_in_seconds(cube):
+            """Return the forecast period of a cube as integer seconds."""
+            forecast_period = cube.coord("forecast_period").copy()
+            forecast_period.convert_units("seconds")
+            return int(forecast_period.points[0])
+
+        if self.predictor_of_mean_flag.lower() not in ["mean"]:
+            msg = ("Coefficients can only be estimated incrementally with "
+                   "the ensemble mean as the predictor, as the calibration "
+                   "state does not hold the ensemble realizations.")
+            raise ValueError(msg)
+        optimised_coeffs = {}
+        coeff_names = ["gamma", "delta", "a", "beta"]
+
+        # Historic forecasts for different forecast periods may have the
+        # same validity times, so each cube is sliced separately rather than
+        # concatenating them.
+        if isinstance(historic_forecast, iris.cube.Cube):
+            historic_forecast = iris.cube.CubeList([historic_forecast])
+        truth = concatenate_cubes(truth)
+        for historic_forecast_cube in itertools.chain.from_iterable(
+                cube.slices_over("time") for cube in historic_forecast):
+            # Extract truth matching the time of the historic forecast.
+            reference_time = iris_time_to_datetime(
+                historic_forecast_cube.coord("time").copy())
+            truth_cube = truth.extract(
+                iris.Constraint(forecast_reference_time=reference_time))
+            if truth_cube is None:
+                msg = ("Unable to add the historic forecast for the time "
+                       "points {} to the training data as no truth data "
+                       "is available.".format(
+                           historic_forecast_cube.coord("time").points))
+                warnings.warn(msg)
+                continue
+
+            historic_forecast_cube.convert_units(self.desired_units)
+            truth_cube.convert_units(self.desired_units)
+            time_coord = historic_forecast_cube.coord("time").copy()
+            time_coord.convert_units("seconds since 1970-01-01 00:00:00")
+            state.add(
+                int(time_coord.points[0]),
+                forecast_period_in_seconds(historic_forecast_cube),
+                historic_forecast_cube.collapsed(
+                    "realization", iris.analysis.MEAN).data,
+                historic_forecast_cube.collapsed(
+                    "realization", iris.analysis.VARIANCE).data,
+                truth_cube.data)
+
+        if not state.times.size:
+            msg = ("Insufficient input data present to estimate "
+                   "coefficients incrementally, as the calibration state "
+                   "holds no training data.")
+            raise ValueError(msg)
+
+        # Estimate the coefficients separately for each forecast period
+        # within the current forecast, using only the training data for
+        # that forecast period.
+        for current_forecast_cube in concatenate_cubes(
+                current_forecast).slices_over("time"):
+            date = iris_time_to_datetime(
+                current_forecast_cube.coord("time").copy())[0]
+            forecast_period = forecast_period_in_seconds(
+                current_forecast_cube)
+            if forecast_period not in state.forecast_periods:
+                msg = ("Unable to calibrate for the time points {} "
+                       "as no training data is held for the forecast "
+                       "period {} seconds. Moving on to try to calibrate "
+                       "next time point.".format(
+                           current_forecast_cube.coord("time").points,
+                           forecast_period))
+                warnings.warn(msg)
+                continue
+            optimised_coeffs[date] = self._estimate_coefficients_from_state(
+                state, forecast_period)
+
+        return optimised_coeffs, coeff_names
+
+    def _estimate_coefficients_from_state(self, state, forecast_period):
+        """
+        Estimate the coefficients from all the training data held within a
+        calibration state for a forecast period, starting from the
+        coefficients previously estimated for the forecast period, if
+        available. The coefficients held within the state are updated.
+
+        Args:
+            state (EnsembleCalibrationState):
+                Calibration state holding the training data and the
+                previously estimated coefficients.
+            forecast_period (int):
+                Forecast period in seconds.
+
+        Returns:
+            optimised_coeffs (Numpy array):
+                The optimised coefficients. If the grid is partitioned, the
+                coefficients are the leading dimension, followed by the y
+                and x dimensions.
+
+        """
+        forecast_mean, forecast_variance, truth = state.training_data(
+            forecast_period)
+        forecast_predictor = iris.cube.Cube(forecast_mean)
+        forecast_var = iris.cube.Cube(forecast_variance)
+        truth_cube = iris.cube.Cube(truth)
+
+        initial_guess = state.coefficients.get(forecast_period)
+        if initial_guess is not None and initial_guess.ndim > 1:
+            initial_guess = np.nanmean(
+                initial_guess.reshape(len(initial_guess), -1), axis=1)
+        if initial_guess is None or np.any(np.isnan(initial_guess)):
+            initial_guess = self.compute_initial_guess(
+                truth_cube, forecast_predictor, self.predictor_of_mean_flag,
+                self.ESTIMATE_COEFFICIENTS_FROM_LINEAR_MODEL_FLAG)
+        if np.any(np.isnan(initial_guess)):
+            optimised_coeffs = np.array(initial_guess)
+        elif self.partition is not None:
+            dims = [("time", 0), ("projection_y_coordinate", 1),
+                    ("projection_x_coordinate", 2)]
+            for cube in [forecast_predictor, forecast_var, truth_cube]:
+                for name, dim in dims:
+                    cube.add_dim_coord(iris.coords.DimCoord(
+                        np.arange(cube.shape[dim]), name), dim)
+            optimised_coeffs = self._estimate_local_coefficients(
+                initial_guess, forecast_predictor, truth_cube, forecast_var)
+        else:
+            optimised_coeffs = self.minimiser.crps_minimiser_wrapper(
+                initial_guess, forecast_predictor, truth_cube, forecast_var,
+                self.predictor_of_mean_flag, self.distribution.lower())
+        state.coefficients[forecast_period] = optimised_coeffs
+        return optimised_coeffs
+
 
 class ApplyCoefficientsFromEnsembleCalibration(object):
     """
@@ -674,7 +1286,10 @@ class ApplyCoefficientsFromEnsembleCalibration(object):
                 The Cube or CubeList containing the current forecast.
             optimised_coeffs (Dictionary):
                 Dictionary containing a list of the optimised coefficients
-                for each date.
+                for each date. The coefficients for a date may instead be
+                an array with the coefficients as the leading dimension,
+                followed by the y and x dimensions of the current forecast,
+                to apply different coefficients at each grid point.
             coeff_names (List):
                 The name of each coefficient.
             predictor_of_mean_flag (String):
@@ -764,8 +1379,14 @@ class ApplyCoefficientsFromEnsembleCalibration(object):
         Returns:
             coeff_cubes (Iris cube):
                 Cube containing the coefficient value as the data array.
+                If the coefficients vary with grid point, the cube has the
+                y and x coordinates of the input cube.
 
         """
+        if np.ndim(optimised_coeffs_at_date) > 1:
+            return self._create_gridded_coefficient_cube(
+                cube, optimised_coeffs_at_date, coeff_names)
+
         length_one_coords = self._find_coords_of_length_one(cube)
 
         length_one_coords_for_aux_coords, length_one_coords_for_dim_coords = (
@@ -781,6 +1402,46 @@ class ApplyCoefficientsFromEnsembleCalibration(object):
             coeff_cubes.append(cube)
         return coeff_cubes
 
+    def _create_gridded_coefficient_cube(
+            self, cube, optimised_coeffs_at_date, coeff_names):
+        """
+        Function to create cubes to store coefficients that vary with grid
+        point.
+
+        Args:
+            cube (Iris cube):
+                Cube with y and x dimension coordinates matching the
+                coefficients. Length one coordinates are added to the
+                coefficient cubes as scalar coordinates.
+            optimised_coeffs_at_date (numpy.ndarray):
+                Optimised coefficients for a particular date, with the
+                coefficients as the leading dimension, followed by the y and
+                x dimensions.
+            coeff_names (List):
+                List of coefficient names.
+
+        Returns:
+            coeff_cubes (Iris CubeList):
+                Cubes containing the coefficient values on the grid.
+
+        """
+        spatial_coords_and_dims = [
+            (cube.coord(axis=axis), index)
+            for index, axis in enumerate(["y", "x"])]
+        length_one_coords = [
+            (coord, None) for coord in
+            self._find_coords_of_length_one(cube, add_dimension=False)
+            if coord not in [coord for coord, _ in spatial_coords_and_dims]]
+
+        coeff_cubes = iris.cube.CubeList([])
+        for coeff, coeff_name in zip(optimised_coeffs_at_date, coeff_names):
+            coeff_cube = iris.cube.Cube(
+                coeff, long_name=coeff_name, attributes=cube.attributes,
+                aux_coords_and_dims=length_one_coords,
+                dim_coords_and_dims=spatial_coords_and_dims)
+            coeff_cubes.append(coeff_cube)
+        return coeff_cubes
+
     def apply_params_entry(self):
         """
         Wrapping function to calculate the forecast predictor and forecast
@@ -822,6 +1483,30 @@ class ApplyCoefficientsFromEnsembleCalibration(object):
                 calibrated_forecast_var,
                 calibrated_forecast_coefficients)
 
+    @staticmethod
+    def _calculate_predicted_mean(all_data, beta):
+        """
+        Calculate the predicted mean at each point from the predictors and
+        the coefficients.
+
+        Args:
+            all_data (numpy.ndarray):
+                Array with a column of ones, followed by a column for each
+                predictor, and a row for each point.
+            beta (numpy.ndarray):
+                Coefficients for each column of all_data. If the coefficients
+                vary with grid point, the coefficients are the leading
+                dimension, followed by the y and x dimensions.
+
+        Returns:
+            predicted_mean (numpy.ndarray):
+                Predicted mean at each point.
+
+        """
+        if beta.ndim == 1:
+            return np.dot(all_data, beta)
+        return np.sum(all_data * beta.reshape(len(beta), -1).T, axis=1)
+
     def _apply_params(
             self, forecast_predictors, forecast_vars, optimised_coeffs,
             coeff_names, predictor_of_mean_flag):
@@ -914,14 +1599,15 @@ class ApplyCoefficientsFromEnsembleCalibration(object):
                 if predictor_of_mean_flag.lower() in ["mean"]:
                     # Calculate predicted mean = a + b*X, where X is the
                     # raw ensemble mean. In this case, b = beta.
-                    beta = [optimised_coeffs_at_date["a"],
-                            optimised_coeffs_at_date["beta"]]
+                    beta = np.array([optimised_coeffs_at_date["a"],
+                                     optimised_coeffs_at_date["beta"]])
                     forecast_predictor_flat = (
                         forecast_predictor_at_date.data.flatten())
                     new_col = np.ones(forecast_predictor_flat.shape)
                     all_data = np.column_stack(
                         (new_col, forecast_predictor_flat))
-                    predicted_mean = np.dot(all_data, beta)
+                    predicted_mean = self._calculate_predicted_mean(
+                        all_data, beta)
                     calibrated_forecast_predictor_at_date = (
                         forecast_predictor_at_date)
                 elif predictor_of_mean_flag.lower() in ["realizations"]:
@@ -941,7 +1627,8 @@ class ApplyCoefficientsFromEnsembleCalibration(object):
                     new_col = np.ones(forecast_var_flat.shape)
                     all_data = (
                         np.column_stack((new_col, forecast_predictor_flat)))
-                    predicted_mean = np.dot(all_data, beta)
+                    predicted_mean = self._calculate_predicted_mean(
+                        all_data, beta)
                     # Calculate mean of ensemble realizations, as only the
                     # calibrated ensemble mean will be returned.
                     calibrated_forecast_predictor_at_date = (
@@ -986,7 +1673,8 @@ class EnsembleCalibration(object):
 
     """
     def __init__(self, calibration_method, distribution, desired_units,
-                 predictor_of_mean_flag="mean"):
+                 predictor_of_mean_flag="mean", state_filepath=None,
+                 window_length=None):
         """
         Create an ensemble calibration plugin that, for Nonhomogeneous Gaussian
         Regression, calculates coefficients based on historical forecasts and
@@ -1018,11 +1706,26 @@ class EnsembleCalibration(object):
                 String to specify the input to calculate the calibrated mean.
                 Currently the ensemble mean ("mean") and the ensemble
                 realizations ("realizations") are supported as the predictors.
+            state_filepath (String or None):
+                Path to a file holding the calibration state. If given, the
+                historic forecasts and truth passed to the process method
+                are added to the training data held within the state, and
+                the coefficients are estimated from all of the training data
+                held for each forecast period of the current forecast,
+                starting from the previously estimated coefficients for
+                that forecast period. The updated state is then saved to the
+                file. Only the
+                ensemble mean is supported as the predictor.
+            window_length (Integer or None):
+                Maximum number of training dates to hold within the
+                calibration state for each forecast period.
         """
         self.calibration_method = calibration_method
         self.distribution = distribution
         self.desired_units = desired_units
         self.predictor_of_mean_flag = predictor_of_mean_flag
+        self.state_filepath = state_filepath
+        self.window_length = window_length
 
     def __str__(self):
         result = ('<EnsembleCalibration: ' +
@@ -1072,9 +1775,19 @@ class EnsembleCalibration(object):
                 ec = EstimateCoefficientsForEnsembleCalibration(
                     self.distribution, self.desired_units,
                     predictor_of_mean_flag=self.predictor_of_mean_flag)
-                optimised_coeffs, coeff_names = (
-                    ec.estimate_coefficients_for_ngr(
-                        current_forecast, historic_forecast, truth))
+                if self.state_filepath is None:
+                    optimised_coeffs, coeff_names = (
+                        ec.estimate_coefficients_for_ngr(
+                            current_forecast, historic_forecast, truth))
+                else:
+                    state = EnsembleCalibrationState(
+                        self.state_filepath,
+                        window_length=self.window_length)
+                    optimised_coeffs, coeff_names = (
+                        ec.estimate_coefficients_incrementally(
+                            current_forecast, historic_forecast, truth,
+                            state))
+                    state.save()
         else:
             msg = ("Other calibration methods are not available. "
                    "{} is not available".format(
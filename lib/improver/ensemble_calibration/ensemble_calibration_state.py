@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# (C) British Crown Copyright 2017-2018 Met Office.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holder nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+"""
+This module defines a store for the state of ensemble calibration, which
+allows the coefficients to be estimated incrementally from one day to the
+next.
+
+"""
+import os
+
+import numpy as np
+
+
+class EnsembleCalibrationState(object):
+    """
+    Store of the training data and coefficients used for ensemble
+    calibration, held in a NumPy .npz file on local disk.
+
+    For each training date and forecast period, the store holds the
+    ensemble mean and ensemble variance, already collapsed over the
+    realizations, and the truth. This means that a daily update only needs
+    to add the data for the newest date, rather than reloading the full
+    ensembles for the whole training period. The training data for each
+    forecast period is held separately, so that the coefficients can be
+    estimated for each forecast period, and the most recently estimated
+    coefficients for each forecast period are also held, so that the next
+    estimation can start from them.
+    """
+
+    def __init__(self, filepath, window_length=None):
+        """
+        Initialise the class. If the file exists, the stored state is
+        loaded from it.
+
+        Args:
+            filepath (str):
+                Path to the .npz file holding the state.
+
+        Keyword Args:
+            window_length (int or None):
+                Maximum number of training dates to hold for each forecast
+                period. When a date is added beyond this number, the oldest
+                date for that forecast period is removed. If None, all dates
+                are held.
+
+        Raises:
+            ValueError: If the window length is less than 1.
+        """
+        if window_length is not None and window_length < 1:
+            msg = ("The window length must be at least 1, "
+                   "not {}".format(window_length))
+            raise ValueError(msg)
+        self.filepath = filepath
+        self.window_length = window_length
+        self.times = np.array([], dtype=np.int64)
+        self.forecast_periods = np.array([], dtype=np.int64)
+        self.forecast_mean = None
+        self.forecast_variance = None
+        self.truth = None
+        self.coefficients = {}
+        if os.path.exists(filepath):
+            self.load()
+
+    def __repr__(self):
+        """Represent the configured plugin instance as a string."""
+        result = ('<EnsembleCalibrationState: filepath: {}; '
+                  'window_length: {}; number of dates: {}; '
+                  'number of forecast periods: {}>')
+        return result.format(
+            self.filepath, self.window_length, len(self.times),
+            len(np.unique(self.forecast_periods)))
+
+    def load(self):
+        """Load the state from the file."""
+        with np.load(self.filepath) as state:
+            self.times = state["times"]
+            self.forecast_periods = state["forecast_periods"]
+            self.forecast_mean = state["forecast_mean"]
+            self.forecast_variance = state["forecast_variance"]
+            self.truth = state["truth"]
+            self.coefficients = {
+                int(forecast_period): coefficients for forecast_period,
+                coefficients in zip(state["coefficient_forecast_periods"],
+                                    state["coefficients"])}
+
+    def save(self):
+        """
+        Save the state to the file. The file is written to a temporary path
+        first, so that an interrupted save does not corrupt the existing
+        state.
+        """
+        coefficient_forecast_periods = np.array(
+            sorted(self.coefficients), dtype=np.int64)
+        coefficients = np.array(
+            [self.coefficients[forecast_period]
+             for forecast_period in coefficient_forecast_periods])
+        temporary_filepath = self.filepath + ".tmp.npz"
+        np.savez(temporary_filepath, times=self.times,
+                 forecast_periods=self.forecast_periods,
+                 forecast_mean=self.forecast_mean,
+                 forecast_variance=self.forecast_variance,
+                 truth=self.truth,
+                 coefficient_forecast_periods=coefficient_forecast_periods,
+                 coefficients=coefficients)
+        os.replace(temporary_filepath, self.filepath)
+
+    def add(self, time, forecast_period, forecast_mean, forecast_variance,
+            truth):
+        """
+        Add the training data for a date and forecast period. If the date is
+        already held for the forecast period, its data is replaced. The
+        dates are kept in ascending order, and the oldest dates for the
+        forecast period are removed if the window length is exceeded.
+
+        Args:
+            time (int):
+                Validity time of the training data in seconds since
+                1970-01-01 00:00:00.
+            forecast_period (int):
+                Forecast period of the historic forecast in seconds.
+            forecast_mean (numpy.ndarray):
+                Ensemble mean of the historic forecast.
+            forecast_variance (numpy.ndarray):
+                Ensemble variance of the historic forecast.
+            truth (numpy.ndarray):
+                Truth at the validity time of the historic forecast.
+
+        Raises:
+            ValueError: If the shape of the data does not match the shape of
+                the data already held.
+        """
+        new_data = [np.asarray(data, dtype=np.float32)[np.newaxis]
+                    for data in [forecast_mean, forecast_variance, truth]]
+        if len(set(data.shape for data in new_data)) != 1:
+            msg = ("The forecast mean, forecast variance and truth must have "
+                   "the same shape. Got shapes: {}".format(
+                       [data.shape[1:] for data in new_data]))
+            raise ValueError(msg)
+        if self.times.size and new_data[0].shape[1:] != self.truth.shape[1:]:
+            msg = ("The shape of the new training data {} does not match "
+                   "the shape of the stored training data {}".format(
+                       new_data[0].shape[1:], self.truth.shape[1:]))
+            raise ValueError(msg)
+
+        keep = ((self.times != time) |
+                (self.forecast_periods != forecast_period))
+        times = np.append(self.times[keep], np.int64(time))
+        forecast_periods = np.append(
+            self.forecast_periods[keep], np.int64(forecast_period))
+        stored_data = [self.forecast_mean, self.forecast_variance, self.truth]
+        if self.times.size:
+            new_data = [np.concatenate((stored[keep], new))
+                        for stored, new in zip(stored_data, new_data)]
+
+        order = np.argsort(times, kind="stable")
+        if self.window_length is not None:
+            # Remove the oldest dates held for this forecast period only.
+            same_period = np.flatnonzero(
+                forecast_periods[order] == forecast_period)
+            order = np.delete(
+                order, same_period[:-self.window_length])
+        self.times = times[order]
+        self.forecast_periods = forecast_periods[order]
+        self.forecast_mean, self.forecast_variance, self.truth = [
+            data[order] for data in new_data]
+
+    def training_data(self, forecast_period):
+        """
+        Get the training data held for a forecast period.
+
+        Args:
+            forecast_period (int):
+                Forecast period in seconds.
+
+        Returns:
+            (tuple): tuple containing:
+                **forecast_mean** (numpy.ndarray):
+                    Ensemble mean of the historic forecasts, with the dates
+                    in ascending order as the leading dimension.
+                **forecast_variance** (numpy.ndarray):
+                    Ensemble variance of the historic forecasts.
+                **truth** (numpy.ndarray):
+                    Truth at the validity times of the historic forecasts.
+
+        Raises:
+            ValueError: If no training data is held for the forecast period.
+        """
+        matches = self.forecast_periods == forecast_period
+        if not np.any(matches):
+            msg = ("No training data is held for the forecast period "
+                   "{} seconds.".format(forecast_period))
+            raise ValueError(msg)
+        return (self.forecast_mean[matches], self.forecast_variance[matches],
+                self.truth[matches])
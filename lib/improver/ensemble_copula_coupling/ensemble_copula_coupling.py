@@ -32,9 +32,13 @@
 This module defines the plugins required for Ensemble Copula Coupling.
 
 """
+import copy
 import warnings
+
+import dask
+import dask.array as da
 import numpy as np
-from scipy.stats import norm
+from scipy.special import ndtr, ndtri
 
 
 import iris
@@ -42,12 +46,14 @@ from iris.exceptions import CoordinateNotFoundError, InvalidCubeError
 
 from improver.ensemble_calibration.ensemble_calibration_utilities import (
     convert_cube_data_to_2d)
+from improver.ensemble_copula_coupling.ensemble_copula_coupling_constants \
+    import ECC_CHUNK_SIZE, ECC_TILE_SIZE
 from improver.ensemble_copula_coupling.ensemble_copula_coupling_utilities \
     import (concatenate_2d_array_with_2d_array_endpoints,
             create_cube_with_percentiles, choose_set_of_percentiles,
             get_bounds_of_distribution,
             insert_lower_and_upper_endpoint_to_1d_array,
-            restore_non_probabilistic_dimensions)
+            interpolate_multiple_rows, restore_non_probabilistic_dimensions)
 from improver.utilities.cube_manipulation import (
     concatenate_cubes, enforce_coordinate_ordering)
 from improver.utilities.cube_checker import (find_percentile_coordinate,
@@ -217,14 +223,9 @@ class ResamplePercentiles(object):
                 original_percentiles, forecast_at_reshaped_percentiles,
                 bounds_pairing))
 
-        forecast_at_interpolated_percentiles = (
-            np.empty(
-                (len(desired_percentiles),
-                 forecast_at_reshaped_percentiles.shape[0])))
-        for index in range(forecast_at_reshaped_percentiles.shape[0]):
-            forecast_at_interpolated_percentiles[:, index] = np.interp(
-                desired_percentiles, original_percentiles,
-                forecast_at_reshaped_percentiles[index, :])
+        forecast_at_interpolated_percentiles = interpolate_multiple_rows(
+            desired_percentiles, original_percentiles,
+            forecast_at_reshaped_percentiles).T
 
         # Reshape forecast_at_percentiles, so the percentiles dimension is
         # first, and any other dimension coordinates follow.
@@ -435,12 +436,8 @@ class GeneratePercentilesFromProbabilities(object):
         # Convert percentiles into fractions.
         percentiles = [x/100.0 for x in percentiles]
 
-        forecast_at_percentiles = (
-            np.empty((len(percentiles), probabilities_for_cdf.shape[0])))
-        for index in range(probabilities_for_cdf.shape[0]):
-            forecast_at_percentiles[:, index] = np.interp(
-                percentiles, probabilities_for_cdf[index, :],
-                threshold_points)
+        forecast_at_percentiles = interpolate_multiple_rows(
+            percentiles, probabilities_for_cdf, threshold_points).T
 
         # Convert percentiles back into percentages.
         percentiles = [x*100.0 for x in percentiles]
@@ -559,16 +556,28 @@ class GeneratePercentilesFromMeanAndVariance(object):
     Copula Coupling.
     """
 
-    def __init__(self):
+    def __init__(self, chunk_size=ECC_CHUNK_SIZE):
         """
         Initialise the class.
+
+        Keyword Args:
+            chunk_size (int):
+                Maximum number of grid points to calculate the percentiles
+                for at once, which bounds the size of the temporary arrays
+                used.
         """
-        pass
+        self.chunk_size = chunk_size
+
+    def __repr__(self):
+        """Represent the configured plugin instance as a string."""
+        desc = ('<GeneratePercentilesFromMeanAndVariance: '
+                'chunk_size: {}>'.format(self.chunk_size))
+        return desc
 
     @staticmethod
     def _mean_and_variance_to_percentiles(
             calibrated_forecast_predictor, calibrated_forecast_variance,
-            percentiles):
+            percentiles, chunk_size=ECC_CHUNK_SIZE):
         """
         Function returning percentiles based on the supplied
         mean and variance. The percentiles are created by assuming a
@@ -584,10 +593,20 @@ class GeneratePercentilesFromMeanAndVariance(object):
                 Percentiles at which to calculate the value of the phenomenon
                 at.
 
+        Keyword Args:
+            chunk_size (int):
+                Maximum number of grid points to calculate the percentiles
+                for at once, which bounds the size of the temporary arrays
+                used.
+
         Returns:
             percentile_cube (Iris cube):
                 Cube containing the values for the phenomenon at each of the
-                percentiles requested.
+                percentiles requested. The data is float32, unless the mean
+                or variance is of a higher precision.
+
+        Raises:
+            ValueError: If the percent point function cannot be calculated.
 
         """
         calibrated_forecast_predictor = (
@@ -601,37 +620,37 @@ class GeneratePercentilesFromMeanAndVariance(object):
             calibrated_forecast_predictor.data.flatten())
         calibrated_forecast_variance_data = (
             calibrated_forecast_variance.data.flatten())
-
-        # Convert percentiles into fractions.
-        percentiles = [x/100.0 for x in percentiles]
-
-        result = np.zeros((len(percentiles),
-                           calibrated_forecast_predictor_data.shape[0]))
-
-        # Loop over percentiles, and use a normal distribution with the mean
-        # and variance to calculate the values at each percentile.
-        for index, percentile in enumerate(percentiles):
-            percentile_list = np.repeat(
-                percentile, len(calibrated_forecast_predictor_data))
-            result[index, :] = norm.ppf(
-                percentile_list, loc=calibrated_forecast_predictor_data,
-                scale=np.sqrt(calibrated_forecast_variance_data))
-            # If percent point function (PPF) returns NaNs, fill in
-            # mean instead of NaN values. NaN will only be generated if the
-            # variance is zero. Therefore, if the variance is zero, the mean
-            # value is used for all gridpoints with a NaN.
-            if np.any(calibrated_forecast_variance_data == 0):
-                nan_index = np.argwhere(np.isnan(result[index, :]))
-                result[index, nan_index] = (
-                    calibrated_forecast_predictor_data[nan_index])
-            if np.any(np.isnan(result)):
-                msg = ("NaNs are present within the result for the {} "
-                       "percentile. Unable to calculate the percent point "
-                       "function.")
-                raise ValueError(msg)
-
-        # Convert percentiles back into percentages.
-        percentiles = [x*100.0 for x in percentiles]
+        dtype = np.result_type(calibrated_forecast_predictor_data,
+                               calibrated_forecast_variance_data, np.float32)
+
+        # Convert percentiles into fractions, and find the values of a
+        # standard normal distribution at each percentile.
+        standard_normal_values = ndtri(
+            np.array(percentiles, dtype=dtype)/100.0)[:, np.newaxis]
+
+        result = np.empty((len(percentiles),
+                           calibrated_forecast_predictor_data.shape[0]),
+                          dtype=dtype)
+
+        # Scale and shift the standard normal values using the mean and
+        # variance at all the points within a chunk at once.
+        for start in range(0, result.shape[1], chunk_size):
+            chunk = slice(start, start + chunk_size)
+            mean = calibrated_forecast_predictor_data[chunk].astype(dtype)
+            variance = calibrated_forecast_variance_data[chunk].astype(dtype)
+            # If the variance is zero, the mean value is used for all
+            # percentiles.
+            result[:, chunk] = np.where(
+                variance == 0, mean,
+                mean + np.sqrt(variance) * standard_normal_values)
+
+        if np.any(np.isnan(result)):
+            nan_percentiles = np.array(percentiles)[
+                np.any(np.isnan(result), axis=1)]
+            msg = ("NaNs are present within the result for the {} "
+                   "percentile. Unable to calculate the percent point "
+                   "function.".format(nan_percentiles))
+            raise ValueError(msg)
 
         # Reshape forecast_at_percentiles, so the percentiles dimension is
         # first, and any other dimension coordinates follow.
@@ -683,7 +702,7 @@ class GeneratePercentilesFromMeanAndVariance(object):
             self._mean_and_variance_to_percentiles(
                 calibrated_forecast_predictor,
                 calibrated_forecast_variance,
-                percentiles))
+                percentiles, chunk_size=self.chunk_size))
 
         return calibrated_forecast_percentiles
 
@@ -694,15 +713,22 @@ class GenerateProbabilitiesFromMeanAndVariance(object):
     and variance of a distribution.
     """
 
-    def __init__(self):
+    def __init__(self, chunk_size=ECC_CHUNK_SIZE):
         """
         Initialise the class.
+
+        Keyword Args:
+            chunk_size (int):
+                Maximum number of grid points to calculate the probabilities
+                for at once, which bounds the size of the temporary arrays
+                used.
         """
-        pass
+        self.chunk_size = chunk_size
 
     def __repr__(self):
         """Represent the configured plugin instance as a string."""
-        desc = '<GenerateProbabilitiesFromMeanAndVariance>'
+        desc = ('<GenerateProbabilitiesFromMeanAndVariance: '
+                'chunk_size: {}>'.format(self.chunk_size))
         return desc
 
     @staticmethod
@@ -765,7 +791,8 @@ class GenerateProbabilitiesFromMeanAndVariance(object):
 
     @staticmethod
     def _mean_and_variance_to_probabilities(mean_values, variance_values,
-                                            probability_cube_template):
+                                            probability_cube_template,
+                                            chunk_size=ECC_CHUNK_SIZE):
         """
         Function returning probabilities relative to provided thresholds based
         on the supplied mean and variance. A Gaussian distribution is assumed.
@@ -780,6 +807,12 @@ class GenerateProbabilitiesFromMeanAndVariance(object):
                 attribute relative_to_threshold, that match the desired output
                 cube format.
 
+        Keyword Args:
+            chunk_size (int):
+                Maximum number of grid points to calculate the probabilities
+                for at once, which bounds the size of the temporary arrays
+                used.
+
         Returns:
             probability_cube (iris.cube.Cube):
                 Cube containing the data expressed as probabilities relative to
@@ -789,19 +822,40 @@ class GenerateProbabilitiesFromMeanAndVariance(object):
         thresholds = probability_cube_template.coord('threshold').points
         relative_to_threshold = (
             probability_cube_template.attributes['relative_to_threshold'])
-
-        # Loop over thresholds, and use a normal distribution with the mean
-        # and variance to calculate the probabilties relative to each
-        # threshold.
-        probabilities = np.empty_like(probability_cube_template.data)
-        distribution = norm(loc=mean_values.data,
-                            scale=np.sqrt(variance_values.data))
-        probability_method = distribution.cdf
-        if relative_to_threshold == 'above':
-            probability_method = distribution.sf
-
-        for index, threshold in enumerate(thresholds):
-            probabilities[index, ...] = probability_method(threshold)
+        dtype = np.result_type(probability_cube_template.dtype, np.float32)
+        thresholds = thresholds.astype(dtype)[:, np.newaxis]
+
+        # The probability of being above a threshold is equal to the
+        # probability of being below its reflection about the mean.
+        sign = -1 if relative_to_threshold == 'above' else 1
+
+        mean_data = mean_values.data.flatten()
+        variance_data = variance_values.data.flatten()
+        probabilities = np.empty((len(thresholds), mean_data.shape[0]),
+                                 dtype=dtype)
+
+        # Use the standard normal cumulative distribution function to
+        # calculate the probabilities relative to all thresholds at all the
+        # points within a chunk at once.
+        for start in range(0, probabilities.shape[1], chunk_size):
+            chunk = slice(start, start + chunk_size)
+            mean = mean_data[chunk].astype(dtype)
+            standard_deviation = np.sqrt(variance_data[chunk].astype(dtype))
+            zero_variance = standard_deviation == 0
+            probabilities[:, chunk] = ndtr(
+                sign * (thresholds - mean) /
+                np.where(zero_variance, 1, standard_deviation))
+            # If the variance is zero, all of the distribution is at the
+            # mean, so the probability of being below a threshold is 1 at
+            # or above the mean and 0 otherwise, and the probability of
+            # being above a threshold is the complement of this.
+            step = thresholds >= mean
+            if relative_to_threshold == 'above':
+                step = ~step
+            probabilities[:, chunk] = np.where(
+                zero_variance, step, probabilities[:, chunk])
+        probabilities = probabilities.reshape(
+            probability_cube_template.shape)
 
         probability_cube = probability_cube_template.copy(data=probabilities)
         return probability_cube
@@ -832,7 +886,8 @@ class GenerateProbabilitiesFromMeanAndVariance(object):
                                        probability_cube_template)
 
         probability_cube = self._mean_and_variance_to_probabilities(
-            mean_values, variance_values, probability_cube_template)
+            mean_values, variance_values, probability_cube_template,
+            chunk_size=self.chunk_size)
 
         return probability_cube
 
@@ -923,7 +978,8 @@ class EnsembleReordering(object):
     @staticmethod
     def rank_ecc(
             post_processed_forecast_percentiles, raw_forecast_realizations,
-            random_ordering=False, random_seed=None):
+            random_ordering=False, random_seed=None,
+            chunk_size=ECC_CHUNK_SIZE, random_data=None):
         """
         Function to apply Ensemble Copula Coupling. This ranks the
         post-processed forecast realizations based on a ranking determined from
@@ -946,6 +1002,13 @@ class EnsembleReordering(object):
                 the random seed.
                 If random_seed is None, no random seed is set, so the random
                 values generated are not reproducible.
+            chunk_size (int):
+                Maximum number of grid points to reorder at once, which
+                bounds the size of the temporary arrays used.
+            random_data (numpy.ndarray or None):
+                Random data with the shape of a single time of the raw
+                forecast realizations, used for every time instead of data
+                drawn using the random_seed.
 
         Returns:
             iris.cube.Cube:
@@ -958,32 +1021,87 @@ class EnsembleReordering(object):
         for rawfc, calfc in zip(
                 raw_forecast_realizations.slices_over("time"),
                 post_processed_forecast_percentiles.slices_over("time")):
-            if random_seed is not None:
-                random_seed = int(random_seed)
-            random_seed = np.random.RandomState(random_seed)
-            random_data = random_seed.rand(*rawfc.data.shape)
+            time_random_data = random_data
+            if time_random_data is None:
+                if random_seed is not None:
+                    random_seed = int(random_seed)
+                random_state = np.random.RandomState(random_seed)
+                time_random_data = random_state.rand(*rawfc.data.shape)
+            calfc.data = EnsembleReordering._reorder_in_chunks(
+                calfc.data, rawfc.data, time_random_data,
+                random_ordering=random_ordering, chunk_size=chunk_size)
+            results.append(calfc)
+        return concatenate_cubes(results)
+
+    @staticmethod
+    def _reorder_in_chunks(
+            post_processed_data, raw_data, random_data,
+            random_ordering=False, chunk_size=ECC_CHUNK_SIZE):
+        """
+        Reorder the post-processed data at each point, so that the ranking
+        of the values along the zeroth (probabilistic) dimension matches the
+        ranking of the raw data, with ties split using random data. The
+        points are processed in chunks to limit the size of the temporary
+        arrays, and there is no limit on the length of the probabilistic
+        dimension.
+
+        Args:
+            post_processed_data (numpy.ndarray):
+                Post-processed data, with the percentiles along the zeroth
+                dimension in ascending order.
+            raw_data (numpy.ndarray):
+                Raw data, with the same shape as the post-processed data.
+            random_data (numpy.ndarray):
+                Random data, with the same shape as the post-processed data,
+                used to split tied values in the raw data.
+
+        Keyword Args:
+            random_ordering (Logical):
+                If random_ordering is True, the post-processed data are
+                reordered using the ranking of the random data, rather than
+                that of the raw data.
+            chunk_size (int):
+                Maximum number of points to reorder at once.
+
+        Returns:
+            numpy.ndarray:
+                Reordered post-processed data, with the same shape as the
+                input post-processed data.
+        """
+        shape = post_processed_data.shape
+        n_members = shape[0]
+        post_processed_data = post_processed_data.reshape(n_members, -1)
+        raw_data = raw_data.reshape(n_members, -1)
+        random_data = random_data.reshape(n_members, -1)
+        result = post_processed_data.copy()
+        member_index = np.arange(n_members)[:, np.newaxis]
+
+        for start in range(0, post_processed_data.shape[1], chunk_size):
+            chunk = slice(start, start + chunk_size)
             if random_ordering:
                 # Returns the indices that would sort the array.
                 # As these indices are from a random dataset, only an argsort
                 # is used.
-                ranking = np.argsort(random_data, axis=0)
+                ranking = np.argsort(random_data[:, chunk], axis=0)
             else:
                 # Lexsort returns the indices sorted firstly by the
-                # primary key, the raw forecast data (unless random_ordering
-                # is enabled), and secondly by the secondary key, an array of
-                # random data, in order to split tied values randomly.
-                sorting_index = np.lexsort((random_data, rawfc.data), axis=0)
-                # Returns the indices that would sort the array.
-                ranking = np.argsort(sorting_index, axis=0)
+                # primary key, the raw forecast data, and secondly by the
+                # secondary key, an array of random data, in order to split
+                # tied values randomly.
+                sorting_index = np.lexsort(
+                    (random_data[:, chunk], raw_data[:, chunk]), axis=0)
+                # The rank of each member is the inverse of the sorting
+                # permutation.
+                ranking = np.empty_like(sorting_index)
+                np.put_along_axis(ranking, sorting_index, member_index, axis=0)
             # Index the post-processed forecast data using the ranking array.
-            # np.choose allows indexing of a 3d array using a 3d array,
-            calfc.data = np.choose(ranking, calfc.data)
-            results.append(calfc)
-        return concatenate_cubes(results)
+            result[:, chunk] = np.take_along_axis(
+                post_processed_data[:, chunk], ranking, axis=0)
+        return result.reshape(shape)
 
     def process(
             self, post_processed_forecast, raw_forecast,
-            random_ordering=False, random_seed=None):
+            random_ordering=False, random_seed=None, random_data=None):
         """
         Reorder post-processed forecast using the ordering of the
         raw ensemble.
@@ -1004,6 +1122,9 @@ class EnsembleReordering(object):
                 the random seed.
                 If random_seed is None, no random seed is set, so the random
                 values generated are not reproducible.
+            random_data (numpy.ndarray or None):
+                Random data used to split ties instead of data drawn using
+                the random_seed. See rank_ecc.
 
         Returns:
             post-processed_forecast_realizations (cube):
@@ -1034,7 +1155,7 @@ class EnsembleReordering(object):
         post_processed_forecast_realizations = self.rank_ecc(
             post_processed_forecast_percentiles, raw_forecast_realizations,
             random_ordering=random_ordering,
-            random_seed=random_seed)
+            random_seed=random_seed, random_data=random_data)
         post_processed_forecast_realizations = (
             RebadgePercentilesAsRealizations.process(
                 post_processed_forecast_realizations))
@@ -1043,3 +1164,254 @@ class EnsembleReordering(object):
             enforce_coordinate_ordering(
                 post_processed_forecast_realizations, "realization"))
         return post_processed_forecast_realizations
+
+
+class GenerateRealizationsFromProbabilitiesByTile(object):
+    """
+    Plugin to generate ensemble realizations from probabilities one spatial
+    tile at a time. Each tile is converted into percentiles, which are then
+    either rebadged as realizations or reordered using the raw ensemble,
+    before the next tile is processed.
+
+    The data of the resulting cube is lazy, so the input data for each tile
+    is only read and processed when the data is accessed, for example when
+    the cube is saved. The memory required therefore depends on the tile
+    size rather than the size of the whole domain.
+    """
+
+    def __init__(self, tile_size=ECC_TILE_SIZE, no_of_realizations=None,
+                 random_ordering=False, random_seed=None):
+        """
+        Initialise the class.
+
+        Keyword Args:
+            tile_size (int):
+                Number of grid points along each spatial axis of a tile.
+            no_of_realizations (int or None):
+                Number of realizations to generate. If None, the number of
+                thresholds within the input probabilities is used.
+            random_ordering (bool):
+                If True, the realizations are reordered randomly rather than
+                using the ordering of the raw ensemble.
+            random_seed (int or None):
+                Random seed used when reordering. The random data used to
+                split ties are drawn once for the whole grid and then split
+                into tiles, so the result matches that of reordering the
+                whole grid at once.
+
+        Raises:
+            ValueError: If the tile size is less than 1.
+        """
+        if tile_size < 1:
+            raise ValueError(
+                "The tile size must be at least 1, not {}".format(tile_size))
+        self.tile_size = tile_size
+        self.no_of_realizations = no_of_realizations
+        self.random_ordering = random_ordering
+        self.random_seed = random_seed
+
+    def __repr__(self):
+        """Represent the configured plugin instance as a string."""
+        result = ('<GenerateRealizationsFromProbabilitiesByTile: '
+                  'tile_size: {}; no_of_realizations: {}; '
+                  'random_ordering: {}; random_seed: {}>')
+        return result.format(self.tile_size, self.no_of_realizations,
+                             self.random_ordering, self.random_seed)
+
+    def _process_tile(self, forecast_probabilities, raw_forecast=None,
+                      random_data=None):
+        """
+        Generate realizations from the probabilities for a single tile.
+
+        Args:
+            forecast_probabilities (iris.cube.Cube):
+                Cube containing the probabilities for the tile.
+
+        Keyword Args:
+            raw_forecast (iris.cube.Cube or None):
+                Cube containing the raw ensemble for the tile. If None, the
+                percentiles are rebadged as realizations rather than
+                reordered.
+            random_data (numpy.ndarray or None):
+                Random data for the tile, used when reordering.
+
+        Returns:
+            iris.cube.Cube:
+                Cube containing the realizations for the tile.
+        """
+        forecast_at_percentiles = (
+            GeneratePercentilesFromProbabilities().process(
+                forecast_probabilities,
+                no_of_percentiles=self.no_of_realizations))
+        if raw_forecast is None:
+            return RebadgePercentilesAsRealizations.process(
+                forecast_at_percentiles)
+        return EnsembleReordering().process(
+            forecast_at_percentiles, raw_forecast,
+            random_ordering=self.random_ordering,
+            random_seed=self.random_seed, random_data=random_data)
+
+    def _random_data(self, template, n_rows, n_columns):
+        """
+        Draw the random data used to split ties when reordering, for the
+        whole grid at once. The same random data are used for every time,
+        as when reordering the whole grid using EnsembleReordering.
+
+        Args:
+            template (iris.cube.Cube):
+                Cube of realizations for a single grid point.
+            n_rows (int):
+                Number of grid points along the y dimension.
+            n_columns (int):
+                Number of grid points along the x dimension.
+
+        Returns:
+            numpy.ndarray:
+                Random data with the shape of a single time of the
+                realizations on the whole grid.
+        """
+        time_dims = template.coord_dims("time") if template.coords(
+            "time", dim_coords=True) else ()
+        shape = [length for dim, length in enumerate(template.shape[:-2])
+                 if dim not in time_dims]
+        random_seed = self.random_seed
+        if random_seed is not None:
+            random_seed = int(random_seed)
+        random_state = np.random.RandomState(random_seed)
+        return random_state.rand(*(shape + [n_rows, n_columns]))
+
+    def _process_tile_data(self, probability_tile, raw_tile,
+                           probability_data, raw_data, random_data):
+        """
+        Generate realizations for a tile, once the data for the tile has
+        been read.
+
+        Args:
+            probability_tile (iris.cube.Cube):
+                Cube defining the metadata of the probabilities for the tile.
+            raw_tile (iris.cube.Cube or None):
+                Cube defining the metadata of the raw ensemble for the tile.
+            probability_data (numpy.ndarray):
+                Probabilities for the tile.
+            raw_data (numpy.ndarray or None):
+                Raw ensemble data for the tile.
+            random_data (numpy.ndarray or None):
+                Random data for the tile, used when reordering.
+
+        Returns:
+            numpy.ndarray:
+                Realizations for the tile.
+        """
+        if raw_tile is not None:
+            raw_tile = raw_tile.copy(data=raw_data)
+        return self._process_tile(
+            probability_tile.copy(data=probability_data), raw_tile,
+            random_data=random_data).data
+
+    @staticmethod
+    def _extract_tile(cube, y_slice, x_slice):
+        """
+        Extract a spatial tile from a cube, without realising its data.
+
+        Args:
+            cube (iris.cube.Cube or None):
+                Cube with the y and x dimensions last.
+            y_slice (slice):
+                Slice along the y dimension.
+            x_slice (slice):
+                Slice along the x dimension.
+
+        Returns:
+            iris.cube.Cube or None:
+                The tile, or None if the input cube is None.
+        """
+        if cube is None:
+            return None
+        return cube[(Ellipsis, y_slice, x_slice)]
+
+    def process(self, forecast_probabilities, raw_forecast=None):
+        """
+        Generate realizations from probabilities, tile by tile.
+
+        Args:
+            forecast_probabilities (iris.cube.Cube):
+                Cube containing a threshold coordinate.
+
+        Keyword Args:
+            raw_forecast (iris.cube.Cube or None):
+                Cube containing the raw ensemble on the same grid as the
+                probabilities. If supplied, the realizations are reordered
+                to match the raw ensemble, otherwise the percentiles are
+                rebadged as realizations.
+
+        Returns:
+            iris.cube.Cube:
+                Cube containing the realizations with lazy data, with the
+                realization coordinate as the zeroth dimension and the y and
+                x dimensions last.
+
+        Raises:
+            ValueError:
+                If the raw forecast is not on the same grid as the
+                probabilities.
+        """
+        spatial_coords = [forecast_probabilities.coord(axis=axis).name()
+                          for axis in ["y", "x"]]
+        forecast_probabilities = enforce_coordinate_ordering(
+            forecast_probabilities, spatial_coords, anchor="end")
+        if raw_forecast is not None:
+            raw_forecast = enforce_coordinate_ordering(
+                raw_forecast, spatial_coords, anchor="end")
+            if raw_forecast.shape[-2:] != forecast_probabilities.shape[-2:]:
+                msg = ("The raw forecast with spatial shape {} must be on "
+                       "the same grid as the forecast probabilities with "
+                       "spatial shape {}".format(
+                           raw_forecast.shape[-2:],
+                           forecast_probabilities.shape[-2:]))
+                raise ValueError(msg)
+
+        # Process a single grid point to find the metadata and shape of the
+        # realizations for each tile.
+        template = self._process_tile(
+            self._extract_tile(forecast_probabilities, slice(0, 1),
+                               slice(0, 1)),
+            self._extract_tile(raw_forecast, slice(0, 1), slice(0, 1)))
+
+        n_rows, n_columns = forecast_probabilities.shape[-2:]
+        random_data = None
+        if raw_forecast is not None:
+            random_data = self._random_data(template, n_rows, n_columns)
+        process_tile_data = dask.delayed(self._process_tile_data)
+        blocks = []
+        for row in range(0, n_rows, self.tile_size):
+            y_slice = slice(row, row + self.tile_size)
+            block_row = []
+            for column in range(0, n_columns, self.tile_size):
+                x_slice = slice(column, column + self.tile_size)
+                probability_tile = self._extract_tile(
+                    forecast_probabilities, y_slice, x_slice)
+                raw_tile = self._extract_tile(raw_forecast, y_slice, x_slice)
+                raw_data = None if raw_tile is None else raw_tile.lazy_data()
+                random_tile = (None if random_data is None else
+                               random_data[..., y_slice, x_slice])
+                tile_data = process_tile_data(
+                    probability_tile, raw_tile,
+                    probability_tile.lazy_data(), raw_data, random_tile)
+                block_row.append(da.from_delayed(
+                    tile_data,
+                    template.shape[:-2] + probability_tile.shape[-2:],
+                    dtype=template.dtype))
+            blocks.append(block_row)
+
+        result = iris.cube.Cube(
+            da.block(blocks), **copy.deepcopy(template.metadata._asdict()))
+        spatial_dims = {template.ndim - 2, template.ndim - 1}
+        for coord in template.coords():
+            dims = template.coord_dims(coord)
+            if spatial_dims.intersection(dims):
+                coord = forecast_probabilities.coord(coord.name())
+            if template.coords(coord.name(), dim_coords=True):
+                result.add_dim_coord(coord.copy(), dims)
+            else:
+                result.add_aux_coord(coord.copy(), dims)
+        return result
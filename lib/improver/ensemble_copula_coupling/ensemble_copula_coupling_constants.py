@@ -74,3 +74,12 @@ BOUNDS_FOR_ECDF = {
     "temperature_at_screen_level_daytime_max": (
         Bounds((-40-ABSOLUTE_ZERO, 50-ABSOLUTE_ZERO), "Kelvin"))
 }
+
+# Maximum number of grid points for which the ensemble members are reordered
+# at once during Ensemble Copula Coupling. This bounds the size of the
+# temporary arrays required to rank the members.
+ECC_CHUNK_SIZE = 2**16
+
+# Default number of grid points along each spatial axis of the tiles used
+# when converting probabilities to realizations one spatial tile at a time.
+ECC_TILE_SIZE = 256
@@ -302,3 +302,77 @@ def restore_non_probabilistic_dimensions(
     shape_to_reshape_to = (
         [output_probabilistic_dimension_length] + shape_to_reshape_to)
     return array_to_reshape.reshape(shape_to_reshape_to)
+
+
+def interpolate_multiple_rows(x, xp, fp):
+    """
+    Perform one-dimensional linear interpolation, equivalent to np.interp,
+    independently for each row of a 2d array, using vectorised operations
+    across all rows rather than a separate call for each row. Either or both
+    of xp and fp may be 2d, with one row for each row of the output, or 1d,
+    in which case the same values are used for every row. The results are
+    identical to calling np.interp on each row.
+
+    Rows of xp that are not monotonically increasing, or that contain NaNs,
+    are interpolated using np.interp, so that the results match those of
+    np.interp even for such rows.
+
+    Args:
+        x (numpy.array):
+            1d array of the x-coordinates at which to evaluate the
+            interpolated values.
+        xp (numpy.array):
+            1d or 2d array of the x-coordinates of the data points, with the
+            data points along the last dimension.
+        fp (numpy.array):
+            1d or 2d array of the y-coordinates of the data points, with the
+            same number of data points as xp.
+
+    Returns:
+        result (numpy.array):
+            2d array of interpolated values, with a row for each row of xp or
+            fp and a column for each value of x.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    xp = np.atleast_2d(np.asarray(xp, dtype=np.float64))
+    fp = np.atleast_2d(np.asarray(fp, dtype=np.float64))
+    n_rows = max(xp.shape[0], fp.shape[0])
+    n_points = xp.shape[1]
+
+    result = np.empty((n_rows, len(x)))
+    for column, x_val in enumerate(x):
+        if np.isnan(x_val):
+            result[:, column] = x_val
+            continue
+        # Index of the last data point less than or equal to x_val, which
+        # is -1 for values below the range of the data points, and n_points-1
+        # for values at or above the end of the range. This is only
+        # calculated for each row of xp, and broadcast across the rows of fp.
+        index = np.count_nonzero(xp <= x_val, axis=1)[:, np.newaxis] - 1
+        lower = np.clip(index, 0, n_points - 2)
+        xp_lower = np.take_along_axis(xp, lower, axis=1)
+        xp_upper = np.take_along_axis(xp, lower + 1, axis=1)
+        fp_lower = np.take_along_axis(fp, lower, axis=1)
+        fp_upper = np.take_along_axis(fp, lower + 1, axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            slope = (fp_upper - fp_lower) / (xp_upper - xp_lower)
+            values = slope*(x_val - xp_lower) + fp_lower
+            # If the interpolation gives NaN in one direction, try the other.
+            retry = np.isnan(values)
+            if retry.any():
+                values = np.where(
+                    retry, slope*(x_val - xp_upper) + fp_upper, values)
+                retry &= np.isnan(values) & (fp_lower == fp_upper)
+                values = np.where(retry, fp_lower, values)
+        values = np.where(xp_lower == x_val, fp_lower, values)
+        values = np.where(index < 0, fp[:, :1], values)
+        values = np.where(index >= n_points - 1, fp[:, -1:], values)
+        result[:, column] = values[:, 0]
+
+    with np.errstate(invalid='ignore'):
+        irregular = ~np.all(np.diff(xp, axis=1) >= 0, axis=1)
+    irregular_rows, = np.nonzero(np.broadcast_to(irregular, (n_rows,)))
+    for row in irregular_rows:
+        result[row] = np.interp(x, xp[min(row, xp.shape[0] - 1)],
+                                fp[min(row, fp.shape[0] - 1)])
+    return result
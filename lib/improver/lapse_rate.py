@@ -32,53 +32,9 @@
 
 import iris
 import numpy as np
-from numpy.linalg import lstsq
 from improver.utilities.cube_manipulation import enforce_float32_precision
 from improver.constants import DALR
 
-from scipy.ndimage import generic_filter
-
-
-class SaveNeighbourhood(object):
-    """Saves the neighbourhood around each central point.
-
-    The "generic_filter" module extracts the neighbourhood around each
-    point as "buffer". This buffer is passed to the "SaveNeighbourhood" class.
-    The "filter" function then saves this buffer into the "allbuffers" array.
-
-    """
-    def __init__(self, allbuffers):
-        """Initialise the class.
-
-        Create the global variables that allows the "filter" function
-        to save each extracted buffer into "allbuffers".
-
-        """
-        # Initialises the iterator.
-        self.i = 0
-        # Saves all the buffers into this array.
-        self.allbuffers = allbuffers
-
-    def filter(self, buffer):
-        """Defines filter function to be applied to extracted buffers.
-
-        Saves the contents of the buffer into "allbuffers" array. Therefore
-        a return value isn't required. However "generic_filter"
-        requires a return value - so use zero.
-
-        Args:
-            buffer (array):
-                Array containing neighourbood points.
-
-        Returns:
-            zero (float)
-                Blank return value required by "generic_filter".
-
-        """
-        self.allbuffers[self.i, :] = buffer
-        self.i += 1
-        return 0.0
-
 
 class LapseRate(object):
     """
@@ -92,21 +48,17 @@ class LapseRate(object):
     Code methodology:
 
     1) Apply land/sea mask to temperature and orography datasets. Mask sea
-       points as NaN since image processing module does not recognise Numpy
-       masks.
-    2) Extracts neighbourhoods from both datasets:
-       Apply "generic_filter" image processing module to temperature data
-       to extract a neighbourhood for each single point and save this
-       neighbourhood into a larger array.
-       Repeat for orography data.
-       generic_filter mode="constant" ensures that points beyond edges of
-       dataset will be filled with "cval". (NaN in this case)
-    3) For all the stored orography neighbourhoods - take the neighbours around
-       the central point and create a mask where the height difference from
-       the central point is greater than 35m.
-    4) Loop through array of neighbourhoods and take the height and temperature
-       of all grid points and calculate the
-       temperature/height gradient = lapse rate
+       points as NaN.
+    2) Pad both datasets with NaN, so that points beyond the edges of the
+       dataset are not used.
+    3) For each position within the neighbourhood, shift both datasets so
+       that the neighbour at this position lines up with the central point,
+       for all grid points at once. Neighbours with a NaN temperature, or
+       where the height difference from the central point is greater than
+       35m, are not used.
+    4) Accumulate the sums needed for a least-squares fit of temperature
+       against height over the neighbours of each point, and calculate the
+       temperature/height gradient = lapse rate from these sums.
     5) Constrain the lapse rate as > DALR and < -3.0*DALR.
 
     """
@@ -146,12 +98,6 @@ class LapseRate(object):
         # central point.
         self.nbhood_size = int((2*nbhood_radius) + 1)
 
-        # generic_filter extracts the neighbourhood and returns a 1D array.
-        # ind_central_point indicates where the central point would be on
-        # this array
-        self.nbhoodarray_size = self.nbhood_size**2
-        self.ind_central_point = int(self.nbhoodarray_size/2)
-
     def __repr__(self):
         """Represent the configured plugin instance as a string."""
         desc = ('<LapseRate: max_height_diff: {}, nbhood_radius: {},'
@@ -163,78 +109,109 @@ class LapseRate(object):
     def _calc_lapse_rate(self, temperature, orography):
         """Function to calculate the lapse rate.
 
-        This holds the function to determine the local lapse rate at a point by
-        calculating a least-squares fit to local temperature and altitude data
-        to find the local lapse rate.
+        This holds the function to determine the local lapse rate at every
+        point of the grid by calculating a least-squares fit to the
+        temperature and altitude data in the neighbourhood of each point.
+
+        Rather than fitting each neighbourhood separately, the sums required
+        for the fit (count, sum(x), sum(y), sum(xy), sum(x**2), sum(y**2),
+        with x the height and y the temperature of each neighbour relative to
+        the central point) are accumulated for all grid points at once, by
+        looping over the positions within the neighbourhood. The
+        neighbourhood of each point only contains the neighbours with
+        a valid temperature and a height difference from the central point
+        less than max_height_diff, so the sums cannot be calculated from
+        moving window sums over the whole grid.
 
         Args:
-            temperature(1D np.array):
-                Contains the temperature values for the central point and its
-                neighbours.
+            temperature (2D np.array):
+                Contains the temperature values on the grid, with NaN values
+                at points that are not to be used (e.g. sea points).
 
-            orography(1D np.array):
-                Contains the height values for the central point and its
-                neighbours.
+            orography (2D np.array):
+                Contains the height values on the grid.
 
         Returns:
-            gradient (float):
-                The gradient of the temperature/orography values. This
-                represents the lapse rate.
+            gradient (2D np.array):
+                The gradient of the temperature/orography values at each
+                point. This represents the lapse rate.
 
         """
-
-        # If central point NaN then return blank value.
-        if np.isnan(temperature[self.ind_central_point]):
-            return DALR
-
-        # Remove points where there are NaN temperature values from both arrays
-        # before calculation.
-        y_data = temperature[~np.isnan(temperature)]
-        x_data = orography[~np.isnan(temperature)]
+        n_rows, n_columns = temperature.shape
+
+        # Pad both arrays with NaN so that points beyond the edges of the
+        # grid are not used.
+        padded_temperature = np.pad(
+            temperature, self.nbhood_radius, mode='constant',
+            constant_values=np.nan)
+        padded_orography = np.pad(
+            orography, self.nbhood_radius, mode='constant',
+            constant_values=np.nan)
+
+        count = np.zeros(temperature.shape)
+        sum_x = np.zeros(temperature.shape)
+        sum_y = np.zeros(temperature.shape)
+        sum_xy = np.zeros(temperature.shape)
+        sum_xx = np.zeros(temperature.shape)
+        sum_yy = np.zeros(temperature.shape)
+        for row in range(self.nbhood_size):
+            for column in range(self.nbhood_size):
+                neighbour_temperature = padded_temperature[
+                    row:row + n_rows, column:column + n_columns]
+                neighbour_orography = padded_orography[
+                    row:row + n_rows, column:column + n_columns]
+
+                # Remove neighbours with NaN temperature values, and
+                # neighbours where the height difference from the central
+                # point is greater than max_height_diff.
+                with np.errstate(invalid='ignore'):
+                    valid = (
+                        ~np.isnan(neighbour_temperature) &
+                        (np.absolute(neighbour_orography - orography) <
+                         self.max_height_diff))
+
+                # Height and temperature relative to the central point,
+                # which keeps the sums well conditioned.
+                x_data = np.where(
+                    valid, neighbour_orography.astype(np.float64) -
+                    orography, 0.0)
+                y_data = np.where(
+                    valid, neighbour_temperature.astype(np.float64) -
+                    temperature, 0.0)
+
+                count += valid
+                sum_x += x_data
+                sum_y += y_data
+                sum_xy += x_data * y_data
+                sum_xx += x_data * x_data
+                sum_yy += y_data * y_data
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean_x = sum_x / count
+            mean_y = sum_y / count
+            variance_x = np.maximum(sum_xx / count - mean_x**2, 0.0)
+            variance_y = np.maximum(sum_yy / count - mean_y**2, 0.0)
+            covariance = sum_xy / count - mean_x * mean_y
+            gradient = covariance / variance_x
+
+            # Where all the heights are the same, the least-squares problem
+            # has no unique solution, so use the minimum norm solution
+            # instead, as given by numpy.linalg.lstsq.
+            height = orography + mean_x
+            flat_gradient = height * (temperature + mean_y) / (height**2 + 1)
+
+        flat = np.isclose(np.sqrt(variance_x), 0.0)
+        gradient = np.where(flat, flat_gradient, gradient)
 
         # Return DALR if standard deviation of both datasets = 0 (where all
         # points are the same value).
-        if np.isclose(np.std(x_data), 0.0) and np.isclose(np.std(y_data), 0.0):
-            return DALR
-
-        matrix = np.stack([x_data, np.ones(len(x_data))], axis=0).T
-        gradient, _ = lstsq(matrix, y_data)[0]
-
-        return gradient
-
-    def _create_heightdiff_mask(self, all_orog_subsections):
-        """
-        Function to create a mask for any neighbouring points where the height
-        difference from the central point is greater than max_height_diff.
-
-        Slice through the orography subsection array to remove central
-        points.
-        Extracts the height value of each central point and masks out the
-        neighbouring points where their height difference is greater than
-        the maximum.
+        gradient = np.where(
+            flat & np.isclose(np.sqrt(variance_y), 0.0), DALR, gradient)
 
-        Args:
-            all_orog_subsections(2D np.array):
-               Each row contains the height values of each neighbourhood.
-
-        Returns:
-            height_diff_mask (np.ndarray):
-                A 2D array of boolean values.
-
-        """
-
-        self.all_orog_subsections = all_orog_subsections
-
-        central_points = self.all_orog_subsections[:, self.ind_central_point]
-        central_points = np.swapaxes([central_points], 0, 1)
-
-        height_diff = np.subtract(self.all_orog_subsections, central_points)
-        height_diff = np.absolute(height_diff)
-
-        height_diff_mask = np.where(height_diff >= self.max_height_diff, True,
-                                    False)
+        # If central point NaN then return blank value.
+        gradient = np.where(np.isnan(temperature), DALR, gradient)
 
-        return height_diff_mask
+        return gradient.astype(np.float32)
 
     def process(self, temperature_cube, orography_cube, land_sea_mask_cube):
         """Calculates the lapse rate from the temperature and orography cubes.
@@ -288,20 +265,10 @@ class LapseRate(object):
                                                      x_coord])).data
         land_sea_mask = next(land_sea_mask_cube.slices([y_coord,
                                                         x_coord])).data
-        # Fill sea points with NaN values.
-        orography_data = np.where(land_sea_mask, orography_data, np.nan)
-
-        # Extract data array dimensions to define output arrays.
-        dataarray_shape = next(temperature_cube.slices([y_coord,
-                                                        x_coord])).shape
-        dataarray_size = dataarray_shape[0] * dataarray_shape[1]
-
-        # Array containing all of the subsections extracted from data array.
-        # Also enforce single precision to speed up calculations.
-        all_temp_subsections = np.zeros(
-            (dataarray_size, self.nbhoodarray_size), dtype=np.float32)
-        all_orog_subsections = np.zeros(
-            (dataarray_size, self.nbhoodarray_size), dtype=np.float32)
+        # Fill sea points with NaN values. Also enforce single precision to
+        # match the temperature data.
+        orography_data = np.where(land_sea_mask, orography_data,
+                                  np.nan).astype(np.float32)
 
         # Attempts to extract realizations. If cube doesn't contain the
         # dimension then place within list.
@@ -321,45 +288,14 @@ class LapseRate(object):
 
             temperature_data = temp_slice.data
 
-            # Fill sea points with NaN values. Can't use Numpy mask since not
-            # recognised by "generic_filter" function.
+            # Fill sea points with NaN values.
             temperature_data = np.where(land_sea_mask, temperature_data,
                                         np.nan)
 
-            # Saves all neighbourhoods into "all_temp_subsections".
-            # cval is value given to points outside the array.
-            fnc = SaveNeighbourhood(allbuffers=all_temp_subsections)
-            generic_filter(temperature_data, fnc.filter,
-                           size=self.nbhood_size,
-                           mode='constant', cval=np.nan)
-
-            fnc = SaveNeighbourhood(allbuffers=all_orog_subsections)
-            generic_filter(orography_data, fnc.filter,
-                           size=self.nbhood_size,
-                           mode='constant', cval=np.nan)
-
-            # height_diff_mask is True for points where the height
-            # difference between the central point and its neighbours
-            # is > max_height_diff.
-            height_diff_mask = self._create_heightdiff_mask(
-                all_orog_subsections)
-
-            # Mask points with extreme height differences as NaN.
-            all_orog_subsections = np.where(height_diff_mask, np.nan,
-                                            all_orog_subsections)
-            all_temp_subsections = np.where(height_diff_mask, np.nan,
-                                            all_temp_subsections)
-
-            # Loop through both arrays and find gradient of each subsection.
-            # The gradient indicates lapse rate - save into another array.
-            # TODO: This for loop is the bottleneck in the code and needs to
-            # be parallelised.
-            lapse_rate_array = [self._calc_lapse_rate(temp, orog)
-                                for temp, orog in zip(all_temp_subsections,
-                                                      all_orog_subsections)]
-
-            lapse_rate_array = np.array(
-                lapse_rate_array, dtype=np.float32).reshape(dataarray_shape)
+            # Find the gradient of the temperature/height values around
+            # each point. The gradient indicates lapse rate.
+            lapse_rate_array = self._calc_lapse_rate(temperature_data,
+                                                     orography_data)
 
             # Enforces upper and lower limits on lapse rate values.
             lapse_rate_array = np.where(lapse_rate_array < self.min_lapse_rate,
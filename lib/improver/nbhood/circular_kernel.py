@@ -32,6 +32,7 @@
 
 import numpy as np
 import scipy.ndimage.filters
+import scipy.signal
 
 import iris
 
@@ -45,6 +46,15 @@ from improver.utilities.spatial import (
 # Maximum radius of the neighbourhood width in grid cells.
 MAX_RADIUS_IN_GRID_CELLS = 500
 
+# Minimum number of points within a kernel for which an FFT-based
+# correlation is faster than a direct correlation, when the correlation
+# method is chosen automatically.
+MIN_KERNEL_SIZE_FOR_FFT = 100
+
+# Default maximum memory in megabytes used to hold the values within the
+# neighbourhoods of a block of points when calculating percentiles.
+DEFAULT_MAX_MEMORY_MB = 512
+
 
 def circular_kernel(fullranges, ranges, weighted_mode):
     """
@@ -99,7 +109,7 @@ class CircularNeighbourhood(object):
     """
 
     def __init__(self, weighted_mode=True, sum_or_fraction="fraction",
-                 re_mask=False):
+                 re_mask=False, correlation_method="auto"):
         """
         Initialise class.
 
@@ -121,6 +131,13 @@ class CircularNeighbourhood(object):
                 mask is not applied. Therefore, the neighbourhood processing
                 may result in values being present in areas that were
                 originally masked.
+            correlation_method (string):
+                Identifier for the method used to apply the kernel to the
+                data. "direct" correlates the data with the kernel directly,
+                which is fastest for small kernels. "fft" uses a Fast Fourier
+                Transform, which is fastest for large kernels. "auto" chooses
+                between these based on the number of points in the kernel.
+                Valid options are "auto", "direct" or "fft".
         """
         self.weighted_mode = weighted_mode
         if sum_or_fraction not in ["sum", "fraction"]:
@@ -132,6 +149,11 @@ class CircularNeighbourhood(object):
             raise ValueError(msg)
         self.sum_or_fraction = sum_or_fraction
         self.re_mask = re_mask
+        if correlation_method not in ["auto", "direct", "fft"]:
+            msg = ("The correlation method {} is invalid. Valid options are "
+                   "'auto', 'direct' or 'fft'.".format(correlation_method))
+            raise ValueError(msg)
+        self.correlation_method = correlation_method
 
     def __repr__(self):
         """Represent the configured plugin instance as a string."""
@@ -174,9 +196,75 @@ class CircularNeighbourhood(object):
         elif self.sum_or_fraction is "sum":
             total_area = 1.0
 
-        cube.data = scipy.ndimage.filters.correlate(
-            data, kernel, mode='nearest') / total_area
-        return cube
+        if self._use_fft(data, kernel):
+            data = self.correlate_fft(data, kernel) / total_area
+        else:
+            data = scipy.ndimage.filters.correlate(
+                data, kernel, mode='nearest') / total_area
+        return cube.copy(data=data)
+
+    def _use_fft(self, data, kernel):
+        """
+        Determine whether the kernel should be applied to the data using an
+        FFT-based correlation. This is only possible for finite floating
+        point data, as otherwise the results would differ from those of a
+        direct correlation.
+
+        Args:
+            data (Numpy.array):
+                Array to which the kernel will be applied.
+            kernel (Numpy.array):
+                Kernel to be applied.
+
+        Returns:
+            boolean:
+                True if an FFT-based correlation should be used.
+        """
+        if self.correlation_method == "direct":
+            return False
+        if not (np.issubdtype(data.dtype, np.floating) and
+                np.all(np.isfinite(data))):
+            return False
+        if self.correlation_method == "fft":
+            return True
+        return np.count_nonzero(kernel) >= MIN_KERNEL_SIZE_FOR_FFT
+
+    @staticmethod
+    def correlate_fft(data, kernel):
+        """
+        Correlate the data with a kernel containing non-negative weights
+        using a Fast Fourier Transform. Points beyond the edge of the data
+        take the value of the nearest point within the data, equivalent to
+        scipy.ndimage.filters.correlate with mode='nearest'. The cost of this
+        grows only slowly with the size of the kernel.
+
+        Args:
+            data (Numpy.array):
+                Array of finite values to which the kernel will be applied.
+            kernel (Numpy.array):
+                Kernel with the same number of dimensions as the data, and
+                an odd length along each dimension.
+
+        Returns:
+            correlated (Numpy.array):
+                Array of the same shape and type as the input data.
+        """
+        data = np.asarray(data)
+        halo = [(length // 2, length // 2) for length in kernel.shape]
+        padded = np.pad(data.astype(np.float64), halo, mode='edge')
+        axes = ([axis for axis, length in enumerate(kernel.shape)
+                 if length > 1] or list(range(kernel.ndim)))
+        flipped_kernel = kernel[tuple(slice(None, None, -1)
+                                      for _ in kernel.shape)]
+        correlated = scipy.signal.fftconvolve(
+            padded, flipped_kernel, mode='valid', axes=axes)
+        # As the weights are non-negative, each result lies within the range
+        # of the data multiplied by the total weight. Clipping to this range
+        # removes small negative values from rounding errors in the FFT.
+        total_weight = np.sum(kernel)
+        np.clip(correlated, total_weight * np.min(data),
+                total_weight * np.max(data), out=correlated)
+        return correlated.astype(data.dtype)
 
     def run(self, cube, radius, mask_cube=None):
         """
@@ -222,7 +310,8 @@ class GeneratePercentilesFromACircularNeighbourhood(object):
     A maximum kernel radius of 500 grid cells is imposed in order to
     avoid computational ineffiency and possible memory errors.
     """
-    def __init__(self, percentiles=DEFAULT_PERCENTILES):
+    def __init__(self, percentiles=DEFAULT_PERCENTILES,
+                 max_memory_mb=DEFAULT_MAX_MEMORY_MB):
         """
         Initialise class.
 
@@ -230,12 +319,18 @@ class GeneratePercentilesFromACircularNeighbourhood(object):
             percentiles (list or float):
                 Percentile values at which to calculate; if not provided uses
                 DEFAULT_PERCENTILES.
+            max_memory_mb (float):
+                Approximate maximum memory in megabytes to be used to hold
+                the values within the neighbourhoods of the points being
+                processed. Rows of points are processed in blocks that fit
+                within this limit.
 
         """
         try:
             self.percentiles = tuple(percentiles)
         except TypeError:
             self.percentiles = tuple([percentiles])
+        self.max_memory_mb = max_memory_mb
 
     def __repr__(self):
         """Represent the configured class instance as a string."""
@@ -359,30 +454,69 @@ class GeneratePercentilesFromACircularNeighbourhood(object):
         ranges_xy[1] = int(np.floor(kernel.shape[1] / 2.0))
         padded = np.pad(slice_2d.data, ranges_xy, mode='mean',
                         stat_length=np.max(ranges_xy))
-        padshape = np.shape(padded)  # Store size to make unflatten easier
-        padded = padded.flatten()
-        # Add 2nd dimension with each point's neighbourhood points along it.
-        # nbhood_slices is a list of numpy arrays where each array contains the
-        # total number of points within the padded array. The number of arrays
-        # is equal to the number of points within the kernel.
-        nbhood_slices = [
-            np.roll(padded, (padshape[1]*j)+i)
-            for i in range(-ranges_xy[1], ranges_xy[1]+1)
-            for j in range(-ranges_xy[0], ranges_xy[0]+1)
-            if kernel[..., i+ranges_xy[1], j+ranges_xy[0]] > 0.]
-
-        # Collapse this dimension into percentiles (a new 2nd dimension)
-        perc_data = np.percentile(nbhood_slices, self.percentiles, axis=0)
-        # Return to 3D
-        perc_data = perc_data.reshape(
-            len(self.percentiles), padshape[0], padshape[1])
+        # Identify the points within a window of the padded array, centred
+        # on each point, that lie within the kernel.
+        in_kernel = np.zeros((2*ranges_xy[0]+1, 2*ranges_xy[1]+1), dtype=bool)
+        for i in range(-ranges_xy[1], ranges_xy[1]+1):
+            for j in range(-ranges_xy[0], ranges_xy[0]+1):
+                if kernel[..., i+ranges_xy[1], j+ranges_xy[0]] > 0.:
+                    in_kernel[ranges_xy[0]-j, ranges_xy[1]-i] = True
+        perc_data = self._percentiles_over_windows(padded, in_kernel)
         # Create a cube for these data:
         pctcube = self.make_percentile_cube(slice_2d)
-        # And put in data, removing the padding
-        pctcube.data = perc_data[:, ranges_xy[0]:-ranges_xy[0],
-                                 ranges_xy[1]:-ranges_xy[1]]
+        pctcube.data = perc_data
         return pctcube
 
+    def _percentiles_over_windows(self, padded, in_kernel):
+        """
+        Calculate percentiles over the points within a window centred on
+        each point of the unpadded domain. A strided view of the padded array
+        provides the window around each point without copying the data. The
+        values within the windows are gathered and the percentiles
+        calculated for blocks of rows, so that the memory used is limited by
+        max_memory_mb rather than growing with the number of points in the
+        kernel multiplied by the size of the domain.
+
+        Args:
+            padded (Numpy array):
+                2d array padded with a halo whose width is half the size of
+                the window in each direction.
+            in_kernel (Numpy array):
+                2d boolean array, with the shape of the window, which is True
+                for the points within the window that should be included.
+
+        Returns:
+            perc_data (Numpy array):
+                Array of the percentiles over each neighbourhood, with
+                percentile as the leading dimension followed by the
+                dimensions of the unpadded domain.
+        """
+        window_rows, window_columns = in_kernel.shape
+        n_rows = padded.shape[0] - window_rows + 1
+        n_columns = padded.shape[1] - window_columns + 1
+        windows = np.lib.stride_tricks.as_strided(
+            padded, shape=(n_rows, n_columns, window_rows, window_columns),
+            strides=padded.strides * 2, writeable=False)
+
+        # Allow for the copy of the values made by np.percentile.
+        bytes_per_row = (
+            2 * n_columns * np.count_nonzero(in_kernel) *
+            padded.dtype.itemsize)
+        block_rows = max(
+            1, int(self.max_memory_mb * 1024**2 // max(bytes_per_row, 1)))
+
+        perc_data = None
+        for start in range(0, n_rows, block_rows):
+            block = windows[start:start+block_rows][:, :, in_kernel]
+            block_percentiles = np.percentile(
+                block, self.percentiles, axis=-1)
+            if perc_data is None:
+                perc_data = np.empty(
+                    (len(self.percentiles), n_rows, n_columns),
+                    dtype=block_percentiles.dtype)
+            perc_data[:, start:start+block_rows] = block_percentiles
+        return perc_data
+
     def run(self, cube, radius, mask_cube=None):
         """
         Method to apply a circular kernel to the data within the input cube in
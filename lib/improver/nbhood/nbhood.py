@@ -30,6 +30,10 @@
 # POSSIBILITY OF SUCH DAMAGE.
 """Module containing neighbourhood processing utilities."""
 
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import copy
+
 import iris
 import numpy as np
 
@@ -40,7 +44,8 @@ from improver.nbhood.square_kernel import SquareNeighbourhood
 from improver.constants import DEFAULT_PERCENTILES
 from improver.utilities.cube_checker import (
     check_cube_coordinates, find_dimension_coordinate_mismatch)
-from improver.utilities.cube_manipulation import concatenate_cubes
+from improver.utilities.spatial import (
+    convert_distance_into_number_of_grid_cells)
 from improver.utilities.temporal import forecast_period_coord
 
 
@@ -59,7 +64,8 @@ class BaseNeighbourhoodProcessing(object):
 
     """
 
-    def __init__(self, neighbourhood_method, radii, lead_times=None):
+    def __init__(self, neighbourhood_method, radii, lead_times=None,
+                 workers=1, executor="thread"):
         """
         Create a neighbourhood processing plugin that applies a smoothing
         to points in a cube.
@@ -79,6 +85,19 @@ class BaseNeighbourhoodProcessing(object):
                 List of lead times or forecast periods, at which the radii
                 within 'radii' are defined. The lead times are expected
                 in hours.
+            workers (int):
+                Number of workers used to process the cube. If greater than
+                one, the cube is split along its longest leading dimension,
+                e.g. realization or threshold, and the parts are processed
+                concurrently. The result is identical to processing the
+                cube with a single worker.
+            executor (str):
+                The type of worker to use when workers is greater than one.
+                Options: "thread" or "process". Threads share the input data
+                in memory and are suitable for the neighbourhood methods,
+                which spend most of their time in NumPy and SciPy routines
+                that release the GIL. Processes receive a copy of the part
+                of the cube that they process.
         """
         self.neighbourhood_method = neighbourhood_method
 
@@ -93,6 +112,19 @@ class BaseNeighbourhoodProcessing(object):
                        "and the number of lead times. "
                        "Unable to continue due to mismatch.")
                 raise ValueError(msg)
+        if workers < 1:
+            msg = ("The number of workers must be at least 1, "
+                   "not {}".format(workers))
+            raise ValueError(msg)
+        self.workers = int(workers)
+        executors = {"thread": ThreadPoolExecutor,
+                     "process": ProcessPoolExecutor}
+        if executor not in executors:
+            msg = ("The executor requested: {} is not a supported "
+                   "executor. Please choose from: {}".format(
+                       executor, list(executors.keys())))
+            raise ValueError(msg)
+        self.executor = executors[executor]
 
     def _find_radii(self, cube_lead_times=None):
         """Revise radius or radii for found lead times.
@@ -114,6 +146,225 @@ class BaseNeighbourhoodProcessing(object):
         radii = np.interp(cube_lead_times, self.lead_times, self.radii)
         return radii
 
+    def _run_grouped_by_radius(self, cube, mask_cube=None):
+        """
+        Apply the neighbourhood processing method using a radius that varies
+        with lead time. The radius required at each lead time is converted
+        into a number of grid cells, and all of the times that require the
+        same number of grid cells are processed together in a single call
+        to the neighbourhood processing method. The results are written
+        directly into an output array covering all of the times.
+
+        Args:
+            cube (Iris.cube.Cube):
+                Cube to apply a neighbourhood processing method to.
+
+        Keyword Args:
+            mask_cube (Iris.cube.Cube):
+                Cube containing the array to be used as a mask.
+
+        Returns:
+            result (Iris.cube.Cube):
+                Cube after applying the neighbourhood processing method.
+        """
+        # Interpolate to find the radius at each required lead time.
+        fp_coord = forecast_period_coord(cube)
+        fp_coord.convert_units("hours")
+        required_radii = self._find_radii(cube_lead_times=fp_coord.points)
+
+        # Group the times by the number of grid cells that the radius
+        # represents, as all radii within a group give identical results.
+        # The maximum number of grid cells is checked by the neighbourhood
+        # processing method itself.
+        groups = OrderedDict()
+        for index, radius in enumerate(required_radii):
+            grid_cells = convert_distance_into_number_of_grid_cells(
+                cube, radius, np.inf)
+            groups.setdefault(grid_cells, (radius, []))[1].append(index)
+
+        time_dims = cube.coord_dims("time")
+        if len(groups) == 1 or not time_dims:
+            radius, _ = list(groups.values())[0]
+            return self.neighbourhood_method.run(
+                cube, radius, mask_cube=mask_cube)
+
+        time_dim, = time_dims
+        result = None
+        for radius, indices in groups.values():
+            cube_index = [slice(None)] * cube.ndim
+            cube_index[time_dim] = indices
+            group_result = self.neighbourhood_method.run(
+                cube[tuple(cube_index)], radius, mask_cube=mask_cube)
+            if result is None:
+                result, output_time_dim = self._create_output_cube(
+                    group_result, cube, "time")
+            self._fill_output_cube(
+                result, group_result, output_time_dim, indices)
+        return result
+
+    @staticmethod
+    def _create_output_cube(template, cube, coord_name):
+        """
+        Create a cube with the metadata and coordinates of a neighbourhood
+        processed cube that covers a subset of the points of a dimension
+        coordinate within the input cube, but extended to cover all of the
+        points of that coordinate within the input cube. The data array is
+        allocated but not filled.
+
+        Args:
+            template (Iris.cube.Cube):
+                Neighbourhood processed cube covering a subset of the points
+                of the coordinate.
+            cube (Iris.cube.Cube):
+                Cube covering all of the points of the coordinate. The
+                coordinates along this dimension will be used in the output
+                cube. Coordinates that vary along this dimension are expected
+                to vary only along this dimension.
+            coord_name (str):
+                Name of the dimension coordinate.
+
+        Returns:
+            (tuple) : tuple containing:
+                **result** (Iris.cube.Cube):
+                    Cube with an unfilled data array covering all points of
+                    the coordinate.
+                **dim** (int):
+                    Index of the coordinate's dimension within the output
+                    cube.
+        """
+        dim, = template.coord_dims(coord_name)
+        shape = list(template.shape)
+        shape[dim] = cube.coord(coord_name).shape[0]
+        result = iris.cube.Cube(
+            np.empty(shape, dtype=template.dtype),
+            **copy.deepcopy(template.metadata._asdict()))
+        for coord in template.coords():
+            coord_dims = template.coord_dims(coord)
+            if dim in coord_dims:
+                coord = cube.coord(coord.name())
+            if template.coords(coord.name(), dim_coords=True):
+                result.add_dim_coord(coord.copy(), coord_dims)
+            else:
+                result.add_aux_coord(coord.copy(), coord_dims)
+        return result, dim
+
+    @staticmethod
+    def _fill_output_cube(result, part, dim, indices):
+        """
+        Write the data from a neighbourhood processed cube into part of the
+        data array of an output cube. The output data is converted into a
+        masked array if the data being written is masked.
+
+        Args:
+            result (Iris.cube.Cube):
+                Output cube, which is modified in place.
+            part (Iris.cube.Cube):
+                Neighbourhood processed cube covering the points at the
+                given indices along the dimension of the output cube.
+            dim (int):
+                Index of the dimension along which the cube was divided.
+            indices (list or slice):
+                Indices along the dimension at which to write the data.
+        """
+        output_index = [slice(None)] * result.ndim
+        output_index[dim] = indices
+        output_index = tuple(output_index)
+        if (isinstance(part.data, np.ma.MaskedArray) and
+                not isinstance(result.data, np.ma.MaskedArray)):
+            result.data = np.ma.masked_array(
+                result.data, mask=np.zeros(result.shape, dtype=bool))
+        result.data[output_index] = part.data
+
+    def _run_neighbourhood_method(self, cube, mask_cube=None):
+        """
+        Apply the neighbourhood processing method to a cube, using the
+        radius that is appropriate for each lead time if the radii vary
+        with lead time.
+
+        Args:
+            cube (Iris.cube.Cube):
+                Cube to apply a neighbourhood processing method to.
+
+        Keyword Args:
+            mask_cube (Iris.cube.Cube):
+                Cube containing the array to be used as a mask.
+
+        Returns:
+            (Iris.cube.Cube):
+                Cube after applying the neighbourhood processing method.
+        """
+        if self.lead_times is None:
+            return self.neighbourhood_method.run(
+                cube, self.radii, mask_cube=mask_cube)
+        return self._run_grouped_by_radius(cube, mask_cube)
+
+    def _run_in_parallel(self, cube, mask_cube=None):
+        """
+        Divide the cube along its longest leading dimension coordinate,
+        e.g. realization or threshold, and apply the neighbourhood
+        processing method to each part concurrently. The results are
+        written directly into a single output cube. If the cube has no
+        leading dimension coordinate that can be divided, it is processed
+        without dividing it.
+
+        Args:
+            cube (Iris.cube.Cube):
+                Cube to apply a neighbourhood processing method to.
+
+        Keyword Args:
+            mask_cube (Iris.cube.Cube):
+                Cube containing the array to be used as a mask. If the mask
+                cube has the dimension coordinate along which the cube is
+                divided, the mask cube is divided in the same way.
+
+        Returns:
+            result (Iris.cube.Cube):
+                Cube after applying the neighbourhood processing method.
+        """
+        yx_dims = (cube.coord_dims(cube.coord(axis="y")) +
+                   cube.coord_dims(cube.coord(axis="x")))
+        candidates = [coord for coord in cube.coords(dim_coords=True)
+                      if cube.coord_dims(coord)[0] not in yx_dims and
+                      len(coord.points) > 1]
+        if not candidates:
+            return self._run_neighbourhood_method(cube, mask_cube)
+        coord = max(candidates, key=lambda coord: len(coord.points))
+        dim, = cube.coord_dims(coord)
+
+        n_parts = min(self.workers, len(coord.points))
+        bounds = np.linspace(0, len(coord.points), n_parts + 1).astype(int)
+        parts = [slice(start, stop)
+                 for start, stop in zip(bounds[:-1], bounds[1:])]
+
+        mask_dim = None
+        if mask_cube is not None and mask_cube.coords(
+                coord.name(), dim_coords=True):
+            mask_dim, = mask_cube.coord_dims(coord.name())
+
+        with self.executor(max_workers=n_parts) as executor:
+            futures = []
+            for part in parts:
+                cube_index = [slice(None)] * cube.ndim
+                cube_index[dim] = part
+                part_mask_cube = mask_cube
+                if mask_dim is not None:
+                    mask_index = [slice(None)] * mask_cube.ndim
+                    mask_index[mask_dim] = part
+                    part_mask_cube = mask_cube[tuple(mask_index)]
+                futures.append(executor.submit(
+                    self._run_neighbourhood_method,
+                    cube[tuple(cube_index)], mask_cube=part_mask_cube))
+
+            result = None
+            for part, future in zip(parts, futures):
+                part_result = future.result()
+                if result is None:
+                    result, output_dim = self._create_output_cube(
+                        part_result, cube, coord.name())
+                self._fill_output_cube(
+                    result, part_result, output_dim, part)
+        return result
+
     def __repr__(self):
         """Represent the configured plugin instance as a string."""
         if callable(self.neighbourhood_method):
@@ -153,55 +404,20 @@ class BaseNeighbourhoodProcessing(object):
                        self.neighbourhood_method))
             raise ValueError(msg)
 
-        # Check if a dimensional realization coordinate exists. If so, the
-        # cube is sliced, so that it becomes a scalar coordinate.
-        try:
-            cube.coord('realization', dim_coords=True)
-        except iris.exceptions.CoordinateNotFoundError:
-            slices_over_realization = [cube]
-        else:
-            slices_over_realization = cube.slices_over("realization")
-            if 'source_realizations' in cube.attributes:
-                msg = ("Realizations and attribute source_realizations "
-                       "should not both be set in input cube")
-                raise ValueError(msg)
+        if (cube.coords('realization', dim_coords=True) and
+                'source_realizations' in cube.attributes):
+            msg = ("Realizations and attribute source_realizations "
+                   "should not both be set in input cube")
+            raise ValueError(msg)
 
         if np.isnan(cube.data).any():
             raise ValueError("Error: NaN detected in input cube data")
 
-        cubes_real = []
-        for cube_realization in slices_over_realization:
-            if self.lead_times is None:
-                cube_new = self.neighbourhood_method.run(
-                    cube_realization, self.radii, mask_cube=mask_cube)
-            else:
-                # Interpolate to find the radius at each required lead time.
-                fp_coord = forecast_period_coord(cube_realization)
-                fp_coord.convert_units("hours")
-                required_radii = self._find_radii(
-                    cube_lead_times=fp_coord.points)
-
-                cubes_time = iris.cube.CubeList([])
-                # Find the number of grid cells required for creating the
-                # neighbourhood, and then apply the neighbourhood
-                # processing method to smooth the field.
-                for cube_slice, radius in (
-                        zip(cube_realization.slices_over("time"),
-                            required_radii)):
-                    cube_slice = self.neighbourhood_method.run(
-                        cube_slice, radius, mask_cube=mask_cube)
-                    cubes_time.append(cube_slice)
-                if len(cubes_time) > 1:
-                    cube_new = concatenate_cubes(
-                        cubes_time, coords_to_slice_over=["time"])
-                else:
-                    cube_new = cubes_time[0]
-            cubes_real.append(cube_new)
-        if len(cubes_real) > 1:
-            combined_cube = concatenate_cubes(
-                cubes_real, coords_to_slice_over=["realization"])
+        if self.workers > 1:
+            combined_cube = self._run_in_parallel(cube, mask_cube=mask_cube)
         else:
-            combined_cube = cubes_real[0]
+            combined_cube = self._run_neighbourhood_method(
+                cube, mask_cube=mask_cube)
 
         # Promote dimensional coordinates that used to be present.
         exception_coordinates = (
@@ -218,7 +434,7 @@ class GeneratePercentilesFromANeighbourhood(BaseNeighbourhoodProcessing):
 
     def __init__(
             self, neighbourhood_method, radii, lead_times=None,
-            percentiles=DEFAULT_PERCENTILES):
+            percentiles=DEFAULT_PERCENTILES, workers=1, executor="thread"):
         """
         Create a neighbourhood processing subclass that generates percentiles
         from a neighbourhood of points.
@@ -240,9 +456,16 @@ class GeneratePercentilesFromANeighbourhood(BaseNeighbourhoodProcessing):
             percentiles (list):
                 Percentile values at which to calculate; if not provided uses
                 DEFAULT_PERCENTILES.
+            workers (int):
+                Number of workers used to process the cube. See
+                BaseNeighbourhoodProcessing.
+            executor (str):
+                The type of worker to use when workers is greater than one.
+                Options: "thread" or "process".
         """
         super(GeneratePercentilesFromANeighbourhood, self).__init__(
-            neighbourhood_method, radii, lead_times=lead_times)
+            neighbourhood_method, radii, lead_times=lead_times,
+            workers=workers, executor=executor)
 
         methods = {
             "circular": GeneratePercentilesFromACircularNeighbourhood}
@@ -264,7 +487,7 @@ class NeighbourhoodProcessing(BaseNeighbourhoodProcessing):
     def __init__(
             self, neighbourhood_method, radii, lead_times=None,
             weighted_mode=True, sum_or_fraction="fraction",
-            re_mask=False):
+            re_mask=False, workers=1, executor="thread"):
         """
         Create a neighbourhood processing subclass that applies a smoothing
         to points in a cube.
@@ -302,9 +525,16 @@ class NeighbourhoodProcessing(BaseNeighbourhoodProcessing):
                 mask is not applied. Therefore, the neighbourhood processing
                 may result in values being present in areas that were
                 originally masked.
+            workers (int):
+                Number of workers used to process the cube. See
+                BaseNeighbourhoodProcessing.
+            executor (str):
+                The type of worker to use when workers is greater than one.
+                Options: "thread" or "process".
         """
         super(NeighbourhoodProcessing, self).__init__(
-            neighbourhood_method, radii, lead_times=lead_times)
+            neighbourhood_method, radii, lead_times=lead_times,
+            workers=workers, executor=executor)
 
         methods = {
             "circular": CircularNeighbourhood,
@@ -30,7 +30,6 @@
 # POSSIBILITY OF SUCH DAMAGE.
 """Module to apply a recursive filter to neighbourhooded data."""
 
-import iris
 import numpy as np
 
 from improver.nbhood.square_kernel import SquareNeighbourhood
@@ -123,28 +122,25 @@ class RecursiveFilter(object):
 
         Args:
             grid (numpy array):
-                2D array containing the input data to which the recursive
-                filter will be applied.
+                Array containing the input data to which the recursive
+                filter will be applied. The final two dimensions are the
+                spatial dimensions; any leading dimensions are filtered
+                together in a single pass.
             alphas (numpy array):
-                Matching 2D array of alpha values that will be used when
-                applying the recursive filter along the specified axis.
+                2D array of alpha values, matching the spatial dimensions of
+                the grid, that will be used when applying the recursive
+                filter along the specified axis.
             axis (integer):
-                Index of the spatial axis (0 or 1) over which to recurse.
+                Index of the spatial axis of the grid over which to recurse.
 
         Returns:
             grid (numpy array):
-                2D array containing the smoothed field after the recursive
+                Array containing the smoothed field after the recursive
                 filter method has been applied to the input array in the
                 forward direction along the specified axis.
         """
         lim = grid.shape[axis]
-        for i in range(1, lim):
-            if axis == 0:
-                grid[i, :] = ((1. - alphas[i, :]) * grid[i, :] +
-                              alphas[i, :] * grid[i-1, :])
-            if axis == 1:
-                grid[:, i] = ((1. - alphas[:, i]) * grid[:, i] +
-                              alphas[:, i] * grid[:, i-1])
+        RecursiveFilter._recurse(grid, alphas, axis, range(1, lim), -1)
         return grid
 
     @staticmethod
@@ -162,30 +158,72 @@ class RecursiveFilter(object):
 
         Args:
             grid (numpy array):
-                2D array containing the input data to which the recursive
-                filter will be applied.
+                Array containing the input data to which the recursive
+                filter will be applied. The final two dimensions are the
+                spatial dimensions; any leading dimensions are filtered
+                together in a single pass.
             alphas (numpy array):
-                Matching 2D array of alpha values that will be used when
-                applying the recursive filter along the specified axis.
+                2D array of alpha values, matching the spatial dimensions of
+                the grid, that will be used when applying the recursive
+                filter along the specified axis.
             axis (integer):
-                Index of the spatial axis (0 or 1) over which to recurse.
+                Index of the spatial axis of the grid over which to recurse.
 
         Returns:
             grid (numpy array):
-                2D array containing the smoothed field after the recursive
+                Array containing the smoothed field after the recursive
                 filter method has been applied to the input array in the
                 backwards direction along the specified axis.
         """
         lim = grid.shape[axis]
-        for i in range(lim-2, -1, -1):
-            if axis == 0:
-                grid[i, :] = ((1. - alphas[i, :]) * grid[i, :] +
-                              alphas[i, :] * grid[i+1, :])
-            if axis == 1:
-                grid[:, i] = ((1. - alphas[:, i]) * grid[:, i] +
-                              alphas[:, i] * grid[:, i+1])
+        RecursiveFilter._recurse(grid, alphas, axis, range(lim-2, -1, -1), 1)
         return grid
 
+    @staticmethod
+    def _recurse(grid, alphas, axis, indices, step):
+        """
+        Apply the recursive filter in place along one axis of the grid,
+        visiting the rows or columns in the order given. Each new row or
+        column is calculated as::
+
+            Bi = ((1-alpha) * Ai) + (alpha * Bi+step)
+
+        The products are calculated into two buffers that are allocated once
+        and reused for every step, rather than creating new temporary arrays
+        for every row or column.
+
+        Args:
+            grid (numpy array):
+                Array to be filtered in place, with the spatial dimensions as
+                the final two dimensions.
+            alphas (numpy array):
+                2D array of alpha values matching the spatial dimensions of
+                the grid.
+            axis (integer):
+                Index of the axis of the grid over which to recurse.
+            indices (range):
+                Indices along the axis of the rows or columns to be updated,
+                in the order in which they are to be updated.
+            step (integer):
+                Offset from each row or column to the previously updated row
+                or column, which is -1 in the forward direction and 1 in the
+                backward direction.
+        """
+        # Move the axis of recursion to the front, so that each row or
+        # column is a single index into these views.
+        grid_view = np.moveaxis(grid, axis, 0)
+        alphas_view = np.moveaxis(
+            alphas, axis - (grid.ndim - alphas.ndim), 0)
+        one_minus_alphas = 1. - alphas_view
+        buffer_shape = np.broadcast(grid_view[0], alphas_view[0]).shape
+        buffer_dtype = np.result_type(grid, alphas)
+        current = np.empty(buffer_shape, dtype=buffer_dtype)
+        previous = np.empty(buffer_shape, dtype=buffer_dtype)
+        for i in indices:
+            np.multiply(one_minus_alphas[i], grid_view[i], out=current)
+            np.multiply(alphas_view[i], grid_view[i+step], out=previous)
+            np.add(current, previous, out=grid_view[i], casting='unsafe')
+
     @staticmethod
     def _run_recursion(cube, alphas_x, alphas_y, iterations):
         """
@@ -211,19 +249,50 @@ class RecursiveFilter(object):
         """
         x_index, = cube.coord_dims(cube.coord(axis="x").name())
         y_index, = cube.coord_dims(cube.coord(axis="y").name())
-        output = cube.data
+        cube.data = RecursiveFilter._run_recursion_on_array(
+            cube.data, alphas_x.data, alphas_y.data, x_index, y_index,
+            iterations)
+        return cube
+
+    @staticmethod
+    def _run_recursion_on_array(data, alphas_x, alphas_y, x_index, y_index,
+                                iterations):
+        """
+        Method to run the recursive filter on an array.
+
+        Args:
+            data (numpy array):
+                Array containing the input data to which the recursive
+                filter will be applied, with the spatial dimensions as the
+                final two dimensions. Any leading dimensions, such as
+                realization or threshold, are filtered together.
+            alphas_x (numpy array):
+                2D array of alpha values that will be used when applying the
+                recursive filter along the x-axis.
+            alphas_y (numpy array):
+                2D array of alpha values that will be used when applying the
+                recursive filter along the y-axis.
+            x_index, y_index (integer):
+                Index of the x and y axes within the data.
+            iterations (integer):
+                The number of iterations of the recursive filter
 
+        Returns:
+            output (numpy array):
+                Array containing the smoothed field after the recursive
+                filter method has been applied.
+        """
+        output = data
         for _ in range(iterations):
-            output = RecursiveFilter._recurse_forward(output, alphas_x.data,
+            output = RecursiveFilter._recurse_forward(output, alphas_x,
                                                       x_index)
-            output = RecursiveFilter._recurse_backward(output, alphas_x.data,
+            output = RecursiveFilter._recurse_backward(output, alphas_x,
                                                        x_index)
-            output = RecursiveFilter._recurse_forward(output, alphas_y.data,
+            output = RecursiveFilter._recurse_forward(output, alphas_y,
                                                       y_index)
-            output = RecursiveFilter._recurse_backward(output, alphas_y.data,
+            output = RecursiveFilter._recurse_backward(output, alphas_y,
                                                        y_index)
-            cube.data = output
-        return cube
+        return output
 
     def _set_alphas(self, cube, alpha, alphas_cube):
         """
@@ -284,20 +353,17 @@ class RecursiveFilter(object):
 
         The steps undertaken are:
 
-        1. Split the input cube into slices determined by the co-ordinates in
-           the x and y directions.
-        2. Construct an array of filter parameters (alphas_x and alphas_y) for
-           each cube slice that are used to weight the recursive filter in
-           the x- and y-directions.
-        3. Pad each cube slice with a square-neighbourhood halo and apply
-           the recursive filter for the required number of iterations.
-        4. Remove the halo from the cube slice and append the recursed cube
-           slice to a 'recursed cube'.
-        5. Merge all the cube slices in the 'recursed cube' into a 'new cube'.
-        6. Modify the 'new cube' so that its scalar dimension co-ordinates are
-           consistent with those in the original input cube.
-        7. Return the 'new cube' which now contains the recursively filtered
-           values for the original input cube.
+        1. Construct an array of filter parameters (alphas_x and alphas_y)
+           for an x-y slice of the cube that are used to weight the
+           recursive filter in the x- and y-directions.
+        2. Rearrange the data so that the y and x dimensions are last,
+           allowing all of the x-y slices to be filtered together.
+        3. Set masked or NaN points to zero, pad the spatial dimensions with
+           a square-neighbourhood halo and apply the recursive filter for the
+           required number of iterations.
+        4. Remove the halo and, if required, re-apply the mask.
+        5. Return a new cube, with the same coordinates as the input cube,
+           which contains the recursively filtered values.
 
         Args:
             cube (Iris.cube.Cube):
@@ -325,33 +391,38 @@ class RecursiveFilter(object):
         alphas_x = self._set_alphas(cube_format, self.alpha_x, alphas_x)
         alphas_y = self._set_alphas(cube_format, self.alpha_y, alphas_y)
 
-        recursed_cube = iris.cube.CubeList()
-        for output in cube.slices([cube.coord(axis='y'),
-                                   cube.coord(axis='x')]):
-
-            # Setup cube and mask for processing.
-            # This should set up a mask full of 1.0 if None is provided
-            # and set the data 0.0 where mask is 0.0 or the data is NaN
-            output, mask, nan_array = (
-                SquareNeighbourhood().set_up_cubes_to_be_neighbourhooded(
-                    output, mask_cube))
-            mask = mask.data.squeeze()
-
-            padded_cube = SquareNeighbourhood().pad_cube_with_halo(
-                output, self.edge_width, self.edge_width)
-
-            new_cube = self._run_recursion(padded_cube, alphas_x, alphas_y,
-                                           self.iterations)
-            new_cube = SquareNeighbourhood().remove_halo_from_cube(
-                new_cube, self.edge_width, self.edge_width)
-            if self.re_mask:
-                new_cube.data[nan_array.astype(bool)] = np.nan
-                new_cube.data = np.ma.masked_array(new_cube.data,
-                                                   mask=np.logical_not(mask))
-
-            recursed_cube.append(new_cube)
-
-        new_cube = recursed_cube.merge_cube()
+        # Process all of the x-y slices of the cube together, with the y and
+        # x dimensions as the final two dimensions of the array.
+        yx_dims = [cube.coord_dims(cube.coord(axis=axis))[0]
+                   for axis in ['y', 'x']]
+        data = np.moveaxis(cube.data, yx_dims, [-2, -1])
+        mask_data = mask_cube.data if mask_cube is not None else None
+
+        # Setup data and mask for processing.
+        # This should set up a mask full of 1.0 if None is provided
+        # and set the data 0.0 where mask is 0.0 or the data is NaN
+        data, mask, nan_array = (
+            SquareNeighbourhood.set_up_arrays_to_be_neighbourhooded(
+                data, mask_data))
+
+        # Pad the spatial dimensions using the mean of the values at the
+        # edge, as for SquareNeighbourhood.pad_cube_with_halo.
+        width = self.edge_width
+        pad_width = [(0, 0)] * (data.ndim - 2) + [(2*width, 2*width)] * 2
+        stat_length = [(1, 1)] * (data.ndim - 2) + [(width, width)] * 2
+        padded = np.pad(data, pad_width, "mean", stat_length=stat_length)
+
+        padded = self._run_recursion_on_array(
+            padded, alphas_x.data, alphas_y.data, padded.ndim - 1,
+            padded.ndim - 2, self.iterations)
+
+        end = -2*width if width != 0 else None
+        output = padded[..., 2*width:end, 2*width:end]
+        if self.re_mask:
+            output[nan_array] = np.nan
+            output = np.ma.masked_array(output, mask=np.logical_not(mask))
+
+        new_cube = cube.copy(data=np.moveaxis(output, [-2, -1], yx_dims))
         new_cube = check_cube_coordinates(cube, new_cube)
 
         return new_cube
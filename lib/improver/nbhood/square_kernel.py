@@ -121,7 +121,7 @@ class SquareNeighbourhood(object):
         if iscomplex:
             data = cube.data.astype(complex)
         else:
-            data = cube.data.astype(np.longdouble)
+            data = cube.data.astype(np.float64)
         data_summed_along_y = np.cumsum(data, axis=0)
         data_summed_along_x = (
             np.cumsum(data_summed_along_y, axis=1))
@@ -327,6 +327,9 @@ class SquareNeighbourhood(object):
                                 n_rows, n_columns):
         """
         Fast vectorised approach to calculating neighbourhood totals.
+        The four points are taken as offset views of the flattened summed
+        array and accumulated into a single output array, so no rolled
+        copies of the summed array are created.
 
         Displacements are calculated as follows for the following input array,
         where the accumulation has occurred from top to
@@ -382,15 +385,47 @@ class SquareNeighbourhood(object):
             neighbourhood_total (np.array):
                 Array containing the calculated neighbourhood total.
         """
-        flattened = summed_cube.data.flatten()
-        ymax_xmax_array = np.roll(flattened, -ymax_xmax_disp)
-        ymin_xmax_array = np.roll(flattened, -ymin_xmax_disp)
-        ymin_xmin_array = np.roll(flattened, -ymin_xmin_disp)
-        ymax_xmin_array = np.roll(flattened, -ymax_xmin_disp)
-        neighbourhood_total = (ymax_xmax_array - ymin_xmax_array +
-                               ymin_xmin_array - ymax_xmin_array)
-        neighbourhood_total.resize(n_rows, n_columns)
-        return neighbourhood_total
+        flattened = np.ravel(summed_cube.data)
+        neighbourhood_total = np.empty_like(flattened)
+        for disp, operation in [(ymax_xmax_disp, np.copyto),
+                                (ymin_xmax_disp, np.subtract),
+                                (ymin_xmin_disp, np.add),
+                                (ymax_xmin_disp, np.subtract)]:
+            SquareNeighbourhood._apply_displaced(
+                neighbourhood_total, flattened, disp, operation)
+        return neighbourhood_total.reshape(n_rows, n_columns)
+
+    @staticmethod
+    def _apply_displaced(output, flattened, disp, operation):
+        """
+        Combine a flattened array, displaced by the number of elements
+        given, into the output array in place. This is equivalent to
+        applying the operation to the output and np.roll(flattened, -disp),
+        but uses two views of the flattened array rather than creating a
+        rolled copy.
+
+        Args:
+            output (numpy.ndarray):
+                One-dimensional output array, which is modified in place.
+            flattened (numpy.ndarray):
+                One-dimensional array of the same length as the output.
+            disp (int):
+                Displacement of the point required from each point in the
+                output array. Displacements beyond the ends of the array wrap
+                around, as for np.roll.
+            operation (function):
+                Either np.copyto to set the output from the displaced array,
+                or a numpy ufunc, such as np.add or np.subtract, to combine
+                the output with the displaced array.
+        """
+        split = len(flattened) - disp % len(flattened)
+        for output_view, input_view in [
+                (output[:split], flattened[-split:]),
+                (output[split:], flattened[:-split])]:
+            if operation is np.copyto:
+                np.copyto(output_view, input_view)
+            else:
+                operation(output_view, input_view, out=output_view)
 
     def mean_over_neighbourhood(self, summed_cube, summed_mask,
                                 cells_x, cells_y, iscomplex=False):
@@ -408,11 +443,11 @@ class SquareNeighbourhood(object):
         1. The displacements between the four points used to calculate the
            neighbourhood total sum and the central grid point are calculated.
         2. Within the function calculate_neighbourhood...
-           Four copies of the cumulate array output are flattened and rolled
-           by these displacements to align the four terms used in the
-           neighbourhood total sum calculation.
-        3. The neighbourhood total at all points can then be calculated
-           simultaneously in a single vector sum.
+           The cumulate array output is flattened and views of it, offset
+           by these displacements, are used to align the four terms used in
+           the neighbourhood total sum calculation.
+        3. The neighbourhood total at all points can then be accumulated
+           simultaneously into a single output array.
 
         Neighbourhood mean = Neighbourhood sum / Neighbourhood area
 
@@ -462,9 +497,8 @@ class SquareNeighbourhood(object):
         # Equivalent to point C in the docstring example.
         ymin_xmin_disp = (-1*(cells_y+1)*n_columns) - cells_x - 1
 
-        # Flatten the cube data and create 4 copies of the flattened
-        # array which are rolled to align the 4-points which are needed
-        # for the calculation.
+        # Flatten the cube data and use views of the flattened array, offset
+        # to align the 4-points which are needed for the calculation.
         neighbourhood_total = self.calculate_neighbourhood(
             summed_cube, ymax_xmax_disp, ymin_xmax_disp,
             ymin_xmin_disp, ymax_xmin_disp,
@@ -544,6 +578,45 @@ class SquareNeighbourhood(object):
             cube.data.dtype)
         return cube, mask, nan_array
 
+    @staticmethod
+    def set_up_arrays_to_be_neighbourhooded(data, mask_data=None):
+        """
+        Set up an array ready for neighbourhooding the data. This is
+        equivalent to set_up_cubes_to_be_neighbourhooded, but applies to
+        every x-y slice of an array at once.
+
+        Args:
+            data (numpy.ndarray or numpy.ma.MaskedArray):
+                Array with y and x as the final two dimensions that will be
+                checked for whether the data is masked or NaN.
+
+        Keyword Args:
+            mask_data (numpy.ndarray or None):
+                Array of the y and x dimensions to be used as a mask.
+
+        Returns:
+            (tuple) : tuple containing:
+                **data** (numpy.ndarray):
+                    Array with masked or NaN values set to 0.0
+                **mask** (numpy.ndarray):
+                    Mask for every x-y slice of the data with masked or NaN
+                    values set to 0.0
+                **nan_array** (numpy.ndarray):
+                    Boolean array indicating where the data was NaN.
+        """
+        if mask_data is None:
+            mask = np.ones(data.shape)
+        else:
+            mask = np.broadcast_to(
+                np.real(mask_data), data.shape).astype(np.float64)
+        if isinstance(data, np.ma.MaskedArray):
+            mask[np.ma.getmaskarray(data)] = 0.0
+            data = data.data
+        nan_array = np.isnan(data)
+        mask[nan_array] = 0.0
+        data = np.where(nan_array, 0.0, data * mask).astype(data.dtype)
+        return data, mask, nan_array
+
     def _pad_and_calculate_neighbourhood(
             self, cube, mask, grid_cells_x, grid_cells_y):
         """
@@ -638,6 +711,103 @@ class SquareNeighbourhood(object):
                                minimum_value, maximum_value))
         return neighbourhood_averaged_cube
 
+    @staticmethod
+    def _sum_over_neighbourhood(data, cells_x, cells_y):
+        """
+        Calculate the neighbourhood total at every point of an array whose
+        final two dimensions are y and x, using a summed-area table. Any
+        leading dimensions are processed together in one pass.
+
+        The data is padded with cells_y + 1 (cells_x + 1) leading rows
+        (columns) of zeros and cells_y (cells_x) trailing rows (columns) of
+        zeros and then cumulated along the y and x axes. The neighbourhood
+        total is then found from four offset views of the summed-area table
+        using the 4-point method described in calculate_neighbourhood.
+
+        Args:
+            data (numpy.ndarray):
+                Array with y and x as the final two dimensions. Masked or NaN
+                points are expected to have already been set to zero.
+            cells_x, cells_y (int):
+                The radius of the neighbourhood in grid points, in the x and y
+                directions (excluding the central grid point).
+
+        Returns:
+            neighbourhood_total (numpy.ndarray):
+                Array of the same shape as the input data containing the
+                neighbourhood total at each point.
+        """
+        n_rows, n_columns = data.shape[-2:]
+        padded = np.zeros(
+            data.shape[:-2] + (n_rows + 2*cells_y + 1,
+                               n_columns + 2*cells_x + 1),
+            dtype=data.dtype)
+        padded[..., cells_y+1:cells_y+1+n_rows,
+               cells_x+1:cells_x+1+n_columns] = data
+        np.cumsum(padded, axis=-2, out=padded)
+        np.cumsum(padded, axis=-1, out=padded)
+        neighbourhood_total = np.subtract(
+            padded[..., 2*cells_y+1:, 2*cells_x+1:],
+            padded[..., :n_rows, 2*cells_x+1:])
+        np.subtract(neighbourhood_total, padded[..., 2*cells_y+1:, :n_columns],
+                    out=neighbourhood_total)
+        np.add(neighbourhood_total, padded[..., :n_rows, :n_columns],
+               out=neighbourhood_total)
+        return neighbourhood_total
+
+    def _run_on_array(self, data, mask_data, cells_x, cells_y):
+        """
+        Apply the square neighbourhood to an array whose final two dimensions
+        are y and x, processing all of the leading dimensions at once. This
+        is equivalent to applying set_up_cubes_to_be_neighbourhooded,
+        _pad_and_calculate_neighbourhood and _remove_padding_and_mask to each
+        x-y slice in turn.
+
+        Args:
+            data (numpy.ndarray or numpy.ma.MaskedArray):
+                Array with y and x as the final two dimensions.
+            mask_data (numpy.ndarray or None):
+                Array of the y and x dimensions to be used as a mask, or None
+                if no external mask is to be applied.
+            cells_x, cells_y (int):
+                The radius of the neighbourhood in grid points, in the x and y
+                directions (excluding the central grid point).
+
+        Returns:
+            result (numpy.ndarray or numpy.ma.MaskedArray):
+                Array containing the smoothed field after the square
+                neighbourhood method has been applied.
+        """
+        data, mask, nan_array = self.set_up_arrays_to_be_neighbourhooded(
+            data, mask_data)
+
+        is_complex = np.any(np.iscomplex(data))
+        work_dtype = complex if is_complex else np.float64
+        neighbourhood_total = self._sum_over_neighbourhood(
+            data.astype(work_dtype), cells_x, cells_y)
+
+        if self.sum_or_fraction == "fraction":
+            neighbourhood_area = self._sum_over_neighbourhood(
+                mask, cells_x, cells_y)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                result = neighbourhood_total / neighbourhood_area
+                result[~np.isfinite(result)] = np.nan
+        else:
+            result = neighbourhood_total
+
+        if self.re_mask and mask.min() < 1.0:
+            result = np.ma.masked_array(result, mask=np.logical_not(mask))
+
+        # Clip the data so that values lie within the range of each of the
+        # original x-y slices.
+        if self.sum_or_fraction == "fraction":
+            minimum_value = np.nanmin(data, axis=(-2, -1), keepdims=True)
+            maximum_value = np.nanmax(data, axis=(-2, -1), keepdims=True)
+            result = np.clip(result, minimum_value, maximum_value)
+
+        result[nan_array] = np.nan
+        return result
+
     def run(self, cube, radius, mask_cube=None):
         """
         Call the methods required to apply a square neighbourhood
@@ -645,12 +815,15 @@ class SquareNeighbourhood(object):
 
         The steps undertaken are:
 
-        1. Set up cubes by determining, if the arrays are masked.
+        1. Set up the data by determining, if the arrays are masked.
         2. Pad the input array with a halo and then calculate the neighbourhood
-           of the haloed array.
+           of the haloed array using a summed-area table.
         3. Remove the halo from the neighbourhooded array and deal with a mask,
            if required.
 
+        All of the x-y slices within the cube are processed together as a
+        single array, and the output cube is built once from the input cube.
+
         Args:
             cube (Iris.cube.Cube):
                 Cube containing the array to which the square neighbourhood
@@ -668,36 +841,20 @@ class SquareNeighbourhood(object):
                 Cube containing the smoothed field after the square
                 neighbourhood method has been applied.
         """
-        # If the data is masked, the mask will be processed as well as the
-        # original_data * mask array.
-        original_attributes = cube.attributes
-        original_methods = cube.cell_methods
+        check_for_x_and_y_axes(cube)
         grid_cells_x, grid_cells_y = (
             convert_distance_into_number_of_grid_cells(
                 cube, radius, MAX_RADIUS_IN_GRID_CELLS))
-        result_slices = iris.cube.CubeList()
-        for cube_slice in cube.slices([cube.coord(axis='y'),
-                                       cube.coord(axis='x')]):
-            (cube_slice, mask, nan_array) = (
-                self.set_up_cubes_to_be_neighbourhooded(cube_slice,
-                                                        mask_cube))
-            neighbourhood_averaged_cube = (
-                self._pad_and_calculate_neighbourhood(
-                    cube_slice, mask,
-                    grid_cells_x, grid_cells_y))
-            neighbourhood_averaged_cube = (
-                self._remove_padding_and_mask(
-                    neighbourhood_averaged_cube,
-                    cube_slice, mask,
-                    grid_cells_x, grid_cells_y))
-            neighbourhood_averaged_cube.data[nan_array.astype(bool)] = np.nan
-            result_slices.append(neighbourhood_averaged_cube)
-
-        neighbourhood_averaged_cube = result_slices.merge_cube()
+        yx_dims = [cube.coord_dims(cube.coord(axis=axis))[0]
+                   for axis in ['y', 'x']]
+        data = np.moveaxis(cube.data, yx_dims, [-2, -1])
+        mask_data = mask_cube.data if mask_cube is not None else None
 
-        neighbourhood_averaged_cube.cell_methods = original_methods
-        neighbourhood_averaged_cube.attributes = original_attributes
+        result = self._run_on_array(
+            data, mask_data, grid_cells_x, grid_cells_y)
 
+        neighbourhood_averaged_cube = cube.copy(
+            data=np.moveaxis(result, [-2, -1], yx_dims))
         neighbourhood_averaged_cube = check_cube_coordinates(
             cube, neighbourhood_averaged_cube)
         return neighbourhood_averaged_cube
@@ -128,41 +128,67 @@ class AdvectField(object):
         return result
 
     @staticmethod
-    def _increment_output_array(indata, outdata, cond, xdest_grid, ydest_grid,
-                                xsrc_grid, ysrc_grid, x_weight, y_weight):
+    def _source_points(grid_vel_x, grid_vel_y, timestep):
         """
-        Calculate and add contribution to the advected array from one source
-        grid point, for all points where boolean condition "cond" is valid.
+        For each grid point on the output field, trace its (x, y) "source"
+        location backwards using advection velocities, and find the four
+        grid points surrounding the source location together with their
+        bilinear weights.  The source location is generally fractional: eg
+        with advection velocities of 0.5 grid squares per second, the value
+        at [2, 2] is represented by the value that was at [1.5, 1.5] 1 second
+        ago.
 
         Args:
-            indata (numpy.ndarray):
-                2D numpy array of source data to be advected
-            outdata (numpy.ndarray):
-                2D numpy array for advected output, modified in place by
-                this method (is both input and output).
-            cond (numpy.ndarray):
-                2D boolean mask of points to be processed
-            xdest_grid (numpy.ndarray):
-                Integer x-coordinates of all points on destination grid
-            ydest_grid (numpy.ndarray):
-                Integer y-coordinates of all points on destination grid
-            xsrc_grid (numpy.ndarray):
-                Integer x-coordinates of all points on source grid
-            ysrc_grid (numpy.ndarray):
-                Integer y-coordinates of all points on source grid
-            x_weight (numpy.ndarray):
-                Fractional contribution to destination grid of source data
-                advected along the x-axis.  Positive definite.
-            y_weight (numpy.ndarray):
-                Fractional contribution to destination grid of source data
-                advected along the y-axis.  Positive definite.
-        """
-        xdest = xdest_grid[cond]
-        ydest = ydest_grid[cond]
-        xsrc = xsrc_grid[cond]
-        ysrc = ysrc_grid[cond]
-        outdata[ydest, xdest] += (
-            indata[ysrc, xsrc]*x_weight[ydest, xdest]*y_weight[ydest, xdest])
+            grid_vel_x (numpy.ndarray):
+                2D array of velocities in the x direction (in grid points per
+                second)
+            grid_vel_y (numpy.ndarray):
+                2D array of velocities in the y direction (in grid points per
+                second)
+            timestep (float):
+                Advection time step in seconds
+
+        Returns:
+            (tuple) : tuple containing:
+                **in_bounds** (numpy.ndarray):
+                    2D boolean array which is True where the source location
+                    lies within the bounds of the field.
+                **sources** (list of tuple):
+                    List of four tuples, one for each grid point surrounding
+                    the source locations, each containing a 2D array of
+                    indices into the flattened field and 2D arrays of the x
+                    and y weights.  Where the surrounding grid point lies
+                    outside of the field, the index is one beyond the last
+                    point of the flattened field.
+        """
+        ydim, xdim = grid_vel_x.shape
+        xsrc_point_frac = -grid_vel_x * timestep + np.arange(xdim, dtype=float)
+        ysrc_point_frac = (-grid_vel_y * timestep +
+                           np.arange(ydim, dtype=float)[:, np.newaxis])
+        in_bounds = ((xsrc_point_frac >= 0.) & (xsrc_point_frac < xdim) &
+                     (ysrc_point_frac >= 0.) & (ysrc_point_frac < ydim))
+
+        # Find the integer points surrounding the fractional source
+        # coordinates, and the distance-weighted fractional contribution of
+        # each.  Points with a source location outside of the field are set
+        # to the first grid point, so that all indices are valid; these are
+        # replaced with np.nan later.
+        xsrc_point_lower = np.where(in_bounds, xsrc_point_frac, 0).astype(int)
+        ysrc_point_lower = np.where(in_bounds, ysrc_point_frac, 0).astype(int)
+        x_weight_upper = xsrc_point_frac - xsrc_point_lower.astype(float)
+        y_weight_upper = ysrc_point_frac - ysrc_point_lower.astype(float)
+
+        out_of_field = xdim * ydim
+        sources = []
+        for xoffset, xwt in zip([0, 1], [1. - x_weight_upper, x_weight_upper]):
+            for yoffset, ywt in zip([0, 1],
+                                    [1. - y_weight_upper, y_weight_upper]):
+                xpt = xsrc_point_lower + xoffset
+                ypt = ysrc_point_lower + yoffset
+                index = np.where((xpt < xdim) & (ypt < ydim),
+                                 ypt * xdim + xpt, out_of_field)
+                sources.append((index, xwt, ywt))
+        return in_bounds, sources
 
     def _advect_field(self, data, grid_vel_x, grid_vel_y, timestep):
         """
@@ -171,9 +197,16 @@ class AdvectField(object):
         cannot be extrapolated (ie the source is out of bounds) are given a
         fill value of np.nan and masked.
 
+        Each output point is a bilinear combination of the four grid points
+        surrounding its source location, gathered in a single indexing
+        operation per surrounding point.  Fields stacked along leading
+        dimensions (eg several ensemble members) are advected together using
+        the same source locations.
+
         Args:
             data (numpy.ndarray or numpy.ma.MaskedArray):
-                2D numpy data array to be advected
+                Numpy data array to be advected, with the spatial y and x
+                dimensions last
             grid_vel_x (numpy.ndarray):
                 Velocity in the x direction (in grid points per second)
             grid_vel_y (numpy.ndarray):
@@ -183,46 +216,11 @@ class AdvectField(object):
 
         Returns:
             adv_field (numpy.ma.MaskedArray):
-                2D float array of advected data values with masked "no data"
-                regions
-        """
-        # Initialise advected field with np.nan
-        adv_field = np.full(data.shape, np.nan)
-
-        # Set up grids of data coordinates (meshgrid inverts coordinate order)
-        ydim, xdim = data.shape
-        (xgrid, ygrid) = np.meshgrid(np.arange(xdim),
-                                     np.arange(ydim))
-
-        # For each grid point on the output field, trace its (x,y) "source"
-        # location backwards using advection velocities.  The source location
-        # is generally fractional: eg with advection velocities of 0.5 grid
-        # squares per second, the value at [2, 2] is represented by the value
-        # that was at [1.5, 1.5] 1 second ago.
-        xsrc_point_frac = -grid_vel_x * timestep + xgrid.astype(float)
-        ysrc_point_frac = -grid_vel_y * timestep + ygrid.astype(float)
-
-        # For all the points where fractional source coordinates are within
-        # the bounds of the field, set the output field to 0
-        def point_in_bounds(x, y, nx, ny):
-            """Check point (y, x) lies within defined bounds"""
-            return (x >= 0.) & (x < nx) & (y >= 0.) & (y < ny)
-
-        cond_pt = point_in_bounds(xsrc_point_frac, ysrc_point_frac, xdim, ydim)
-        adv_field[cond_pt] = 0
-
-        # Find the integer points surrounding the fractional source coordinates
-        xsrc_point_lower = xsrc_point_frac.astype(int)
-        ysrc_point_lower = ysrc_point_frac.astype(int)
-        x_points = [xsrc_point_lower, xsrc_point_lower + 1]
-        y_points = [ysrc_point_lower, ysrc_point_lower + 1]
-
-        # Calculate the distance-weighted fractional contribution of points
-        # surrounding the source coordinates
-        x_weight_upper = xsrc_point_frac - xsrc_point_lower.astype(float)
-        y_weight_upper = ysrc_point_frac - ysrc_point_lower.astype(float)
-        x_weights = [1. - x_weight_upper, x_weight_upper]
-        y_weights = [1. - y_weight_upper, y_weight_upper]
+                Float array of advected data values with masked "no data"
+                regions, with the same shape as the input data
+        """
+        in_bounds, sources = self._source_points(
+            grid_vel_x, grid_vel_y, timestep)
 
         # Check whether the input data is masked - if so substitute NaNs for
         # the masked data.  Note there is an implicit type conversion here: if
@@ -230,50 +228,65 @@ class AdvectField(object):
         if isinstance(data, np.ma.MaskedArray):
             data = np.where(data.mask, np.nan, data.data)
 
+        # Flatten the spatial dimensions, and append a zero value which is
+        # used for surrounding points that lie outside of the field.
+        flat_data = np.zeros(data.shape[:-2] + (in_bounds.size + 1,),
+                             dtype=data.dtype)
+        flat_data[..., :-1] = data.reshape(data.shape[:-2] + (-1,))
+
         # Advect data from each of the four source points onto the output grid
-        for xpt, xwt in zip(x_points, x_weights):
-            for ypt, ywt in zip(y_points, y_weights):
-                cond = point_in_bounds(xpt, ypt, xdim, ydim) & cond_pt
-                self._increment_output_array(
-                    data, adv_field, cond, xgrid, ygrid, xpt, ypt, xwt, ywt)
+        adv_field = None
+        for index, xwt, ywt in sources:
+            contribution = np.take(flat_data, index, axis=-1) * xwt * ywt
+            if adv_field is None:
+                adv_field = contribution
+            else:
+                adv_field += contribution
+        adv_field[..., ~in_bounds] = np.nan
 
         # Replace NaNs with a mask
         adv_field = np.ma.masked_where(~np.isfinite(adv_field), adv_field)
 
         return adv_field
 
-    def process(self, cube, timestep):
+    def _check_grid(self, cube):
         """
-        Extrapolates input cube data and updates validity time.  The input
-        cube should have precisely two non-scalar dimension coordinates
-        (spatial x/y), and is expected to be in a projection such that grid
-        spacing is the same (or very close) at all points within the spatial
-        domain.  The input cube should also have a "time" coordinate.
+        Check the spatial coordinates of a cube match those of the
+        advection velocities, and raise a warning if its data contains
+        unmasked NaNs.
 
         Args:
             cube (iris.cube.Cube):
-                The 2D cube containing data to be advected
-            timestep (datetime.timedelta):
-                Advection time step
+                Cube containing data to be advected
 
-        Returns:
-            advected_cube (iris.cube.Cube):
-                New cube with updated time and extrapolated data.  New data
-                are filled with np.nan and masked where source data were
-                out of bounds (ie where data could not be advected from outside
-                the cube domain).
+        Raises:
+            InvalidCubeError if the spatial coordinates do not match
         """
-        # check that the input cube has precisely two non-scalar dimension
-        # coordinates (spatial x/y) and a scalar time coordinate
-        check_input_coords(cube, require_time=True)
-
-        # check spatial coordinates match those of plugin velocities
         if (cube.coord(axis="x") != self.x_coord or
                 cube.coord(axis="y") != self.y_coord):
             raise InvalidCubeError("Input data grid does not match advection "
                                    "velocities")
 
-        # derive velocities in "grid squares per second"
+        # raise a warning if data contains unmasked NaNs
+        nan_count = np.count_nonzero(~np.isfinite(cube.data))
+        if nan_count > 0:
+            warnings.warn("input data contains unmasked NaNs")
+
+    def _grid_velocities(self, cube):
+        """
+        Derive velocities in "grid squares per second" on the grid of a cube.
+
+        Args:
+            cube (iris.cube.Cube):
+                Cube containing data to be advected
+
+        Returns:
+            (tuple) : tuple containing:
+                **grid_vel_x** (numpy.ndarray):
+                    Velocity in the x direction (in grid points per second)
+                **grid_vel_y** (numpy.ndarray):
+                    Velocity in the y direction (in grid points per second)
+        """
         def grid_spacing(coord):
             """Calculate grid spacing along a given spatial axis"""
             new_coord = coord.copy()
@@ -282,15 +295,26 @@ class AdvectField(object):
 
         grid_vel_x = self.vel_x.data / grid_spacing(cube.coord(axis="x"))
         grid_vel_y = self.vel_y.data / grid_spacing(cube.coord(axis="y"))
+        return grid_vel_x, grid_vel_y
 
-        # raise a warning if data contains unmasked NaNs
-        nan_count = np.count_nonzero(~np.isfinite(cube.data))
-        if nan_count > 0:
-            warnings.warn("input data contains unmasked NaNs")
+    @staticmethod
+    def _create_advected_cube(cube, advected_data, timestep):
+        """
+        Create a cube containing advected data, with its validity time
+        incremented by the time step and a "forecast_period" coordinate.
 
-        # perform advection and create output cube
-        advected_data = self._advect_field(cube.data, grid_vel_x, grid_vel_y,
-                                           timestep.total_seconds())
+        Args:
+            cube (iris.cube.Cube):
+                Cube containing the data before advection
+            advected_data (numpy.ndarray):
+                Advected data, with the same shape as the cube data
+            timestep (datetime.timedelta):
+                Advection time step
+
+        Returns:
+            advected_cube (iris.cube.Cube):
+                New cube with updated time and advected data
+        """
         advected_cube = cube.copy(data=advected_data)
 
         # increment output cube time and add a "forecast_period" coordinate
@@ -312,6 +336,122 @@ class AdvectField(object):
 
         return advected_cube
 
+    def process(self, cube, timestep):
+        """
+        Extrapolates input cube data and updates validity time.  The input
+        cube should have precisely two non-scalar dimension coordinates
+        (spatial x/y), and is expected to be in a projection such that grid
+        spacing is the same (or very close) at all points within the spatial
+        domain.  The input cube should also have a "time" coordinate.
+
+        Args:
+            cube (iris.cube.Cube):
+                The 2D cube containing data to be advected
+            timestep (datetime.timedelta):
+                Advection time step
+
+        Returns:
+            advected_cube (iris.cube.Cube):
+                New cube with updated time and extrapolated data.  New data
+                are filled with np.nan and masked where source data were
+                out of bounds (ie where data could not be advected from outside
+                the cube domain).
+        """
+        # check that the input cube has precisely two non-scalar dimension
+        # coordinates (spatial x/y) and a scalar time coordinate
+        check_input_coords(cube, require_time=True)
+        self._check_grid(cube)
+        grid_vel_x, grid_vel_y = self._grid_velocities(cube)
+
+        # perform advection and create output cube
+        advected_data = self._advect_field(cube.data, grid_vel_x, grid_vel_y,
+                                           timestep.total_seconds())
+        return self._create_advected_cube(cube, advected_data, timestep)
+
+    def iterate_sequence(self, cube, timesteps):
+        """
+        Extrapolates input cube data to a sequence of time steps, yielding
+        each extrapolated cube as soon as it has been calculated so that only
+        one lead time is held in memory at once.  The input cube should have
+        spatial y and x as its last two dimensions, and a scalar "time"
+        coordinate.  Any leading dimensions (eg realization) are advected
+        together, using source locations calculated once for each time step.
+
+        Args:
+            cube (iris.cube.Cube):
+                Cube containing data to be advected
+            timesteps (list of datetime.timedelta):
+                Advection time steps, each measured from the validity time of
+                the input cube
+
+        Yields:
+            advected_cube (iris.cube.Cube):
+                New cube with updated time and extrapolated data for each
+                time step in turn.  New data are filled with np.nan and
+                masked where source data were out of bounds.
+        """
+        try:
+            check_for_x_and_y_axes(cube)
+        except ValueError as msg:
+            raise InvalidCubeError(msg)
+        if (cube.coord_dims(cube.coord(axis="y")) != (cube.ndim - 2,) or
+                cube.coord_dims(cube.coord(axis="x")) != (cube.ndim - 1,)):
+            raise InvalidCubeError("Input cube must have spatial y and x as "
+                                   "its last two dimensions")
+        try:
+            time_coord = cube.coord("time")
+        except CoordinateNotFoundError:
+            raise InvalidCubeError('Input cube has no time coordinate')
+        if cube.coord_dims(time_coord):
+            raise InvalidCubeError('Input cube must have a scalar time '
+                                   'coordinate')
+
+        self._check_grid(cube)
+        grid_vel_x, grid_vel_y = self._grid_velocities(cube)
+
+        for timestep in timesteps:
+            advected_data = self._advect_field(
+                cube.data, grid_vel_x, grid_vel_y, timestep.total_seconds())
+            yield self._create_advected_cube(cube, advected_data, timestep)
+
+    def extrapolate_sequence(self, cube, timesteps):
+        """
+        Extrapolates input cube data to a sequence of time steps, returning a
+        single cube with a time dimension.  See iterate_sequence for the
+        requirements of the input cube.
+
+        Args:
+            cube (iris.cube.Cube):
+                Cube containing data to be advected
+            timesteps (list of datetime.timedelta):
+                Advection time steps, each measured from the validity time of
+                the input cube, in strictly increasing order
+
+        Returns:
+            advected_cube (iris.cube.Cube):
+                Cube with a leading time dimension, ordered by increasing
+                time, with a "forecast_period" auxiliary coordinate along the
+                time dimension.
+
+        Raises:
+            ValueError: If the time steps are not in strictly increasing
+                order.
+        """
+        if any(later <= earlier
+               for earlier, later in zip(timesteps[:-1], timesteps[1:])):
+            raise ValueError('Time steps must be unique and in increasing '
+                             'order; got {}'.format(
+                                 [str(timestep) for timestep in timesteps]))
+        advected_cubes = iris.cube.CubeList(
+            self.iterate_sequence(cube, timesteps))
+        if len(advected_cubes) == 1:
+            advected_cube = iris.util.new_axis(advected_cubes[0], "time")
+            forecast_period = advected_cube.coord("forecast_period")
+            advected_cube.remove_coord(forecast_period)
+            advected_cube.add_aux_coord(forecast_period, 0)
+            return advected_cube
+        return advected_cubes.merge_cube()
+
 
 class OpticalFlow(object):
     """
@@ -460,20 +600,48 @@ class OpticalFlow(object):
                     each listed box.
         """
         boxes = []
-        weights = []
-        weighting_factor = 0.5 / self.boxsize**2.
         for i in range(0, field.shape[0], self.boxsize):
             for j in range(0, field.shape[1], self.boxsize):
                 boxes.append(field[i:i+self.boxsize, j:j+self.boxsize])
-                weight = weighting_factor*(
-                    (self.data1[i:i+self.boxsize, j:j+self.boxsize]).sum() +
-                    (self.data2[i:i+self.boxsize, j:j+self.boxsize]).sum())
-                weight = 1. - np.exp(-1.*weight/0.8)
-                weights.append(weight)
-        weights = np.array(weights)
-        weights[weights < 0.01] = 0
+        weights = self._box_weights().flatten()
         return boxes, weights
 
+    def _box_sum(self, field):
+        """
+        Sum a field over non-overlapping "boxes" of size self.boxsize**2.  The
+        final boxes along each axis are smaller if the size of the data field
+        is not an exact multiple of "boxsize".
+
+        Args:
+            field (np.ndarray):
+                2D input field
+
+        Returns:
+            box_sum (np.ndarray):
+                2D array of sums over each box, on the box grid
+        """
+        box_shape = [-(-length // self.boxsize) for length in field.shape]
+        padded = np.zeros([length * self.boxsize for length in box_shape])
+        padded[:field.shape[0], :field.shape[1]] = field
+        return padded.reshape(box_shape[0], self.boxsize,
+                              box_shape[1], self.boxsize).sum(axis=(1, 3))
+
+    def _box_weights(self):
+        """
+        Calculate the weight of each box on the box grid, based on data
+        values at times 1 and 2.
+
+        Returns:
+            weights (np.ndarray):
+                2D array of weights on the box grid
+        """
+        weighting_factor = 0.5 / self.boxsize**2.
+        weight = weighting_factor*(
+            self._box_sum(self.data1) + self._box_sum(self.data2))
+        weights = 1. - np.exp(-1.*weight/0.8)
+        weights[weights < 0.01] = 0
+        return weights
+
     def _box_to_grid(self, box_data):
         """
         Regrids calculated displacements from "box grid" (on which OFC
@@ -677,6 +845,43 @@ class OpticalFlow(object):
             velocity = -m_inverted.dot(scale)[:, 0]
         return velocity
 
+    @staticmethod
+    def solve_for_uv_on_boxes(deriv_xx, deriv_xy, deriv_yy, deriv_xt,
+                              deriv_yt):
+        """
+        Solve the systems of linear simultaneous equations for u and v on all
+        boxes at once, given the sums over each box of the products of the
+        partial field derivatives (equation 19 in STEPS document).  Each 2x2
+        system is inverted directly.  Where a system is singular, eg in the
+        presence of too many zeroes, the displacements are set to 0.
+
+        Args:
+            deriv_xx (np.ndarray):
+                Sum over each box of (d/dx)**2
+            deriv_xy (np.ndarray):
+                Sum over each box of (d/dx)*(d/dy)
+            deriv_yy (np.ndarray):
+                Sum over each box of (d/dy)**2
+            deriv_xt (np.ndarray):
+                Sum over each box of (d/dx)*(d/dt)
+            deriv_yt (np.ndarray):
+                Sum over each box of (d/dy)*(d/dt)
+
+        Returns:
+            (tuple) : tuple containing:
+                **umat** (np.ndarray):
+                    Array of displacements in the x-direction on each box
+                **vmat** (np.ndarray):
+                    Array of displacements in the y-direction on each box
+        """
+        determinant = deriv_xx * deriv_yy - deriv_xy * deriv_xy
+        invertible = determinant != 0
+        inverse_det = np.zeros_like(determinant)
+        inverse_det[invertible] = 1. / determinant[invertible]
+        umat = -(deriv_yy * deriv_xt - deriv_xy * deriv_yt) * inverse_det
+        vmat = -(deriv_xx * deriv_yt - deriv_xy * deriv_xt) * inverse_det
+        return umat, vmat
+
     @staticmethod
     def extreme_value_check(umat, vmat, weights):
         """
@@ -719,39 +924,24 @@ class OpticalFlow(object):
                     2D array of displacements in the y-direction
         """
 
-        # (a) Generate lists of subboxes over which velocity is constant
-        dx_boxed, box_weights = self._make_subboxes(partial_dx)
-        dy_boxed, _ = self._make_subboxes(partial_dy)
-        dt_boxed, _ = self._make_subboxes(partial_dt)
-
-        # (b) Solve optical flow displacement calculation on each subbox
-        velocity = ([], [])
-        for deriv_x, deriv_y, deriv_t in zip(dx_boxed, dy_boxed, dt_boxed):
-
-            # Flatten arrays to create the system of linear simultaneous
-            # equations to solve for this subbox
-            deriv_x = deriv_x.flatten()
-            deriv_y = deriv_y.flatten()
-            deriv_t = deriv_t.flatten()
-            deriv_xy = (np.array([deriv_x, deriv_y])).transpose()
-
-            # Solve equations for u and v through matrix inversion
-            u, v = self.solve_for_uv(deriv_xy, deriv_t)
-            velocity[0].append(u)
-            velocity[1].append(v)
+        # (a) Sum the terms of the normal equations over each subbox, over
+        #     which velocity is constant
+        deriv_xx = self._box_sum(partial_dx * partial_dx)
+        deriv_xy = self._box_sum(partial_dx * partial_dy)
+        deriv_yy = self._box_sum(partial_dy * partial_dy)
+        deriv_xt = self._box_sum(partial_dx * partial_dt)
+        deriv_yt = self._box_sum(partial_dy * partial_dt)
 
-        # (c) Reshape displacement arrays to match array of subbox points
-        newshape = [int((self.shape[0]-1)/self.boxsize) + 1,
-                    int((self.shape[1]-1)/self.boxsize) + 1]
-        umat = np.array(velocity[0]).reshape(newshape)
-        vmat = np.array(velocity[1]).reshape(newshape)
-        weights = box_weights.reshape(newshape)
+        # (b) Solve optical flow displacement calculation on all subboxes
+        umat, vmat = self.solve_for_uv_on_boxes(
+            deriv_xx, deriv_xy, deriv_yy, deriv_xt, deriv_yt)
+        weights = self._box_weights()
 
-        # (d) Check for extreme advection displacements (over a significant
+        # (c) Check for extreme advection displacements (over a significant
         #     proportion of the domain size) and set to zero
         self.extreme_value_check(umat, vmat, weights)
 
-        # (e) smooth and reshape displacement arrays to match input data grid
+        # (d) smooth and reshape displacement arrays to match input data grid
         umat = self._smooth_advection_fields(umat, weights)
         vmat = self._smooth_advection_fields(vmat, weights)
 
@@ -222,6 +222,68 @@ def node_edge_check(node_list, cube):
     return node_list.tolist()
 
 
+def nearest_n_neighbours_windows(neighbours, no_neighbours, cube):
+    """
+    Returns arrays of the grid indices of the no_neighbours points about the
+    nearest neighbour of every site at once. The points about each site are
+    ordered as in the list returned by nearest_n_neighbours.
+
+    As in node_edge_check, points about edgepoint neighbours that overspill
+    the domain are wrapped if the cube's coordinate is circular, and are
+    otherwise marked as invalid. Invalid points are given the indices of the
+    nearest neighbour so that the arrays may still be used for indexing.
+
+    Args:
+        neighbours (numpy.array):
+            Array of neighbouring grid points that are associated with sites;
+            (fields: i, j, dz, edgepoint).
+
+        no_neighbours (int):
+            No. of neighbours to return for each site (9, 25, 49, etc).
+
+        cube (iris.cube.Cube):
+            A cube containing the grid from which the i,j coordinates have been
+            selected, and which will be used to determine if these points fall
+            on the edge of the domain.
+
+    Returns:
+        (tuple): tuple containing:
+            **i_nodes** (numpy.array):
+                Array of shape (n_sites, no_neighbours) of the i indices of
+                the points about each site.
+            **j_nodes** (numpy.array):
+                Array of shape (n_sites, no_neighbours) of the j indices of
+                the points about each site.
+            **valid** (numpy.array):
+                Boolean array of shape (n_sites, no_neighbours) that is False
+                for points that have been discarded.
+
+    """
+    i_sites = neighbours['i'][:, np.newaxis]
+    j_sites = neighbours['j'][:, np.newaxis]
+    edgepoints = neighbours['edgepoint'][:, np.newaxis]
+
+    i_offsets, j_offsets = np.array(nearest_n_neighbours(0, 0, no_neighbours))
+    i_nodes = i_sites + i_offsets
+    j_nodes = j_sites + j_offsets
+    valid = np.ones(i_nodes.shape, dtype=bool)
+
+    for nodes, coord in [(i_nodes, 'y'), (j_nodes, 'x')]:
+        coord_max = cube.coord(axis=coord).shape[0]
+        circular = cube.coord(axis=coord).circular
+        max_nodes = edgepoints & (nodes >= coord_max)
+        min_nodes = edgepoints & (nodes < 0)
+        if circular:
+            nodes[min_nodes] += coord_max
+            nodes[max_nodes] -= coord_max
+        else:
+            valid[min_nodes | max_nodes] = False
+
+    i_nodes = np.where(valid, i_nodes, i_sites)
+    j_nodes = np.where(valid, j_nodes, j_sites)
+    return i_nodes, j_nodes, valid
+
+
 def index_of_minimum_difference(whole_list, subset_list=None):
     """
     Returns the index of the minimum value in a list.
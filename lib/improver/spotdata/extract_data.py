@@ -35,14 +35,13 @@ import warnings
 import copy
 
 import numpy as np
-from numpy.linalg import lstsq
 import iris
 from iris.coords import AuxCoord
 from iris.cube import Cube
 from iris.exceptions import CoordinateNotFoundError
 
-from improver.spotdata.common_functions import (nearest_n_neighbours,
-                                                node_edge_check)
+from improver.spotdata.common_functions import (
+    nearest_n_neighbours_windows)
 from improver.constants import (R_DRY_AIR,
                                 CP_DRY_AIR)
 from improver.utilities.cube_manipulation import (
@@ -195,6 +194,8 @@ class ExtractData(object):
 
             data (numpy.array):
                 Array of diagnostic values extracted for the defined sites.
+                This may include a leading time dimension if the values have
+                been extracted for all the times of the cube at once.
 
             sites (OrderedDict):
                 A dictionary containing the properties of spotdata sites.
@@ -261,8 +262,10 @@ class ExtractData(object):
         # Copy other cube metadata.
         metadata_dict = copy.deepcopy(cube.metadata._asdict())
 
-        # Add leading dimension for time to the data array.
-        data = np.expand_dims(data, axis=0)
+        # Add leading dimension for time to the data array, unless the data
+        # have been extracted for all times of the cube.
+        if data.ndim < n_dim_coords:
+            data = np.expand_dims(data, axis=0)
         result_cube = Cube(data,
                            dim_coords_and_dims=dim_coords,
                            aux_coords_and_dims=aux_coords,
@@ -306,7 +309,8 @@ class ExtractData(object):
         Crude lapse rate method that uses temperature variation and height
         variation across local nodes to derive lapse rate. Temperature vs.
         height data points are fitted with a least-squares method to determine
-        the gradient.
+        the gradient. The fits for all sites, and all times within the cube,
+        are calculated at once.
 
         This method is highly prone to noise given the small number of points
         involved and the variable degree to which elevation changes across
@@ -314,7 +318,8 @@ class ExtractData(object):
 
         Args:
             cube (iris.cube.Cube):
-                A cube of screen level temperatures at a single time.
+                A cube of screen level temperatures at a single time, or with
+                a leading time dimension.
 
             sites/neighbours/no_neighbours : See process() above.
 
@@ -330,39 +335,49 @@ class ExtractData(object):
                 variations in temperature with orography.
 
         """
-        def _local_lapse_rate(cube, orography, node_list):
-            """
-            Least-squares fit to local temperature and altitude data for grid
-            points defined by node_list to calculate a local lapse rate.
-
-            """
-            y_data = cube.data[node_list]
-            x_data = orography[node_list]
-            matrix = np.stack([x_data, np.ones(len(x_data))], axis=0).T
-            gradient, intercept = lstsq(matrix, y_data)[0]
-            return [gradient, intercept]
-
-        data = np.empty(shape=(len(sites)), dtype=float)
-
-        for i_site, site in enumerate(sites.values()):
-            i, j = neighbours['i'][i_site], neighbours['j'][i_site]
-
-            altitude = site['altitude']
-            if np.isnan(altitude):
-                msg = ('orography_derived_temperature_lapse_rate method '
-                       'requires site to have an altitude. Leaving value '
-                       'unchanged.')
-                warnings.warn(msg)
-                data[i_site] = cube.data[i, j]
-                continue
-
-            edgepoint = neighbours['edgepoint'][i_site]
-            node_list = nearest_n_neighbours(i, j, no_neighbours)
-            if edgepoint:
-                node_list = node_edge_check(node_list, cube)
-
-            llr = _local_lapse_rate(cube, orography, node_list)
-            data[i_site] = llr[0]*altitude + llr[1]
+        altitudes = np.array([site['altitude'] for site in sites.values()],
+                             dtype=float)
+        i_nodes, j_nodes, valid = nearest_n_neighbours_windows(
+            neighbours, no_neighbours, cube)
+
+        # Gather the heights, shape (n_sites, no_neighbours), and the
+        # temperatures, shape (..., n_sites, no_neighbours), for the grid
+        # points about every site, including any leading (e.g. time)
+        # dimensions of the cube.
+        x_data = np.where(valid, orography[i_nodes, j_nodes], 0.)
+        y_data = np.where(valid, cube.data[..., i_nodes, j_nodes], 0.)
+
+        # Least-squares fit of temperature against height about each site,
+        # calculated in closed form.
+        count = valid.sum(axis=-1)
+        mean_x = x_data.sum(axis=-1) / count
+        mean_y = y_data.sum(axis=-1) / count
+        dx_data = np.where(valid, x_data - mean_x[:, np.newaxis], 0.)
+        dy_data = np.where(valid, y_data - mean_y[..., np.newaxis], 0.)
+        variance_x = (dx_data * dx_data).sum(axis=-1)
+        covariance = (dx_data * dy_data).sum(axis=-1)
+        flat = np.isclose(np.sqrt(variance_x / count), 0.)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            gradient = covariance / variance_x
+        data = mean_y + gradient * (altitudes - mean_x)
+
+        # Where all the heights are the same, the least-squares problem has
+        # no unique solution, so use the minimum norm solution instead, as
+        # given by numpy.linalg.lstsq.
+        flat_data = (mean_y * (mean_x * altitudes + 1) /
+                     (mean_x * mean_x + 1))
+        data = np.where(flat, flat_data, data)
+
+        no_altitude = np.isnan(altitudes)
+        if no_altitude.any():
+            msg = ('orography_derived_temperature_lapse_rate method '
+                   'requires site to have an altitude. Leaving value '
+                   'unchanged.')
+            warnings.warn(msg)
+            data = np.where(no_altitude,
+                            cube.data[..., neighbours['i'], neighbours['j']],
+                            data)
 
         return self.make_cube(cube, data, sites)
 
@@ -374,7 +389,8 @@ class ExtractData(object):
         """
         Args:
             cube (iris.cube.Cube):
-                A cube of screen level temperatures at a single time.
+                A cube of screen level temperatures at a single time, or with
+                a leading time dimension.
 
             sites/neighbours : See process() above.
 
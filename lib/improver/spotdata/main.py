@@ -30,12 +30,12 @@
 # POSSIBILITY OF SUCH DAMAGE.
 """The main routine for site specific post-processing."""
 
-from functools import partial
 import multiprocessing as mp
 
-from iris.cube import CubeList
+from iris.cube import Cube, CubeList
 
 from improver.spotdata.neighbour_finding import PointSelection
+from improver.spotdata.neighbour_cache import NeighbourCache
 from improver.spotdata.extract_data import ExtractData
 from improver.spotdata.extrema import ExtractExtrema
 from improver.spotdata.common_functions import (construct_neighbour_hash,
@@ -45,7 +45,8 @@ from improver.utilities.temporal import (datetime_constraint,
 
 
 def run_spotdata(diagnostics, ancillary_data, sites, config_constants,
-                 use_multiprocessing=False):
+                 use_multiprocessing=False, neighbour_cache_dir=None,
+                 n_workers=None):
     """
     A routine that calls the components of the spotdata code. This includes
     building site data into a suitable format, finding grid neighbours to
@@ -113,6 +114,13 @@ def run_spotdata(diagnostics, ancillary_data, sites, config_constants,
             A switch determining whether to use multiprocessing in the data
             extraction step.
 
+        neighbour_cache_dir (str or None):
+            See find_neighbours().
+
+        n_workers (int or None):
+            See iterate_diagnostics(). Only used if use_multiprocessing is
+            True.
+
     Returns:
         (tuple): tuple containing:
             **resulting_cube** (iris.cube.Cube or None):
@@ -126,6 +134,67 @@ def run_spotdata(diagnostics, ancillary_data, sites, config_constants,
                 None is returned if the value for diagnostic_dict["extrema"]
                 is False, so that the extrema calculation is not required.
     """
+    # Add configuration constants to ancillaries (may be None if unset).
+    ancillary_data['config_constants'] = config_constants
+
+    neighbours = find_neighbours(diagnostics, ancillary_data, sites,
+                                 config_constants,
+                                 neighbour_cache_dir=neighbour_cache_dir)
+
+    if not use_multiprocessing:
+        n_workers = 1
+
+    # Gather the results, which may arrive in any order, into the order of
+    # the diagnostics.
+    results = dict(iterate_diagnostics(diagnostics, neighbours, sites,
+                                       ancillary_data, n_workers=n_workers))
+    resulting_cubes = CubeList()
+    extrema_cubes = CubeList()
+    for key in diagnostics.keys():
+        resulting_cube, extrema_cubelist = results[key]
+        resulting_cubes.append(resulting_cube)
+        extrema_cubes.append(extrema_cubelist)
+    return resulting_cubes, extrema_cubes
+
+
+def find_neighbours(diagnostics, ancillary_data, sites, config_constants,
+                    neighbour_cache_dir=None):
+    """
+    Find the grid point neighbours of the sites for the default neighbour
+    finding method, and for each neighbour finding method used by the
+    diagnostics.
+
+    Args:
+        diagnostics (dict):
+            Dictionary containing the information regarding the methods that
+            will be applied for each diagnostic, including the
+            "neighbour_finding" options. See run_spotdata().
+
+        ancillary_data (dict):
+            Dictionary containing named ancillary data; the key gives the name
+            and the item is the iris.cube.Cube of data.
+
+        sites (dict):
+            A dictionary containing the properties of spotdata sites.
+
+        config_constants (dict or None):
+            Dictionary defining constants to be used in methods that have
+            tolerances that may be set, e.g. no_neighbours.
+
+    Keyword Args:
+        neighbour_cache_dir (str or None):
+            Path to a directory in which to cache the neighbours. If set,
+            neighbours are loaded from the cache where the grid, orography,
+            sites and neighbour finding options are unchanged, and any
+            neighbours that are found are added to the cache. If None, the
+            neighbours are always found.
+
+    Returns:
+        neighbours (dict):
+            Dictionary of arrays of neighbouring grid points, keyed by the
+            hash of the neighbour finding options used to find them (see
+            construct_neighbour_hash).
+    """
     # Read in constants to use; if not available, defaults will be used.
     neighbour_kwargs = {}
     if config_constants is not None:
@@ -133,8 +202,17 @@ def run_spotdata(diagnostics, ancillary_data, sites, config_constants,
         if no_neighbours is not None:
             neighbour_kwargs['no_neighbours'] = no_neighbours
 
-    # Add configuration constants to ancillaries (may be None if unset).
-    ancillary_data['config_constants'] = config_constants
+    if neighbour_cache_dir is not None:
+        find = NeighbourCache(neighbour_cache_dir).process
+    else:
+        def find(cube, sites, ancillary_data, neighbour_finding,
+                 default_neighbours=None, **kwargs):
+            """Find the neighbours without a cache."""
+            if default_neighbours is not None:
+                default_neighbours = default_neighbours.copy()
+            return PointSelection(**neighbour_finding).process(
+                cube, sites, ancillary_data=ancillary_data,
+                default_neighbours=default_neighbours, **kwargs)
 
     # Set up site-grid point neighbour list using default method. Other IGPS
     # methods will use this as a starting point so it must always be done.
@@ -144,9 +222,9 @@ def run_spotdata(diagnostics, ancillary_data, sites, config_constants,
                           'vertical_bias': None,
                           'land_constraint': False}
     default_hash = construct_neighbour_hash(default_neighbours)
-    neighbours[default_hash] = PointSelection(**default_neighbours).process(
-        ancillary_data['orography'], sites,
-        ancillary_data=ancillary_data, **neighbour_kwargs)
+    neighbours[default_hash] = find(
+        ancillary_data['orography'], sites, ancillary_data,
+        default_neighbours, **neighbour_kwargs)
 
     # Set up site-grid point neighbour lists for all IGPS methods being used.
     for key in diagnostics.keys():
@@ -154,52 +232,122 @@ def run_spotdata(diagnostics, ancillary_data, sites, config_constants,
         neighbour_hash = construct_neighbour_hash(neighbour_finding)
         # Check if defined neighbour method results already exist.
         if neighbour_hash not in neighbours.keys():
-            # If not, find neighbours with new method.
-            neighbours[neighbour_hash] = (
-                PointSelection(**neighbour_finding).process(
-                    ancillary_data['orography'], sites,
-                    ancillary_data=ancillary_data,
-                    default_neighbours=neighbours[default_hash],
-                    **neighbour_kwargs)
-                )
-
-    if use_multiprocessing:
-        # Process diagnostics on separate threads if multiprocessing is
-        # selected. Determine number of diagnostics to establish
-        # multiprocessing pool size.
-        n_diagnostic_threads = (
-            min(len(diagnostics.keys())), mp.cpu_count())
-
-        # Establish multiprocessing pool - each diagnostic processed on its
-        # own thread.
-        diagnostic_pool = mp.Pool(processes=n_diagnostic_threads)
-
-        diagnostic_keys = diagnostics.keys()
-
-        result = (
-            diagnostic_pool.map_async(
-                partial(
-                    process_diagnostic, diagnostics, neighbours, sites,
-                    ancillary_data), diagnostic_keys))
-        diagnostic_pool.close()
-        diagnostic_pool.join()
-        resulting_cubes = CubeList()
-        extrema_cubes = CubeList()
-        for result in result.get():
-            resulting_cubes.append(result[0])
-            extrema_cubes.append(result[1:])
-    else:
-        # Process diagnostics serially on one thread.
-        resulting_cubes = CubeList()
-        extrema_cubes = CubeList()
+            # If not, find neighbours with new method. The default
+            # neighbours are copied, so that they are not modified.
+            neighbours[neighbour_hash] = find(
+                ancillary_data['orography'], sites, ancillary_data,
+                neighbour_finding,
+                default_neighbours=neighbours[default_hash],
+                **neighbour_kwargs)
+    return neighbours
+
+
+# The data shared with the worker processes of iterate_diagnostics.
+_WORKER_DATA = {}
+
+
+def _initialise_worker(diagnostics, neighbours, sites, ancillary_data):
+    """
+    Store the data needed to process diagnostics in a worker process. The
+    worker processes are forked, so these arguments are inherited rather
+    than pickled, and the arrays they hold remain in memory shared with the
+    parent process unless they are modified.
+
+    Args:
+        diagnostics/neighbours/sites/ancillary_data :
+            See process_diagnostic().
+
+    """
+    _WORKER_DATA.update({'diagnostics': diagnostics,
+                         'neighbours': neighbours,
+                         'sites': sites,
+                         'ancillary_data': ancillary_data})
+
+
+def _process_diagnostic_in_worker(diagnostic_name):
+    """
+    Process a diagnostic using the data stored by _initialise_worker.
+
+    Args:
+        diagnostic_name (string):
+            See process_diagnostic().
+
+    Returns:
+        (tuple): tuple containing:
+            **diagnostic_name** (string):
+                The name of the diagnostic that has been processed.
+            **result** (tuple):
+                The result of process_diagnostic().
+
+    """
+    return diagnostic_name, process_diagnostic(
+        _WORKER_DATA['diagnostics'], _WORKER_DATA['neighbours'],
+        _WORKER_DATA['sites'], _WORKER_DATA['ancillary_data'],
+        diagnostic_name)
+
+
+def iterate_diagnostics(diagnostics, neighbours, sites, ancillary_data,
+                        n_workers=None):
+    """
+    Process each diagnostic, yielding the results as each one is completed.
+
+    If more than one worker is used, the diagnostics are processed in
+    parallel by a pool of forked worker processes. The inputs are inherited
+    by the workers when they are created, so that the orography, neighbour
+    and diagnostic arrays are shared with them rather than pickled for
+    every diagnostic. Only the name of each diagnostic is sent to the
+    workers, and only the resulting cubes are sent back.
+
+    Args:
+        diagnostics/neighbours/sites/ancillary_data :
+            See process_diagnostic().
+
+    Keyword Args:
+        n_workers (int or None):
+            The number of worker processes to use. This is limited to the
+            number of diagnostics. If None, the number of CPUs is used. If 1,
+            the diagnostics are processed serially in this process.
+
+    Yields:
+        (tuple): tuple containing:
+            **diagnostic_name** (string):
+                The name of the diagnostic that has been processed.
+            **result** (tuple):
+                The result of process_diagnostic() for the diagnostic.
+
+    Raises:
+        ValueError: If n_workers is less than 1.
+
+    """
+    if n_workers is None:
+        n_workers = mp.cpu_count()
+    if n_workers < 1:
+        raise ValueError(
+            'The number of workers must be at least 1, not {}.'.format(
+                n_workers))
+    n_workers = min(n_workers, len(diagnostics))
+
+    if n_workers <= 1:
+        # Process diagnostics serially in this process.
         for key in diagnostics.keys():
-            resulting_cube, extrema_cubelist = (
-                process_diagnostic(
-                    diagnostics, neighbours, sites,
-                    ancillary_data, key))
-            resulting_cubes.append(resulting_cube)
-            extrema_cubes.append(extrema_cubelist)
-    return resulting_cubes, extrema_cubes
+            yield key, process_diagnostic(diagnostics, neighbours, sites,
+                                          ancillary_data, key)
+        return
+
+    # Realise the ancillary data before the workers are forked, so that it
+    # is loaded only once and then shared with all of the workers.
+    for ancillary in ancillary_data.values():
+        if isinstance(ancillary, Cube) and ancillary.has_lazy_data():
+            ancillary.data = ancillary.core_data().compute()
+
+    context = mp.get_context('fork')
+    with context.Pool(
+            processes=n_workers, initializer=_initialise_worker,
+            initargs=(diagnostics, neighbours, sites,
+                      ancillary_data)) as diagnostic_pool:
+        for result in diagnostic_pool.imap_unordered(
+                _process_diagnostic_in_worker, diagnostics.keys()):
+            yield result
 
 
 def process_diagnostic(diagnostics, neighbours, sites,
@@ -277,38 +425,49 @@ def process_diagnostic(diagnostics, neighbours, sites,
             if constant is not None:
                 kwargs[optional] = constant
 
-    # Create a list of datetimes to loop through.
-    forecast_times = []
-    for cube in diagnostic_dict["data"]:
-        time = cube.coord("time")
-        forecast_times.extend(time.units.num2date(time.points))
-
     # Create empty iris.cube.CubeList to hold extracted data cubes.
     resulting_cubes = CubeList()
 
-    # Loop over forecast times.
-    for a_time in forecast_times:
-        # Extract Cube from CubeList at current time.
-        time_extract = datetime_constraint(a_time)
-        cube = extract_cube_at_time(
-            diagnostic_dict["data"], a_time, time_extract)
-        if cube is None:
-            # If no cube is available at given time, try the next time.
-            continue
-
-        ad = {}
-        if diagnostic_dict["additional_data"] is not None:
-            # Extract additional diagnostics at current time.
-            ad = extract_ad_at_time(diagnostic_dict["additional_data"], a_time,
-                                    time_extract)
-
-        args = (cube, sites, neighbour_list, ancillary_data, ad)
-
-        # Extract diagnostic data using defined method.
-        resulting_cubes.append(
-            ExtractData(
-                diagnostic_dict['interpolation_method']).process(
-                    *args, **kwargs))
+    if diagnostic_dict['interpolation_method'] == (
+            'orography_derived_temperature_lapse_rate'):
+        # No time varying additional data is needed by this method, so all
+        # the forecast times within each cube are processed at once.
+        for cube in diagnostic_dict["data"]:
+            args = (cube, sites, neighbour_list, ancillary_data, {})
+            resulting_cubes.append(
+                ExtractData(
+                    diagnostic_dict['interpolation_method']).process(
+                        *args, **kwargs))
+    else:
+        # Create a list of datetimes to loop through.
+        forecast_times = []
+        for cube in diagnostic_dict["data"]:
+            time = cube.coord("time")
+            forecast_times.extend(time.units.num2date(time.points))
+
+        # Loop over forecast times.
+        for a_time in forecast_times:
+            # Extract Cube from CubeList at current time.
+            time_extract = datetime_constraint(a_time)
+            cube = extract_cube_at_time(
+                diagnostic_dict["data"], a_time, time_extract)
+            if cube is None:
+                # If no cube is available at given time, try the next time.
+                continue
+
+            ad = {}
+            if diagnostic_dict["additional_data"] is not None:
+                # Extract additional diagnostics at current time.
+                ad = extract_ad_at_time(diagnostic_dict["additional_data"],
+                                        a_time, time_extract)
+
+            args = (cube, sites, neighbour_list, ancillary_data, ad)
+
+            # Extract diagnostic data using defined method.
+            resulting_cubes.append(
+                ExtractData(
+                    diagnostic_dict['interpolation_method']).process(
+                        *args, **kwargs))
 
     if resulting_cubes:
         # Concatenate CubeList into Cube for cubes with different
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# (C) British Crown Copyright 2017-2018 Met Office.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holder nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+"""
+This module defines a cache of the grid point neighbours of spot data sites,
+held on local disk, which allows neighbour finding to be skipped when the
+grid, orography, sites and neighbour finding options are unchanged.
+
+"""
+import hashlib
+import os
+
+import numpy as np
+
+from improver.spotdata.common_functions import construct_neighbour_hash
+from improver.spotdata.neighbour_finding import PointSelection
+
+
+class NeighbourCache(object):
+    """
+    Cache of the neighbour arrays returned by PointSelection, held as NumPy
+    .npy files in a directory on local disk.
+
+    Each file is named using a key, which is a hash of the contents of
+    everything that the neighbours depend upon: the grid coordinates, the
+    orography (and land mask, if a land constraint is used), the site list
+    and the neighbour finding options. Cached neighbours are memory-mapped
+    when they are loaded.
+    """
+
+    def __init__(self, cache_dir):
+        """
+        Initialise the class.
+
+        Args:
+            cache_dir (str):
+                Path to the directory holding the cached neighbours. The
+                directory is created when neighbours are first saved.
+        """
+        self.cache_dir = cache_dir
+
+    def __repr__(self):
+        """Represent the configured plugin instance as a string."""
+        return '<NeighbourCache: cache_dir: {}>'.format(self.cache_dir)
+
+    @staticmethod
+    def cache_key(cube, sites, ancillary_data, neighbour_finding,
+                  no_neighbours=None):
+        """
+        Construct the key for a set of neighbours from the contents of the
+        inputs to neighbour finding.
+
+        Args:
+            cube (iris.cube.Cube):
+                Cube of gridded data on the grid from which neighbours are
+                selected.
+            sites (OrderedDict):
+                Site data, including latitude/longitude and altitude
+                information.
+            ancillary_data (dict):
+                Dictionary of ancillary (time invariant) model data, which
+                must include the orography.
+            neighbour_finding (dict):
+                A dictionary containing the method, vertical_bias, and
+                land_constraint options for neighbour finding.
+
+        Keyword Args:
+            no_neighbours (int or None):
+                Number of grid points about each site to consider when
+                relaxing the nearest neighbour condition, or None if the
+                default is used.
+
+        Returns:
+            key (str):
+                Hexadecimal SHA-256 digest of the inputs.
+        """
+        hasher = hashlib.sha256()
+        for coord in [cube.coord(axis='y'), cube.coord(axis='x')]:
+            hasher.update('{}-{}'.format(coord.name(), coord.units).encode())
+            hasher.update(
+                np.ascontiguousarray(coord.points, dtype=np.float64).tobytes())
+        hasher.update(repr(cube.coord_system()).encode())
+
+        fields = ['orography']
+        if neighbour_finding['land_constraint']:
+            fields.append('land_mask')
+        for field in fields:
+            data = np.ma.filled(
+                np.ma.asarray(ancillary_data[field].data, dtype=np.float64),
+                np.nan)
+            hasher.update(np.ascontiguousarray(data).tobytes())
+
+        for site_id, site in sites.items():
+            hasher.update(repr((site_id, site['latitude'], site['longitude'],
+                                site['altitude'])).encode())
+
+        hasher.update(construct_neighbour_hash(neighbour_finding).encode())
+        hasher.update(repr(no_neighbours).encode())
+        return hasher.hexdigest()
+
+    def filepath(self, key):
+        """
+        Path to the file holding the neighbours for a key.
+
+        Args:
+            key (str):
+                Key returned by cache_key.
+
+        Returns:
+            filepath (str):
+                Path to the .npy file.
+        """
+        return os.path.join(self.cache_dir, 'neighbours_{}.npy'.format(key))
+
+    def load(self, key):
+        """
+        Load the neighbours for a key, if they are cached.
+
+        Args:
+            key (str):
+                Key returned by cache_key.
+
+        Returns:
+            neighbours (numpy.memmap or None):
+                Read-only memory-mapped array of neighbours, or None if the
+                neighbours for this key are not cached.
+        """
+        filepath = self.filepath(key)
+        if not os.path.exists(filepath):
+            return None
+        return np.load(filepath, mmap_mode='r')
+
+    def save(self, key, neighbours):
+        """
+        Save the neighbours for a key. The file is written to a temporary
+        path first, so that an interrupted save does not leave an incomplete
+        file in the cache.
+
+        Args:
+            key (str):
+                Key returned by cache_key.
+            neighbours (numpy.ndarray):
+                Array of neighbours returned by PointSelection.
+        """
+        if not os.path.exists(self.cache_dir):
+            os.makedirs(self.cache_dir)
+        filepath = self.filepath(key)
+        temporary_filepath = filepath + '.tmp'
+        with open(temporary_filepath, 'wb') as output_file:
+            np.save(output_file, neighbours)
+        os.replace(temporary_filepath, filepath)
+
+    def process(self, cube, sites, ancillary_data, neighbour_finding,
+                default_neighbours=None, **kwargs):
+        """
+        Return the cached neighbours for the inputs, or find the neighbours
+        using PointSelection and add them to the cache.
+
+        Args:
+            cube/sites/ancillary_data : See cache_key() above.
+            neighbour_finding (dict):
+                A dictionary containing the method, vertical_bias, and
+                land_constraint options, used to set up PointSelection.
+
+        Keyword Args:
+            default_neighbours (numpy.ndarray or None):
+                See PointSelection.process(). This is copied before use, as
+                it may be read-only if it was loaded from the cache.
+            kwargs:
+                Any further keyword arguments for PointSelection.process(),
+                e.g. no_neighbours.
+
+        Returns:
+            neighbours (numpy.ndarray):
+                See PointSelection.process().
+        """
+        key = self.cache_key(cube, sites, ancillary_data, neighbour_finding,
+                             no_neighbours=kwargs.get('no_neighbours'))
+        neighbours = self.load(key)
+        if neighbours is None:
+            if default_neighbours is not None:
+                default_neighbours = np.array(default_neighbours)
+            neighbours = PointSelection(**neighbour_finding).process(
+                cube, sites, ancillary_data=ancillary_data,
+                default_neighbours=default_neighbours, **kwargs)
+            self.save(key, neighbours)
+        return neighbours
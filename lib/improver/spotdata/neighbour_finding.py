@@ -34,10 +34,7 @@
 import numpy as np
 from improver.utilities.spatial import (
     get_nearest_coords, lat_lon_determine, lat_lon_transform)
-from improver.spotdata.common_functions import (
-    ConditionalListExtract, nearest_n_neighbours,
-    index_of_minimum_difference, list_entry_from_index, node_edge_check,
-    apply_bias)
+from improver.spotdata.common_functions import nearest_n_neighbours_windows
 
 
 class PointSelection(object):
@@ -147,8 +144,11 @@ class PointSelection(object):
     @staticmethod
     def fast_nearest_neighbour(cube, sites, orography=None):
         """
-        Use iris coord.nearest_neighbour_index function to locate the nearest
-        grid point to the given latitude/longitude pair.
+        Locate the nearest grid point to the given latitude/longitude pairs,
+        as found by the iris coord.nearest_neighbour_index function. The site
+        coordinates are transformed into the projection of the grid in a
+        single call, and the nearest grid points are found for all sites at
+        once.
 
         Performed on a 2D-surface; consider using the much slower
         iris.analysis.trajectory.interpolate method for a more correct nearest
@@ -182,29 +182,31 @@ class PointSelection(object):
         iname = cube.coord(axis='y').name()
         jname = cube.coord(axis='x').name()
 
-        for i_site, site in enumerate(sites.values()):
-            latitude, longitude, altitude = (site['latitude'],
-                                             site['longitude'],
-                                             site['altitude'])
-
-            longitude, latitude = lat_lon_transform(trg_crs,
-                                                    latitude, longitude)
-            i_latitude, j_longitude = get_nearest_coords(
-                cube, latitude, longitude, iname, jname)
-            dz_site_grid = 0.
-
-            # Calculate SpotData site vertical displacement from model
-            # orography. If site altitude set with np.nan or orography data
-            # is unavailable, assume site is at equivalent altitude to nearest
-            # neighbour.
-            if orography is not None and altitude != np.nan:
-                dz_site_grid = altitude - orography[i_latitude, j_longitude]
-            else:
-                dz_site_grid = 0.
+        latitudes = np.array([site['latitude'] for site in sites.values()],
+                             dtype=float)
+        longitudes = np.array([site['longitude'] for site in sites.values()],
+                              dtype=float)
+        altitudes = np.array([site['altitude'] for site in sites.values()],
+                             dtype=float)
+
+        longitudes, latitudes = lat_lon_transform(trg_crs,
+                                                  latitudes, longitudes)
+        i_latitudes, j_longitudes = get_nearest_coords(
+            cube, latitudes, longitudes, iname, jname)
+
+        # Calculate SpotData site vertical displacement from model
+        # orography. If orography data is unavailable, assume sites are at
+        # equivalent altitude to nearest neighbour.
+        if orography is not None:
+            dz_site_grid = altitudes - orography[i_latitudes, j_longitudes]
+        else:
+            dz_site_grid = np.zeros(len(sites))
 
-            neighbours[i_site] = (int(i_latitude), int(j_longitude),
-                                  dz_site_grid,
-                                  (i_latitude == imax or j_longitude == jmax))
+        neighbours['i'] = i_latitudes
+        neighbours['j'] = j_longitudes
+        neighbours['dz'] = dz_site_grid
+        neighbours['edgepoint'] = ((i_latitudes == imax) |
+                                   (j_longitudes == jmax))
 
         return neighbours
 
@@ -269,51 +271,56 @@ class PointSelection(object):
         else:
             neighbours = default_neighbours
 
-        for i_site, site in enumerate(sites.values()):
-
-            altitude = site['altitude']
-
-            # If site altitude is set with np.nan this method cannot be used.
-            if altitude == np.nan:
-                continue
-
-            i, j, dz_nearest = (neighbours['i'][i_site],
-                                neighbours['j'][i_site],
-                                neighbours['dz'][i_site])
-            edgepoint = neighbours['edgepoint'][i_site]
-
-            node_list = nearest_n_neighbours(i, j, no_neighbours)
-            if edgepoint:
-                node_list = node_edge_check(node_list, cube)
-
-            if self.land_constraint:
-                # Check that we are considering a land point and that at least
-                # one neighbouring point is also land. If not no modification
-                # is made to the nearest neighbour coordinates.
-
-                neighbour_nodes = nearest_n_neighbours(i, j, no_neighbours,
-                                                       exclude_self=True)
-                if edgepoint:
-                    neighbour_nodes = node_edge_check(neighbour_nodes, cube)
-                if not land_mask[i, j] or not any(land_mask[neighbour_nodes]):
-                    continue
-
-                # Filter the node_list to keep only land points
-                # (land_mask == 1).
-                node_list = ConditionalListExtract('not_equal_to').process(
-                    land_mask, node_list, 0)
-
-            dzs = altitude - orography[node_list]
-            dz_subset = apply_bias(self.vertical_bias, dzs)
-
-            ij_min = index_of_minimum_difference(dzs, subset_list=dz_subset)
-            i_min, j_min = list_entry_from_index(node_list, ij_min)
-            dz_min = abs(altitude - orography[i_min, j_min])
-
-            # Test to ensure that if multiple vertical displacements are the
-            # same we don't select a more distant point because of array
-            # ordering.
-            if not np.isclose(dz_min, abs(dz_nearest)):
-                neighbours[i_site] = i_min, j_min, dzs[ij_min], edgepoint
+        altitudes = np.array([site['altitude'] for site in sites.values()],
+                             dtype=float)
+        i_nodes, j_nodes, valid = nearest_n_neighbours_windows(
+            neighbours, no_neighbours, cube)
+        central_node = no_neighbours//2
+
+        # If site altitude is set with np.nan this method cannot be used.
+        update = ~np.isnan(altitudes)
+
+        if self.land_constraint:
+            # Check that we are considering a land point and that at least
+            # one neighbouring point is also land. If not no modification
+            # is made to the nearest neighbour coordinates.
+            land_nodes = valid & (land_mask[i_nodes, j_nodes] != 0)
+            neighbour_land = land_nodes.copy()
+            neighbour_land[:, central_node] = False
+            update &= (land_mask[neighbours['i'], neighbours['j']] != 0)
+            update &= neighbour_land.any(axis=1)
+
+            # Keep only land points (land_mask == 1) in the window.
+            valid = land_nodes
+
+        dzs = altitudes[:, np.newaxis] - orography[i_nodes, j_nodes]
+
+        # Bias neighbour selection to look for grid points with an altitude
+        # that is above or below the site, unless no such point is available,
+        # in which case all the nodes in the window are considered.
+        candidates = valid
+        if self.vertical_bias == 'above':
+            candidates = valid & (dzs <= 0)
+        elif self.vertical_bias == 'below':
+            candidates = valid & (dzs >= 0)
+        no_candidates = ~candidates.any(axis=1)
+        candidates[no_candidates] = valid[no_candidates]
+
+        # argmin returns the first occurrence of the minimum, so ties are
+        # resolved in node order as before.
+        abs_dzs = np.where(candidates, abs(dzs), np.inf)
+        ij_min = np.argmin(abs_dzs, axis=1)
+        site_index = np.arange(len(ij_min))
+        i_min = i_nodes[site_index, ij_min]
+        j_min = j_nodes[site_index, ij_min]
+        dz_min = dzs[site_index, ij_min]
+
+        # Test to ensure that if multiple vertical displacements are the
+        # same we don't select a more distant point because of array
+        # ordering.
+        update &= ~np.isclose(abs(dz_min), abs(neighbours['dz']))
+        neighbours['i'][update] = i_min[update]
+        neighbours['j'][update] = j_min[update]
+        neighbours['dz'][update] = dz_min[update]
 
         return neighbours
@@ -266,6 +266,117 @@ class Test_blend_percentiles(IrisTest):
         expected_result = np.array([5.0, 6.0, 7.0])
         self.assertArrayAlmostEqual(result, expected_result)
 
+    def test_many_grid_points(self):
+        """Test that blending the percentiles at many grid points at once
+           gives the same result as blending each grid point in turn."""
+        weights = np.array([0.38872692, 0.33041788, 0.2808552])
+        percentiles = np.array([0., 10., 20., 30., 40., 50.,
+                                60., 70., 80., 90., 100.])
+        perc_values = np.stack([PERCENTILE_VALUES,
+                                PERCENTILE_VALUES[::-1],
+                                PERCENTILE_VALUES + 1.0], axis=-1)
+        result = PercentileBlendingAggregator.blend_percentiles(
+            perc_values, percentiles, weights)
+        self.assertEqual(result.shape, (11, 3))
+        for index in range(3):
+            expected_result = PercentileBlendingAggregator.blend_percentiles(
+                perc_values[..., index], percentiles, weights)
+            self.assertArrayAlmostEqual(result[:, index], expected_result)
+
+
+class Test__interpolate(IrisTest):
+
+    """Test the _interpolate method."""
+
+    def test_matches_np_interp(self):
+        """Test that interpolating along the leading axis matches np.interp
+           applied at each index of the trailing dimension, including values
+           outside of and equal to the data points."""
+        x_values = np.array([[0.5, 4.0], [1.0, 7.0], [2.5, 8.0],
+                             [3.0, 9.5]])
+        xp_values = np.array([[1.0, 5.0], [2.0, 6.0], [3.0, 8.0]])
+        fp_values = np.array([[10.0, 0.0], [20.0, 50.0], [30.0, 100.0]])
+        result = PercentileBlendingAggregator._interpolate(
+            x_values, xp_values, fp_values)
+        for index in range(2):
+            expected_result = np.interp(x_values[:, index],
+                                        xp_values[:, index],
+                                        fp_values[:, index])
+            self.assertArrayAlmostEqual(result[:, index], expected_result)
+
+    def test_repeated_data_points(self):
+        """Test that repeated data points give the same result as
+           np.interp."""
+        x_values = np.array([4.0, 5.0, 6.0, 7.0])
+        xp_values = np.array([4.0, 5.0, 5.0, 7.0])
+        fp_values = np.array([0.0, 25.0, 50.0, 100.0])
+        result = PercentileBlendingAggregator._interpolate(
+            x_values, xp_values, fp_values)
+        expected_result = np.interp(x_values, xp_values, fp_values)
+        self.assertArrayAlmostEqual(result, expected_result)
+
+    def test_single_data_point(self):
+        """Test that a single data point gives its value everywhere."""
+        x_values = np.array([1.0, 2.0, 3.0])
+        result = PercentileBlendingAggregator._interpolate(
+            x_values, np.array([2.0]), np.array([50.0]))
+        self.assertArrayAlmostEqual(result, np.array([50.0, 50.0, 50.0]))
+
+    def test_many_percentiles(self):
+        """Test that interpolating with many data points matches np.interp
+           applied at each index of the trailing dimensions."""
+        random_state = np.random.RandomState(0)
+        x_values = np.linspace(-5.0, 105.0, 111)[:, np.newaxis, np.newaxis]
+        xp_values = np.sort(
+            random_state.uniform(0.0, 100.0, (101, 3, 4)), axis=0)
+        fp_values = np.broadcast_to(
+            np.linspace(0.0, 100.0, 101)[:, np.newaxis, np.newaxis],
+            xp_values.shape)
+        result = PercentileBlendingAggregator._interpolate(
+            x_values, xp_values, fp_values)
+        self.assertEqual(result.shape, (111, 3, 4))
+        for index in np.ndindex(3, 4):
+            expected_result = np.interp(x_values[:, 0, 0],
+                                        xp_values[(slice(None),) + index],
+                                        fp_values[(slice(None),) + index])
+            self.assertArrayAlmostEqual(
+                result[(slice(None),) + index], expected_result)
+
+    def test_nan_column(self):
+        """Test that a column containing NaNs does not affect the
+           interpolation in the other columns."""
+        random_state = np.random.RandomState(0)
+        x_values = np.linspace(0.0, 100.0, 11)[:, np.newaxis]
+        xp_values = np.sort(
+            random_state.uniform(0.0, 100.0, (5, 1000)), axis=0)
+        xp_values[:, 0] = np.nan
+        fp_values = np.linspace(0.0, 100.0, 5)[:, np.newaxis]
+        result = PercentileBlendingAggregator._interpolate(
+            x_values, xp_values, fp_values)
+        for index in range(1, 1000):
+            expected_result = np.interp(x_values[:, 0],
+                                        xp_values[:, index],
+                                        fp_values[:, 0])
+            self.assertArrayAlmostEqual(result[:, index], expected_result)
+
+    def test_large_range_column(self):
+        """Test that a column with a very large range of values, such as a
+           fill value, does not affect the interpolation in the other
+           columns."""
+        random_state = np.random.RandomState(0)
+        x_values = np.linspace(0.0, 100.0, 11)[:, np.newaxis]
+        xp_values = np.sort(
+            random_state.uniform(0.0, 100.0, (5, 1000)), axis=0)
+        xp_values[-1, 0] = 1.e11
+        fp_values = np.linspace(0.0, 100.0, 5)[:, np.newaxis]
+        result = PercentileBlendingAggregator._interpolate(
+            x_values, xp_values, fp_values)
+        for index in range(1000):
+            expected_result = np.interp(x_values[:, 0],
+                                        xp_values[:, index],
+                                        fp_values[:, 0])
+            self.assertArrayAlmostEqual(result[:, index], expected_result)
+
 
 if __name__ == '__main__':
     unittest.main()
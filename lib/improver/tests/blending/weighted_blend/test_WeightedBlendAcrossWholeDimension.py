@@ -92,6 +92,89 @@ class Test__repr__(IrisTest):
         self.assertEqual(result, msg)
 
 
+class Test_weighted_blend(IrisTest):
+
+    """Test the weighted_blend method."""
+
+    def setUp(self):
+        """Create a probability cube with a threshold dimension."""
+        data = np.zeros((3, 2, 2, 2))
+        data[:, 0, :, :] = 0.5
+        data[:, 1, :, :] = 0.8
+        data[1, :, :, :] += 0.1
+        data[2, :, :, :] += 0.2
+        cube = Cube(data, long_name="probability_of_precipitation_amount")
+        cube.add_dim_coord(DimCoord([0.4, 1.0, 2.0], long_name="threshold",
+                                    units="kg m^-2 s^-1"), 0)
+        tunit = Unit("hours since 1970-01-01 00:00:00", "gregorian")
+        cube.add_dim_coord(DimCoord([402192.5, 402193.5],
+                                    "time", units=tunit), 1)
+        cube.add_dim_coord(DimCoord(np.linspace(-45.0, 45.0, 2), 'latitude',
+                                    units='degrees'), 2)
+        cube.add_dim_coord(DimCoord(np.linspace(120, 180, 2), 'longitude',
+                                    units='degrees'), 3)
+        self.cube = cube
+
+    @ManageWarnings(
+        ignored_messages=["Collapsing a non-contiguous coordinate."])
+    def test_weighted_mean(self):
+        """Test the weighted mean is calculated for all thresholds at once
+        and the collapsed coordinate and cell method are as expected."""
+        plugin = WeightedBlendAcrossWholeDimension('time', 'weighted_mean')
+        result = plugin.weighted_blend(self.cube, [0.8, 0.2])
+        expected = np.ones((3, 2, 2))*0.56
+        expected[1] += 0.1
+        expected[2] += 0.2
+        self.assertArrayAlmostEqual(result.data, expected)
+        self.assertArrayEqual(result.coord('threshold').points,
+                              [0.4, 1.0, 2.0])
+        self.assertArrayAlmostEqual(result.coord('time').bounds,
+                                    [[402192.5, 402193.5]])
+        self.assertEqual(result.cell_methods[-1].method, 'mean')
+
+    @ManageWarnings(
+        ignored_messages=["Collapsing a non-contiguous coordinate."])
+    def test_weighted_mean_equals_collapse(self):
+        """Test the weighted mean matches the weighted mean calculated by
+        collapsing the cube with iris."""
+        plugin = WeightedBlendAcrossWholeDimension('time', 'weighted_mean')
+        weights = np.array([0.3, 0.7])
+        self.cube.data[:, 0, 0, 0] = [0.1, 0.2, 0.3]
+        result = plugin.weighted_blend(self.cube, weights)
+        expected = self.cube.collapsed(
+            'time', iris.analysis.MEAN,
+            weights=iris.util.broadcast_to_shape(weights, self.cube.shape,
+                                                 (1,)))
+        self.assertArrayAlmostEqual(result.data, expected.data)
+        self.assertEqual(result.coord('time'), expected.coord('time'))
+
+    @ManageWarnings(
+        ignored_messages=["Collapsing a non-contiguous coordinate."])
+    def test_weighted_mean_masked(self):
+        """Test that masked points are excluded from the weighted mean."""
+        plugin = WeightedBlendAcrossWholeDimension('time', 'weighted_mean')
+        mask = np.zeros(self.cube.shape, dtype=bool)
+        mask[:, 1, 0, 0] = True
+        self.cube.data = np.ma.masked_array(self.cube.data, mask=mask)
+        result = plugin.weighted_blend(self.cube, [0.8, 0.2])
+        self.assertIsInstance(result.data, np.ma.core.MaskedArray)
+        self.assertArrayAlmostEqual(result.data[:, 0, 0], [0.5, 0.6, 0.7])
+        self.assertAlmostEqual(result.data[0, 1, 1], 0.56)
+
+    @ManageWarnings(
+        ignored_messages=["Collapsing a non-contiguous coordinate."])
+    def test_weighted_maximum(self):
+        """Test the maximum of the weighted probabilities is calculated for
+        all thresholds at once, with the expected cell method."""
+        plugin = WeightedBlendAcrossWholeDimension('time', 'weighted_maximum')
+        result = plugin.weighted_blend(self.cube, [0.8, 0.2])
+        expected = np.ones((3, 2, 2))*0.4
+        expected[1] = 0.48
+        expected[2] = 0.56
+        self.assertArrayAlmostEqual(result.data, expected)
+        self.assertEqual(result.cell_methods[-1].method, 'maximum')
+
+
 class Test_process(IrisTest):
 
     """Test the Basic Weighted Average plugin."""
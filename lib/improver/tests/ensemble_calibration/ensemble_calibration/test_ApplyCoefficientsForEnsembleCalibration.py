@@ -853,6 +853,39 @@ class Test__apply_params(IrisTest):
 
         self.assertArrayAlmostEqual(result[0][0].data, data)
 
+    @ManageWarnings(
+        ignored_messages=["Collapsing a non-contiguous coordinate.",
+                          "invalid escape sequence"],
+        warning_types=[UserWarning, DeprecationWarning])
+    def test_gridded_coefficients(self):
+        """
+        Test that the plugin applies coefficients that vary with grid point,
+        and returns the coefficients as gridded cubes.
+        """
+        cube = self.current_temperature_forecast_cube
+        the_date = datetime_from_timestamp(cube.coord("time").points)
+        gridded_coeffs = np.ones((4, 3, 3)) * np.array(
+            self.default_optimised_coeffs)[:, np.newaxis, np.newaxis]
+        gridded_coeffs[2] = np.arange(9).reshape(3, 3)
+        optimised_coeffs = {the_date: gridded_coeffs}
+
+        predictor_cube = cube.collapsed("realization", iris.analysis.MEAN)
+        variance_cube = cube.collapsed("realization", iris.analysis.VARIANCE)
+        expected_mean = (
+            gridded_coeffs[2] +
+            gridded_coeffs[3] * predictor_cube.data.reshape(3, 3))
+
+        plugin = Plugin(cube, optimised_coeffs, self.coeff_names)
+        forecast_predictor, _, coefficients = plugin._apply_params(
+            predictor_cube, variance_cube, optimised_coeffs,
+            self.coeff_names, "mean")
+        self.assertArrayAlmostEqual(forecast_predictor[0].data, expected_mean)
+        self.assertEqual(len(coefficients), 4)
+        self.assertEqual(coefficients[2].name(), "a")
+        self.assertArrayAlmostEqual(coefficients[2].data, gridded_coeffs[2])
+        self.assertEqual(coefficients[2].coord_dims(
+            coefficients[2].coord(axis="x")), (1,))
+
     @ManageWarnings(
         record=True,
         ignored_messages=["Collapsing a non-contiguous coordinate.",
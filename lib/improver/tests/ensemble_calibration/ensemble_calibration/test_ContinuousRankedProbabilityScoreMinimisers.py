@@ -49,6 +49,99 @@ from improver.tests.ensemble_calibration.ensemble_calibration.\
 from improver.utilities.warnings_handler import ManageWarnings
 
 
+class Test__init__(IrisTest):
+
+    """Test the __init__ method."""
+
+    def test_basic(self):
+        """Test that the default minimisation method is Nelder-Mead."""
+        plugin = Plugin()
+        self.assertEqual(plugin.minimisation_method, "Nelder-Mead")
+
+    def test_gradient_method(self):
+        """Test that a gradient-based minimisation method can be set."""
+        plugin = Plugin(minimisation_method="L-BFGS-B")
+        self.assertEqual(plugin.minimisation_method, "L-BFGS-B")
+
+    def test_invalid_method(self):
+        """Test that an error is raised for an unsupported method."""
+        msg = "Minimisation method requested Powell is not supported"
+        with self.assertRaisesRegex(ValueError, msg):
+            Plugin(minimisation_method="Powell")
+
+
+class Test__repr__(IrisTest):
+
+    """Test the __repr__ method."""
+
+    def test_basic(self):
+        """Test that the __repr__ returns the expected string."""
+        result = str(Plugin())
+        msg = ('<ContinuousRankedProbabilityScoreMinimisers: '
+               'minimisation_method: Nelder-Mead>')
+        self.assertEqual(result, msg)
+
+
+def prepare_data(cube, predictor_of_mean_flag):
+    """
+    Calculate the float64 forecast predictor, truth and variance data
+    used when calculating the CRPS and its gradient.
+
+    Args:
+        cube (iris.cube.Cube):
+            Cube containing the ensemble realizations.
+        predictor_of_mean_flag (String):
+            Either "mean" or "realizations".
+
+    Returns:
+        (tuple): tuple containing the forecast predictor, truth and
+        forecast variance data, and the square root of pi.
+    """
+    if predictor_of_mean_flag == "mean":
+        forecast_predictor_data = cube.collapsed(
+            "realization", iris.analysis.MEAN).data.flatten()
+    else:
+        forecast_predictor_data = convert_cube_data_to_2d(cube)
+    forecast_variance_data = cube.collapsed(
+        "realization", iris.analysis.VARIANCE).data.flatten()
+    truth_data = cube.collapsed(
+        "realization", iris.analysis.MAX).data.flatten()
+    return (forecast_predictor_data.astype(np.float64),
+            truth_data.astype(np.float64),
+            forecast_variance_data.astype(np.float64),
+            np.sqrt(np.pi))
+
+
+def finite_difference_gradient(function, initial_guess, args, step=1e-6):
+    """
+    Estimate the gradient of a function using central differences.
+
+    Args:
+        function (callable):
+            Function of the coefficients and args.
+        initial_guess (Numpy array):
+            Coefficients at which to estimate the gradient.
+        args (tuple):
+            Additional arguments to the function.
+
+    Keyword Args:
+        step (float):
+            Step used to perturb each coefficient.
+
+    Returns:
+        Numpy array:
+            Estimated gradient with respect to each coefficient.
+    """
+    gradient = np.zeros(len(initial_guess))
+    for index in range(len(initial_guess)):
+        perturbation = np.zeros(len(initial_guess))
+        perturbation[index] = step
+        gradient[index] = (
+            function(initial_guess + perturbation, *args) -
+            function(initial_guess - perturbation, *args)) / (2 * step)
+    return gradient
+
+
 class Test_normal_crps_minimiser(IrisTest):
 
     """
@@ -750,5 +843,182 @@ class Test_crps_minimiser_wrapper(IrisTest):
                         "change" in str(warning_list[1]))
 
 
+class Test_normal_crps_gradient(IrisTest):
+
+    """
+    Test the gradient of the CRPS for a normal distribution.
+    Either the ensemble mean or the individual ensemble realizations are
+    used as the predictors.
+    """
+    @ManageWarnings(
+        ignored_messages=["Collapsing a non-contiguous coordinate."])
+    def test_mean_predictor(self):
+        """
+        Test that the gradient matches a finite difference estimate with
+        mean as predictor.
+        """
+        initial_guess = np.array([5, 1, 0, 1], dtype=np.float64)
+        args = prepare_data(set_up_temperature_cube(), "mean") + ("mean",)
+        plugin = Plugin()
+        result = plugin.normal_crps_gradient(initial_guess, *args)
+        expected = finite_difference_gradient(
+            plugin.normal_crps_minimiser, initial_guess, args)
+        np.testing.assert_allclose(
+            result, expected, rtol=1.e-4, atol=1.e-4)
+
+    @ManageWarnings(
+        ignored_messages=["Collapsing a non-contiguous coordinate."])
+    def test_realizations_predictor(self):
+        """
+        Test that the gradient matches a finite difference estimate with
+        ensemble realizations as predictor.
+        """
+        initial_guess = np.array([5, 1, 0, 1, 1, 1], dtype=np.float64)
+        args = (prepare_data(set_up_temperature_cube(), "realizations") +
+                ("realizations",))
+        plugin = Plugin()
+        result = plugin.normal_crps_gradient(initial_guess, *args)
+        expected = finite_difference_gradient(
+            plugin.normal_crps_minimiser, initial_guess, args)
+        np.testing.assert_allclose(
+            result, expected, rtol=1.e-4, atol=1.e-4)
+
+    @ManageWarnings(
+        ignored_messages=["Collapsing a non-contiguous coordinate."])
+    def test_bad_value(self):
+        """
+        Test that the gradient is zero when the CRPS is replaced by the
+        BAD_VALUE.
+        """
+        initial_guess = np.array([0, 0, 1, 1], dtype=np.float64)
+        args = prepare_data(set_up_temperature_cube(), "mean") + ("mean",)
+        result = Plugin().normal_crps_gradient(initial_guess, *args)
+        self.assertArrayEqual(result, np.zeros(4))
+
+
+class Test_truncated_normal_crps_gradient(IrisTest):
+
+    """
+    Test the gradient of the CRPS for a truncated normal distribution.
+    Either the ensemble mean or the individual ensemble realizations are
+    used as the predictors.
+    """
+    @ManageWarnings(
+        ignored_messages=["Collapsing a non-contiguous coordinate."])
+    def test_mean_predictor(self):
+        """
+        Test that the gradient matches a finite difference estimate with
+        mean as predictor.
+        """
+        initial_guess = np.array([5, 1, 0, 1], dtype=np.float64)
+        args = prepare_data(set_up_wind_speed_cube(), "mean") + ("mean",)
+        plugin = Plugin()
+        result = plugin.truncated_normal_crps_gradient(initial_guess, *args)
+        expected = finite_difference_gradient(
+            plugin.truncated_normal_crps_minimiser, initial_guess, args)
+        np.testing.assert_allclose(
+            result, expected, rtol=1.e-4, atol=1.e-4)
+
+    @ManageWarnings(
+        ignored_messages=["Collapsing a non-contiguous coordinate."])
+    def test_realizations_predictor(self):
+        """
+        Test that the gradient matches a finite difference estimate with
+        ensemble realizations as predictor.
+        """
+        initial_guess = np.array([5, 1, 0, 1, 1, 1], dtype=np.float64)
+        args = (prepare_data(set_up_wind_speed_cube(), "realizations") +
+                ("realizations",))
+        plugin = Plugin()
+        result = plugin.truncated_normal_crps_gradient(initial_guess, *args)
+        expected = finite_difference_gradient(
+            plugin.truncated_normal_crps_minimiser, initial_guess, args)
+        np.testing.assert_allclose(
+            result, expected, rtol=1.e-4, atol=1.e-4)
+
+    @ManageWarnings(
+        ignored_messages=["Collapsing a non-contiguous coordinate."])
+    def test_bad_value(self):
+        """
+        Test that the gradient is zero when the CRPS is replaced by the
+        BAD_VALUE.
+        """
+        initial_guess = np.array([1, 1, -100, 1], dtype=np.float64)
+        args = prepare_data(set_up_wind_speed_cube(), "mean") + ("mean",)
+        result = Plugin().truncated_normal_crps_gradient(initial_guess, *args)
+        self.assertArrayEqual(result, np.zeros(4))
+
+
+class Test_crps_minimiser_wrapper_gradient_methods(IrisTest):
+
+    """Test minimising the CRPS using the gradient-based methods."""
+
+    def setUp(self):
+        """Set up the inputs for the minimisation."""
+        cube = set_up_temperature_cube()
+        self.forecast_predictor = cube.collapsed(
+            "realization", iris.analysis.MEAN)
+        self.forecast_variance = cube.collapsed(
+            "realization", iris.analysis.VARIANCE)
+        self.truth = cube.collapsed("realization", iris.analysis.MAX)
+        self.args = prepare_data(cube, "mean") + ("mean",)
+
+    @ManageWarnings(
+        ignored_messages=["Collapsing a non-contiguous coordinate.",
+                          "Minimisation did not result in convergence"])
+    def test_normal_reduces_crps(self):
+        """
+        Test that each gradient-based method returns coefficients that
+        reduce the CRPS for a normal distribution.
+        """
+        initial_guess = np.array([5, 1, 0, 1], dtype=np.float64)
+        for method in Plugin.GRADIENT_METHODS:
+            plugin = Plugin(minimisation_method=method)
+            result = plugin.crps_minimiser_wrapper(
+                initial_guess, self.forecast_predictor, self.truth,
+                self.forecast_variance, "mean", "gaussian")
+            self.assertIsInstance(result, np.ndarray)
+            self.assertLess(
+                plugin.normal_crps_minimiser(result, *self.args),
+                plugin.normal_crps_minimiser(initial_guess, *self.args))
+
+    @ManageWarnings(
+        ignored_messages=["Collapsing a non-contiguous coordinate.",
+                          "Minimisation did not result in convergence"])
+    def test_truncated_normal_reduces_crps(self):
+        """
+        Test that the gradient-based method returns coefficients that
+        reduce the CRPS for a truncated normal distribution.
+        """
+        initial_guess = np.array([5, 1, 0, 1], dtype=np.float64)
+        plugin = Plugin(minimisation_method="L-BFGS-B")
+        result = plugin.crps_minimiser_wrapper(
+            initial_guess, self.forecast_predictor, self.truth,
+            self.forecast_variance, "mean", "truncated gaussian")
+        self.assertLess(
+            plugin.truncated_normal_crps_minimiser(result, *self.args),
+            plugin.truncated_normal_crps_minimiser(
+                initial_guess, *self.args))
+
+    @ManageWarnings(
+        record=True,
+        ignored_messages=["Collapsing a non-contiguous coordinate.",
+                          "Minimisation did not result in convergence",
+                          "The final iteration resulted in a percentage"])
+    def test_fallback_to_nelder_mead(self, warning_list=None):
+        """
+        Test that a warning is raised and Nelder-Mead is used, if the
+        gradient-based minimisation does not succeed.
+        """
+        initial_guess = np.array([0, 0, 1, 1], dtype=np.float64)
+        plugin = Plugin(minimisation_method="L-BFGS-B")
+        plugin.crps_minimiser_wrapper(
+            initial_guess, self.forecast_predictor, self.truth,
+            self.forecast_variance, "mean", "gaussian")
+        self.assertTrue(any(
+            "Minimising using Nelder-Mead instead" in str(item)
+            for item in warning_list))
+
+
 if __name__ == '__main__':
     unittest.main()
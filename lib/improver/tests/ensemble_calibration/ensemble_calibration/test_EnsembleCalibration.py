@@ -33,6 +33,9 @@ Unit tests for the `ensemble_calibration.EnsembleCalibration` class.
 
 """
 import unittest
+import os
+from subprocess import call
+from tempfile import mkdtemp
 
 from iris.cube import CubeList
 from iris.tests import IrisTest
@@ -111,6 +114,30 @@ class Test_process(IrisTest):
         self.assertIsInstance(result, CubeList)
         self.assertEqual(len(result), 2)
 
+    @ManageWarnings(
+        ignored_messages=IGNORED_MESSAGES, warning_types=WARNING_TYPES)
+    def test_calibration_state(self):
+        """
+        Test that the plugin returns an iris.cube.CubeList with the desired
+        length, and saves the calibration state, if a calibration state
+        file is given.
+        """
+        directory = mkdtemp()
+        state_filepath = os.path.join(directory, "state.npz")
+        plugin = Plugin("ensemble model output statistics", "gaussian",
+                        "degreesC", state_filepath=state_filepath)
+        try:
+            result = plugin.process(
+                self.current_temperature_forecast_cube,
+                self.historic_temperature_forecast_cube,
+                self.temperature_truth_cube)
+            self.assertTrue(os.path.exists(state_filepath))
+        finally:
+            call(['rm', '-f', state_filepath])
+            call(['rmdir', directory])
+        self.assertIsInstance(result, CubeList)
+        self.assertEqual(len(result), 2)
+
     @ManageWarnings(
         ignored_messages=IGNORED_MESSAGES, warning_types=WARNING_TYPES)
     def test_basic_temperature_realizations(self):
@@ -35,18 +35,25 @@ class.
 
 """
 import unittest
+from unittest.mock import patch
 
 import iris
 from iris.cube import CubeList
 from iris.tests import IrisTest
 import numpy as np
+from scipy.optimize import minimize
 
+from improver.ensemble_calibration import ensemble_calibration
 from improver.ensemble_calibration.ensemble_calibration import (
     EstimateCoefficientsForEnsembleCalibration as Plugin)
+from improver.ensemble_calibration.ensemble_calibration_state import (
+    EnsembleCalibrationState)
 from improver.tests.ensemble_calibration.ensemble_calibration.\
     helper_functions import (set_up_temperature_cube, set_up_wind_speed_cube,
                              add_forecast_reference_time_and_forecast_period,
                              _create_historic_forecasts, _create_truth)
+from improver.utilities.cube_manipulation import concatenate_cubes
+from improver.utilities.temporal import iris_time_to_datetime
 from improver.utilities.warnings_handler import ManageWarnings
 
 IGNORED_MESSAGES = ["Collapsing a non-contiguous coordinate.",
@@ -170,6 +177,31 @@ class Test__init__(IrisTest):
             self.assertTrue("The statsmodels can not be imported"
                             in str(warning_list[0]))
 
+    def test_invalid_partition(self):
+        """Test that an error is raised for an unsupported partition."""
+        msg = "The partition requested: zone is not supported"
+        with self.assertRaisesRegex(ValueError, msg):
+            Plugin("gaussian", "degreesC", partition="zone")
+
+    def test_tile_partition_without_tile_size(self):
+        """Test that an error is raised if the partition is tile and no
+        tile size is given."""
+        msg = "A tile size of at least 1 is required"
+        with self.assertRaisesRegex(ValueError, msg):
+            Plugin("gaussian", "degreesC", partition="tile")
+
+    def test_invalid_workers(self):
+        """Test that an error is raised for fewer than one worker."""
+        msg = "The number of workers must be at least 1"
+        with self.assertRaisesRegex(ValueError, msg):
+            Plugin("gaussian", "degreesC", workers=0)
+
+    def test_invalid_executor(self):
+        """Test that an error is raised for an unsupported executor."""
+        msg = "The executor requested: cluster is not a supported executor"
+        with self.assertRaisesRegex(ValueError, msg):
+            Plugin("gaussian", "degreesC", executor="cluster")
+
 
 class Test_compute_initial_guess(IrisTest):
 
@@ -577,6 +609,51 @@ class Test_estimate_coefficients_for_ngr(IrisTest):
             self.assertArrayAlmostEqual(optimised_coeffs[key], data)
         self.assertListEqual(coeff_names, ["gamma", "delta", "a", "beta"])
 
+    @ManageWarnings(
+        ignored_messages=IGNORED_MESSAGES, warning_types=WARNING_TYPES)
+    def test_point_partition(self):
+        """Ensure that a set of coefficients is returned for each grid point
+        if the grid is partitioned into points."""
+        plugin = Plugin("gaussian", "degreesC", partition="point")
+        optimised_coeffs, coeff_names = plugin.estimate_coefficients_for_ngr(
+            self.current_temperature_forecast_cube,
+            self.historic_temperature_forecast_cube,
+            self.temperature_truth_cube)
+        for coeffs in optimised_coeffs.values():
+            self.assertEqual(coeffs.shape, (len(coeff_names), 3, 3))
+            self.assertTrue(np.all(np.isfinite(coeffs)))
+
+    @ManageWarnings(
+        ignored_messages=IGNORED_MESSAGES, warning_types=WARNING_TYPES)
+    def test_tile_partition(self):
+        """Ensure that the coefficients are the same at each point within a
+        tile if the grid is partitioned into tiles."""
+        plugin = Plugin("gaussian", "degreesC", partition="tile",
+                        tile_size=2)
+        optimised_coeffs, coeff_names = plugin.estimate_coefficients_for_ngr(
+            self.current_temperature_forecast_cube,
+            self.historic_temperature_forecast_cube,
+            self.temperature_truth_cube)
+        for coeffs in optimised_coeffs.values():
+            self.assertEqual(coeffs.shape, (len(coeff_names), 3, 3))
+            tile = coeffs[:, :2, :2].reshape(len(coeff_names), -1)
+            self.assertArrayEqual(tile, np.repeat(tile[:, :1], 4, axis=1))
+
+    @ManageWarnings(
+        ignored_messages=IGNORED_MESSAGES, warning_types=WARNING_TYPES)
+    def test_partition_with_workers(self):
+        """Ensure that a set of coefficients is returned for each grid point
+        if the regions are processed concurrently."""
+        plugin = Plugin("gaussian", "degreesC", partition="point",
+                        workers=2, executor="thread")
+        optimised_coeffs, coeff_names = plugin.estimate_coefficients_for_ngr(
+            self.current_temperature_forecast_cube,
+            self.historic_temperature_forecast_cube,
+            self.temperature_truth_cube)
+        for coeffs in optimised_coeffs.values():
+            self.assertEqual(coeffs.shape, (len(coeff_names), 3, 3))
+            self.assertTrue(np.all(np.isfinite(coeffs)))
+
     @ManageWarnings(
         ignored_messages=IGNORED_MESSAGES, warning_types=WARNING_TYPES)
     def test_coefficient_values_for_fake_distribution(self):
@@ -914,5 +991,195 @@ class Test_estimate_coefficients_for_ngr(IrisTest):
                         in str(warning_list[0]))
 
 
+class Test_estimate_coefficients_for_ngr_minimisation_method(IrisTest):
+
+    """Test the convergence of estimate_coefficients_for_ngr with each of
+    the minimisation methods."""
+
+    @ManageWarnings(
+        ignored_messages=IGNORED_MESSAGES, warning_types=WARNING_TYPES)
+    def setUp(self):
+        """Set up the forecasts and a truth with random errors, so that the
+        minimum CRPS is found with a non-zero variance."""
+        self.current_forecast = (
+            add_forecast_reference_time_and_forecast_period(
+                set_up_temperature_cube()))
+        self.historic_forecasts = _create_historic_forecasts(
+            self.current_forecast)
+        self.truth = _create_truth(self.current_forecast)
+        self.truth.data = self.truth.data + np.random.RandomState(0).normal(
+            0, 1, self.truth.shape).astype(self.truth.dtype)
+        self.forecast_variance = self.historic_forecasts.collapsed(
+            "realization", iris.analysis.VARIANCE).data.mean()
+
+    def minimise(self, minimisation_method):
+        """Estimate the coefficients with the given minimisation method,
+        returning the coefficients and the results of each call to the
+        scipy minimize function."""
+        results = []
+
+        def record_minimize(*args, **kwargs):
+            """Call minimize and record the result."""
+            result = minimize(*args, **kwargs)
+            results.append(result)
+            return result
+
+        plugin = Plugin("gaussian", "degreesC",
+                        minimisation_method=minimisation_method)
+        with patch.object(ensemble_calibration, "minimize",
+                          side_effect=record_minimize):
+            optimised_coeffs, _ = plugin.estimate_coefficients_for_ngr(
+                self.current_forecast, self.historic_forecasts.copy(),
+                self.truth)
+        coeffs, = optimised_coeffs.values()
+        return coeffs, results
+
+    @ManageWarnings(
+        ignored_messages=IGNORED_MESSAGES, warning_types=WARNING_TYPES)
+    def test_gradient_methods_converge_faster(self):
+        """Test that the gradient-based methods, using the analytic gradient,
+        reach the same minimum CRPS as Nelder-Mead in fewer evaluations of
+        the CRPS. The ensemble variance is the same at every point, so only
+        the predicted variance, gamma**2 + delta**2 * variance, is
+        determined by the minimum, rather than gamma and delta
+        separately."""
+        expected_coeffs, (expected_result,) = self.minimise("Nelder-Mead")
+        self.assertTrue(expected_result.success)
+        for method in ["BFGS", "L-BFGS-B"]:
+            coeffs, (result,) = self.minimise(method)
+            self.assertTrue(result.success)
+            self.assertLess(result.nfev, expected_result.nfev)
+            self.assertAlmostEqual(result.fun, expected_result.fun,
+                                   places=5)
+            self.assertArrayAlmostEqual(coeffs[2:], expected_coeffs[2:],
+                                        decimal=4)
+            self.assertAlmostEqual(
+                coeffs[0]**2 + coeffs[1]**2 * self.forecast_variance,
+                expected_coeffs[0]**2 +
+                expected_coeffs[1]**2 * self.forecast_variance, places=3)
+
+
+class Test_estimate_coefficients_incrementally(IrisTest):
+
+    """Test the estimate_coefficients_incrementally method."""
+
+    @ManageWarnings(
+        ignored_messages=IGNORED_MESSAGES, warning_types=WARNING_TYPES)
+    def setUp(self):
+        """Set up historic forecasts, truth and an empty state."""
+        self.current_forecast = (
+            add_forecast_reference_time_and_forecast_period(
+                set_up_temperature_cube()))
+        self.historic_forecasts = _create_historic_forecasts(
+            self.current_forecast)
+        self.truth = _create_truth(self.current_forecast)
+        self.state = EnsembleCalibrationState("state.npz")
+        self.date = iris_time_to_datetime(
+            self.current_forecast.coord("time").copy())[0]
+
+    @ManageWarnings(
+        ignored_messages=IGNORED_MESSAGES, warning_types=WARNING_TYPES)
+    def test_basic(self):
+        """Test that the training data is added to the state and the
+        coefficients are estimated and stored for the forecast period of
+        the current forecast."""
+        plugin = Plugin("gaussian", "degreesC")
+        optimised_coeffs, coeff_names = (
+            plugin.estimate_coefficients_incrementally(
+                self.current_forecast, self.historic_forecasts, self.truth,
+                self.state))
+        self.assertEqual(list(optimised_coeffs), [self.date])
+        self.assertEqual(len(optimised_coeffs[self.date]), len(coeff_names))
+        self.assertEqual(len(self.state.times), 5)
+        self.assertArrayEqual(self.state.forecast_periods, [14400] * 5)
+        self.assertEqual(self.state.truth.shape, (5, 3, 3))
+        self.assertArrayEqual(self.state.coefficients[14400],
+                              optimised_coeffs[self.date])
+
+    @ManageWarnings(
+        ignored_messages=IGNORED_MESSAGES, warning_types=WARNING_TYPES)
+    def test_one_new_date(self):
+        """Test that the coefficients are estimated from all the training
+        data held when a new date is added to the stored training data."""
+        plugin = Plugin("gaussian", "degreesC")
+        plugin.estimate_coefficients_incrementally(
+            self.current_forecast,
+            _create_historic_forecasts(
+                self.current_forecast, number_of_days=4),
+            self.truth, self.state)
+        self.assertEqual(len(self.state.times), 4)
+        optimised_coeffs, _ = plugin.estimate_coefficients_incrementally(
+            self.current_forecast, self.historic_forecasts, self.truth,
+            self.state)
+        self.assertEqual(len(self.state.times), 5)
+        self.assertTrue(np.all(np.isfinite(optimised_coeffs[self.date])))
+
+    @ManageWarnings(
+        ignored_messages=IGNORED_MESSAGES, warning_types=WARNING_TYPES)
+    def test_two_forecast_periods(self):
+        """Test that the training data for historic forecasts with different
+        forecast periods is held separately, and that the coefficients for
+        each forecast period of the current forecast are estimated only
+        from the training data for that forecast period."""
+        later_forecast = add_forecast_reference_time_and_forecast_period(
+            set_up_temperature_cube(), time_point=402319.0, fp_point=28.0)
+        later_forecast.data += 4
+        current_forecast = concatenate_cubes(
+            CubeList([self.current_forecast, later_forecast]))
+        # The truth is available for the validity times of the historic
+        # forecasts with the shorter forecast period, so the newest of the
+        # historic forecasts with the longer forecast period is omitted.
+        later_historic_forecasts = _create_historic_forecasts(
+            later_forecast)[:, 1:]
+        later_date = iris_time_to_datetime(
+            later_forecast.coord("time").copy())[0]
+
+        plugin = Plugin("gaussian", "degreesC")
+        optimised_coeffs, _ = plugin.estimate_coefficients_incrementally(
+            current_forecast,
+            CubeList([self.historic_forecasts, later_historic_forecasts]),
+            self.truth, self.state)
+
+        self.assertEqual(len(self.state.times), 9)
+        self.assertEqual(len(self.state.training_data(14400)[0]), 5)
+        self.assertEqual(len(self.state.training_data(100800)[0]), 4)
+        self.assertEqual(sorted(optimised_coeffs), [self.date, later_date])
+        self.assertFalse(np.allclose(optimised_coeffs[self.date],
+                                     optimised_coeffs[later_date]))
+
+        # The coefficients for the shorter forecast period match those
+        # estimated from its own historic forecasts alone.
+        expected, _ = plugin.estimate_coefficients_incrementally(
+            self.current_forecast, self.historic_forecasts, self.truth,
+            EnsembleCalibrationState("state.npz"))
+        self.assertArrayAlmostEqual(optimised_coeffs[self.date],
+                                    expected[self.date])
+
+    @ManageWarnings(
+        ignored_messages=IGNORED_MESSAGES, warning_types=WARNING_TYPES)
+    def test_partition(self):
+        """Test that gridded coefficients are estimated if the grid is
+        partitioned."""
+        plugin = Plugin("gaussian", "degreesC", partition="tile",
+                        tile_size=2)
+        optimised_coeffs, coeff_names = (
+            plugin.estimate_coefficients_incrementally(
+                self.current_forecast, self.historic_forecasts, self.truth,
+                self.state))
+        self.assertEqual(optimised_coeffs[self.date].shape,
+                         (len(coeff_names), 3, 3))
+
+    def test_realizations_predictor(self):
+        """Test that an error is raised if the realizations are the
+        predictor."""
+        plugin = Plugin("gaussian", "degreesC",
+                        predictor_of_mean_flag="realizations")
+        msg = "Coefficients can only be estimated incrementally"
+        with self.assertRaisesRegex(ValueError, msg):
+            plugin.estimate_coefficients_incrementally(
+                self.current_forecast, self.historic_forecasts, self.truth,
+                self.state)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# (C) British Crown Copyright 2017-2018 Met Office.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holder nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+"""
+Unit tests for the
+`ensemble_calibration_state.EnsembleCalibrationState` class.
+
+"""
+import os
+from subprocess import call
+from tempfile import mkdtemp
+import unittest
+
+from iris.tests import IrisTest
+import numpy as np
+
+from improver.ensemble_calibration.ensemble_calibration_state import (
+    EnsembleCalibrationState as Plugin)
+
+
+class Test__init__(IrisTest):
+
+    """Test the __init__ method."""
+
+    def setUp(self):
+        """Set up a path within a temporary directory."""
+        self.directory = mkdtemp()
+        self.filepath = os.path.join(self.directory, "state.npz")
+
+    def tearDown(self):
+        """Remove temporary directories created for testing."""
+        call(['rm', '-f', self.filepath])
+        call(['rmdir', self.directory])
+
+    def test_new_state(self):
+        """Test that an empty state is created if the file does not
+        exist."""
+        plugin = Plugin(self.filepath, window_length=3)
+        self.assertEqual(plugin.window_length, 3)
+        self.assertEqual(len(plugin.times), 0)
+        self.assertIsNone(plugin.truth)
+        self.assertEqual(plugin.coefficients, {})
+
+    def test_invalid_window_length(self):
+        """Test that an error is raised for a window length less than 1."""
+        msg = "The window length must be at least 1"
+        with self.assertRaisesRegex(ValueError, msg):
+            Plugin(self.filepath, window_length=0)
+
+
+class Test__repr__(IrisTest):
+
+    """Test the __repr__ method."""
+
+    def test_basic(self):
+        """Test that the __repr__ returns the expected string."""
+        result = str(Plugin("state.npz", window_length=3))
+        msg = ('<EnsembleCalibrationState: filepath: state.npz; '
+               'window_length: 3; number of dates: 0; '
+               'number of forecast periods: 0>')
+        self.assertEqual(result, msg)
+
+
+class Test_add(IrisTest):
+
+    """Test the add method."""
+
+    def setUp(self):
+        """Set up a state and some training data."""
+        self.plugin = Plugin("state.npz")
+        self.data = np.ones((3, 3), dtype=np.float32)
+
+    def test_basic(self):
+        """Test that the training data for a date is added."""
+        self.plugin.add(10, 3600, self.data, 2 * self.data, 3 * self.data)
+        self.assertArrayEqual(self.plugin.times, [10])
+        self.assertArrayEqual(self.plugin.forecast_periods, [3600])
+        self.assertArrayEqual(self.plugin.forecast_mean, [self.data])
+        self.assertArrayEqual(self.plugin.forecast_variance, [2 * self.data])
+        self.assertArrayEqual(self.plugin.truth, [3 * self.data])
+
+    def test_dates_sorted(self):
+        """Test that the dates are held in ascending order."""
+        self.plugin.add(20, 3600, 2 * self.data, self.data, self.data)
+        self.plugin.add(10, 3600, self.data, self.data, self.data)
+        self.assertArrayEqual(self.plugin.times, [10, 20])
+        self.assertArrayEqual(self.plugin.forecast_mean,
+                              [self.data, 2 * self.data])
+
+    def test_replace_date(self):
+        """Test that the data for a date already held is replaced."""
+        self.plugin.add(10, 3600, self.data, self.data, self.data)
+        self.plugin.add(10, 3600, 2 * self.data, self.data, self.data)
+        self.assertArrayEqual(self.plugin.times, [10])
+        self.assertArrayEqual(self.plugin.forecast_mean, [2 * self.data])
+
+    def test_same_date_different_forecast_period(self):
+        """Test that the data for a date already held for a different
+        forecast period is not replaced."""
+        self.plugin.add(10, 3600, self.data, self.data, self.data)
+        self.plugin.add(10, 7200, 2 * self.data, self.data, self.data)
+        self.assertArrayEqual(self.plugin.times, [10, 10])
+        self.assertArrayEqual(self.plugin.forecast_periods, [3600, 7200])
+        self.assertArrayEqual(self.plugin.forecast_mean,
+                              [self.data, 2 * self.data])
+
+    def test_window_length(self):
+        """Test that the oldest dates are removed beyond the window
+        length."""
+        self.plugin.window_length = 2
+        for time in [10, 20, 30]:
+            self.plugin.add(time, 3600, time * self.data, self.data,
+                            self.data)
+        self.assertArrayEqual(self.plugin.times, [20, 30])
+        self.assertArrayEqual(self.plugin.forecast_mean,
+                              [20 * self.data, 30 * self.data])
+
+    def test_window_length_for_each_forecast_period(self):
+        """Test that the window length is applied separately to each
+        forecast period."""
+        self.plugin.window_length = 2
+        self.plugin.add(10, 7200, self.data, self.data, self.data)
+        for time in [10, 20, 30]:
+            self.plugin.add(time, 3600, time * self.data, self.data,
+                            self.data)
+        self.assertArrayEqual(self.plugin.times, [10, 20, 30])
+        self.assertArrayEqual(self.plugin.forecast_periods,
+                              [7200, 3600, 3600])
+
+    def test_mismatched_shape(self):
+        """Test that an error is raised if the shape of the new data does
+        not match the stored data."""
+        self.plugin.add(10, 3600, self.data, self.data, self.data)
+        msg = "does not match the shape of the stored training data"
+        with self.assertRaisesRegex(ValueError, msg):
+            self.plugin.add(20, 3600, self.data[0], self.data[0],
+                            self.data[0])
+
+
+class Test_training_data(IrisTest):
+
+    """Test the training_data method."""
+
+    def setUp(self):
+        """Set up a state holding training data for two forecast
+        periods."""
+        self.plugin = Plugin("state.npz")
+        self.data = np.ones((3, 3), dtype=np.float32)
+        for time in [10, 20]:
+            self.plugin.add(time, 3600, time * self.data, self.data,
+                            self.data)
+        self.plugin.add(20, 7200, 2 * self.data, 3 * self.data,
+                        4 * self.data)
+
+    def test_basic(self):
+        """Test that only the training data for the forecast period is
+        returned."""
+        forecast_mean, forecast_variance, truth = (
+            self.plugin.training_data(7200))
+        self.assertArrayEqual(forecast_mean, [2 * self.data])
+        self.assertArrayEqual(forecast_variance, [3 * self.data])
+        self.assertArrayEqual(truth, [4 * self.data])
+        forecast_mean, _, _ = self.plugin.training_data(3600)
+        self.assertArrayEqual(forecast_mean,
+                              [10 * self.data, 20 * self.data])
+
+    def test_missing_forecast_period(self):
+        """Test that an error is raised if no training data is held for the
+        forecast period."""
+        msg = "No training data is held for the forecast period"
+        with self.assertRaisesRegex(ValueError, msg):
+            self.plugin.training_data(10800)
+
+
+class Test_save(IrisTest):
+
+    """Test the save and load methods."""
+
+    def setUp(self):
+        """Set up a path within a temporary directory."""
+        self.directory = mkdtemp()
+        self.filepath = os.path.join(self.directory, "state.npz")
+
+    def tearDown(self):
+        """Remove temporary directories created for testing."""
+        call(['rm', '-f', self.filepath])
+        call(['rmdir', self.directory])
+
+    def test_round_trip(self):
+        """Test that a saved state is loaded when the class is
+        initialised."""
+        data = np.ones((3, 3), dtype=np.float32)
+        plugin = Plugin(self.filepath)
+        plugin.add(10, 3600, data, 2 * data, 3 * data)
+        plugin.coefficients = {3600: np.array([1., 2., 3., 4.])}
+        plugin.save()
+        result = Plugin(self.filepath)
+        self.assertArrayEqual(result.times, [10])
+        self.assertArrayEqual(result.forecast_periods, [3600])
+        self.assertArrayEqual(result.forecast_variance, [2 * data])
+        self.assertEqual(list(result.coefficients), [3600])
+        self.assertArrayEqual(result.coefficients[3600], [1., 2., 3., 4.])
+
+    def test_no_coefficients(self):
+        """Test that a state without coefficients is loaded with no
+        coefficients."""
+        data = np.ones((3, 3), dtype=np.float32)
+        plugin = Plugin(self.filepath)
+        plugin.add(10, 3600, data, data, data)
+        plugin.save()
+        self.assertEqual(Plugin(self.filepath).coefficients, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
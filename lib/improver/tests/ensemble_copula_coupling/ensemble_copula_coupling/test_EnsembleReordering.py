@@ -45,6 +45,7 @@ from improver.ensemble_copula_coupling.ensemble_copula_coupling import (
 from improver.tests.ensemble_calibration.ensemble_calibration. \
     helper_functions import (set_up_cube, set_up_temperature_cube,
                              add_forecast_reference_time_and_forecast_period)
+from improver.utilities.cube_manipulation import concatenate_cubes
 from improver.utilities.warnings_handler import ManageWarnings
 
 
@@ -571,6 +572,75 @@ class Test_rank_ecc(IrisTest):
             np.array_equal(aresult, result.data) for aresult in permutations]
         self.assertIn(True, matches)
 
+    def test_multiple_times_random_seed(self):
+        """
+        Test that a cube with multiple times can be reordered when a random
+        seed is set, and that each time is reordered using the ranking of the
+        raw ensemble at that time.
+        """
+        later_cube = add_forecast_reference_time_and_forecast_period(
+            set_up_temperature_cube(), time_point=[402296.0], fp_point=5.0)
+        cube = concatenate_cubes(CubeList([self.cube, later_cube]))
+        raw_cube = cube.copy()
+        raw_cube.data[1] = raw_cube.data[1, ::-1]
+        calibrated_cube = cube.copy()
+        calibrated_cube.data = np.sort(cube.data, axis=1)
+
+        result = Plugin().rank_ecc(calibrated_cube, raw_cube, random_seed=0)
+        self.assertEqual(result.shape, cube.shape)
+        for time_index in range(2):
+            self.assertArrayEqual(
+                np.argsort(result.data[time_index], axis=0),
+                np.argsort(raw_cube.data[time_index], axis=0))
+
+
+class Test__reorder_in_chunks(IrisTest):
+
+    """Test the _reorder_in_chunks method in the EnsembleReordering
+    plugin."""
+
+    def setUp(self):
+        """Set up raw and post-processed data with more members than
+        np.choose supports."""
+        random_state = np.random.RandomState(0)
+        self.raw_data = random_state.rand(40, 3, 5)
+        self.raw_data[:, 0, 0] = 1.
+        self.post_processed_data = np.sort(
+            random_state.rand(40, 3, 5), axis=0)
+        self.random_data = random_state.rand(40, 3, 5)
+
+    def test_ranking_matches_raw(self):
+        """Test the ranking of the reordered data matches that of the raw
+        data, with ties split using the random data."""
+        result = Plugin._reorder_in_chunks(
+            self.post_processed_data, self.raw_data, self.random_data)
+        self.assertEqual(result.shape, self.raw_data.shape)
+        expected_ranking = np.argsort(np.lexsort(
+            (self.random_data, self.raw_data), axis=0), axis=0)
+        self.assertArrayEqual(
+            np.argsort(np.argsort(result, axis=0), axis=0), expected_ranking)
+        self.assertArrayEqual(np.sort(result, axis=0),
+                              self.post_processed_data)
+
+    def test_chunks(self):
+        """Test the result is independent of the chunk size."""
+        expected = Plugin._reorder_in_chunks(
+            self.post_processed_data, self.raw_data, self.random_data)
+        result = Plugin._reorder_in_chunks(
+            self.post_processed_data, self.raw_data, self.random_data,
+            chunk_size=4)
+        self.assertArrayEqual(result, expected)
+
+    def test_random_ordering(self):
+        """Test the data are reordered using the indices that sort the
+        random data when random_ordering is True."""
+        result = Plugin._reorder_in_chunks(
+            self.post_processed_data, self.raw_data, self.random_data,
+            random_ordering=True, chunk_size=4)
+        expected_ranking = np.argsort(self.random_data, axis=0)
+        self.assertArrayEqual(
+            np.argsort(np.argsort(result, axis=0), axis=0), expected_ranking)
+
 
 class Test_process(IrisTest):
 
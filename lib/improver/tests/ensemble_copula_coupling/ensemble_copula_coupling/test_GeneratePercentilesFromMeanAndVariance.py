@@ -49,6 +49,18 @@ from improver.tests.ensemble_calibration.ensemble_calibration. \
 from improver.utilities.warnings_handler import ManageWarnings
 
 
+class Test__repr__(IrisTest):
+
+    """Test string representation of plugin."""
+
+    def test_basic(self):
+        """Test string representation"""
+        expected_string = ("<GeneratePercentilesFromMeanAndVariance: "
+                           "chunk_size: 100000>")
+        result = str(Plugin(chunk_size=100000))
+        self.assertEqual(result, expected_string)
+
+
 class Test__mean_and_variance_to_percentiles(IrisTest):
 
     """Test the _mean_and_variance_to_percentiles plugin."""
@@ -291,6 +303,48 @@ class Test__mean_and_variance_to_percentiles(IrisTest):
         self.assertIsInstance(result, Cube)
         self.assertArrayAlmostEqual(result.data, data)
 
+    @ManageWarnings(
+        ignored_messages=["Collapsing a non-contiguous coordinate."])
+    def test_chunking(self):
+        """
+        Test that the plugin returns the same values when the points are
+        processed in chunks.
+        """
+        cube = self.current_temperature_forecast_cube
+        current_forecast_predictor = cube.collapsed(
+            "realization", iris.analysis.MEAN)
+        current_forecast_variance = cube.collapsed(
+            "realization", iris.analysis.VARIANCE)
+        percentiles = [10, 50, 90]
+        plugin = Plugin()
+        expected = plugin._mean_and_variance_to_percentiles(
+            current_forecast_predictor, current_forecast_variance,
+            percentiles)
+        result = plugin._mean_and_variance_to_percentiles(
+            current_forecast_predictor, current_forecast_variance,
+            percentiles, chunk_size=2)
+        self.assertArrayAlmostEqual(result.data, expected.data)
+
+    @ManageWarnings(
+        ignored_messages=["Collapsing a non-contiguous coordinate."])
+    def test_float32_data(self):
+        """
+        Test that the plugin returns float32 data if the mean and variance
+        are float32.
+        """
+        cube = self.current_temperature_forecast_cube
+        cube.data = cube.data.astype(np.float32)
+        current_forecast_predictor = cube.collapsed(
+            "realization", iris.analysis.MEAN)
+        current_forecast_variance = cube.collapsed(
+            "realization", iris.analysis.VARIANCE)
+        percentiles = [10, 50, 90]
+        plugin = Plugin()
+        result = plugin._mean_and_variance_to_percentiles(
+            current_forecast_predictor, current_forecast_variance,
+            percentiles)
+        self.assertEqual(result.dtype, np.float32)
+
 
 class Test_process(IrisTest):
 
@@ -348,6 +402,26 @@ class Test_process(IrisTest):
             len(raw_forecast.coord("realization").points),
             len(result.coord("percentile_over_realization").points))
 
+    @ManageWarnings(
+        ignored_messages=["Only a single cube so no differences",
+                          "Collapsing a non-contiguous coordinate."])
+    def test_chunk_size(self):
+        """
+        Test that the chunk_size set on the plugin is used, and gives the
+        same result as processing all points at once.
+        """
+        cube = self.current_temperature_forecast_cube
+        current_forecast_predictor = cube.collapsed(
+            "realization", iris.analysis.MEAN)
+        current_forecast_variance = cube.collapsed(
+            "realization", iris.analysis.VARIANCE)
+        predictor_and_variance = CubeList(
+            [current_forecast_predictor, current_forecast_variance])
+
+        expected = Plugin().process(predictor_and_variance, 3)
+        result = Plugin(chunk_size=2).process(predictor_and_variance, 3)
+        self.assertArrayAlmostEqual(result.data, expected.data)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -43,6 +43,7 @@ from improver.ensemble_copula_coupling.ensemble_copula_coupling import (
 from improver.tests.ensemble_calibration.ensemble_calibration. \
     helper_functions import set_up_probability_above_threshold_temperature_cube
 from improver.utilities.cube_manipulation import enforce_coordinate_ordering
+from improver.utilities.warnings_handler import ManageWarnings
 
 
 class Test__repr__(IrisTest):
@@ -51,8 +52,9 @@ class Test__repr__(IrisTest):
 
     def test_basic(self):
         """Test string representation"""
-        expected_string = "<GenerateProbabilitiesFromMeanAndVariance>"
-        result = str(Plugin())
+        expected_string = ("<GenerateProbabilitiesFromMeanAndVariance: "
+                           "chunk_size: 100000>")
+        result = str(Plugin(chunk_size=100000))
         self.assertEqual(result, expected_string)
 
 
@@ -180,6 +182,46 @@ class Test__mean_and_variance_to_probabilities(IrisTest):
             self.means, self.variances, self.template_cube)
         np.testing.assert_allclose(result.data, expected, rtol=1.e-4)
 
+    def test_chunking(self):
+        """Test that the expected probabilites are returned when the points
+        are processed in chunks."""
+
+        expected = (np.ones((3, 3, 3)) * [0.75, 0.5, 0.25]).T
+        result = Plugin()._mean_and_variance_to_probabilities(
+            self.means, self.variances, self.template_cube, chunk_size=2)
+        np.testing.assert_allclose(result.data, expected, rtol=1.e-4)
+
+    @ManageWarnings(record=True)
+    def test_zero_variance_above(self, warning_list=None):
+        """Test that a zero variance gives probabilities of 1 for thresholds
+        below the mean and 0 for thresholds at or above the mean, when the
+        probabilities are above the thresholds, without raising any
+        warnings."""
+
+        self.template_cube.coord('threshold').points = [8., 10., 12.]
+        self.variances.data[0, 0] = 0.
+        result = Plugin()._mean_and_variance_to_probabilities(
+            self.means, self.variances, self.template_cube)
+        self.assertArrayEqual(result.data[:, 0, 0], [1., 0., 0.])
+        self.assertFalse(np.isnan(result.data).any())
+        self.assertEqual(warning_list, [])
+
+    @ManageWarnings(record=True)
+    def test_zero_variance_below(self, warning_list=None):
+        """Test that a zero variance gives probabilities of 0 for thresholds
+        below the mean and 1 for thresholds at or above the mean, when the
+        probabilities are below the thresholds, without raising any
+        warnings."""
+
+        self.template_cube.attributes['relative_to_threshold'] = 'below'
+        self.template_cube.coord('threshold').points = [8., 10., 12.]
+        self.variances.data[0, 0] = 0.
+        result = Plugin()._mean_and_variance_to_probabilities(
+            self.means, self.variances, self.template_cube)
+        self.assertArrayEqual(result.data[:, 0, 0], [0., 1., 1.])
+        self.assertFalse(np.isnan(result.data).any())
+        self.assertEqual(warning_list, [])
+
 
 class Test_process(IrisTest):
 
@@ -216,6 +258,16 @@ class Test_process(IrisTest):
             self.means, self.variances, self.template_cube)
         self.assertTrue((result.data != self.template_cube.data).all())
 
+    def test_chunk_size(self):
+        """Test that the chunk_size set on the plugin is used, and gives the
+        same result as processing all points at once."""
+
+        expected = Plugin().process(
+            self.means, self.variances, self.template_cube.copy())
+        result = Plugin(chunk_size=2).process(
+            self.means, self.variances, self.template_cube.copy())
+        self.assertArrayAlmostEqual(result.data, expected.data)
+
 
 if __name__ == '__main__':
     unittest.main()
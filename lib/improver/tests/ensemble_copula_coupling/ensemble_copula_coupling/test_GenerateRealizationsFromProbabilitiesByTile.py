@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# (C) British Crown Copyright 2017-2018 Met Office.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holder nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+"""
+Unit tests for the
+`ensemble_copula_coupling.GenerateRealizationsFromProbabilitiesByTile` class.
+
+"""
+import unittest
+
+from iris.cube import Cube
+from iris.tests import IrisTest
+
+from improver.ensemble_copula_coupling.ensemble_copula_coupling import (
+    EnsembleReordering, GeneratePercentilesFromProbabilities,
+    GenerateRealizationsFromProbabilitiesByTile as Plugin,
+    RebadgePercentilesAsRealizations)
+from improver.tests.ensemble_calibration.ensemble_calibration. \
+    helper_functions import (
+        add_forecast_reference_time_and_forecast_period,
+        set_up_probability_above_threshold_temperature_cube,
+        set_up_temperature_cube)
+from improver.utilities.warnings_handler import ManageWarnings
+
+
+class Test__init__(IrisTest):
+
+    """Test the __init__ method."""
+
+    def test_basic(self):
+        """Test that the options are stored."""
+        plugin = Plugin(tile_size=10, no_of_realizations=5, random_seed=0)
+        self.assertEqual(plugin.tile_size, 10)
+        self.assertEqual(plugin.no_of_realizations, 5)
+        self.assertFalse(plugin.random_ordering)
+        self.assertEqual(plugin.random_seed, 0)
+
+    def test_invalid_tile_size(self):
+        """Test that an error is raised for a tile size less than 1."""
+        msg = "The tile size must be at least 1"
+        with self.assertRaisesRegex(ValueError, msg):
+            Plugin(tile_size=0)
+
+
+class Test__repr__(IrisTest):
+
+    """Test the __repr__ method."""
+
+    def test_basic(self):
+        """Test that the __repr__ returns the expected string."""
+        result = str(Plugin(tile_size=10))
+        msg = ('<GenerateRealizationsFromProbabilitiesByTile: '
+               'tile_size: 10; no_of_realizations: None; '
+               'random_ordering: False; random_seed: None>')
+        self.assertEqual(result, msg)
+
+
+class Test_process(IrisTest):
+
+    """Test the process method."""
+
+    def setUp(self):
+        """Set up probability and raw ensemble cubes on the same grid."""
+        self.probability_cube = (
+            add_forecast_reference_time_and_forecast_period(
+                set_up_probability_above_threshold_temperature_cube()))
+        self.raw_cube = (
+            add_forecast_reference_time_and_forecast_period(
+                set_up_temperature_cube()))
+
+    @ManageWarnings(
+        ignored_messages=["Only a single cube so no differences"])
+    def test_basic(self):
+        """Test that the plugin returns a cube with lazy data and a
+        realization coordinate."""
+        result = Plugin(tile_size=2).process(self.probability_cube)
+        self.assertIsInstance(result, Cube)
+        self.assertTrue(result.has_lazy_data())
+        self.assertEqual(result.coord_dims("realization"), (0,))
+        self.assertArrayEqual(result.coord("realization").points, [0, 1, 2])
+
+    @ManageWarnings(
+        ignored_messages=["Only a single cube so no differences"])
+    def test_matches_rebadged_percentiles(self):
+        """Test that processing by tile gives the same result as converting
+        the whole cube at once and rebadging the percentiles."""
+        expected = RebadgePercentilesAsRealizations.process(
+            GeneratePercentilesFromProbabilities().process(
+                self.probability_cube.copy(), no_of_percentiles=5))
+        for tile_size in [1, 2, 10]:
+            result = Plugin(
+                tile_size=tile_size, no_of_realizations=5).process(
+                    self.probability_cube.copy())
+            self.assertEqual(result, expected)
+
+    @ManageWarnings(
+        ignored_messages=["Only a single cube so no differences"])
+    def test_matches_reordering(self):
+        """Test that processing by tile gives the same result as reordering
+        the whole cube at once using the raw ensemble."""
+        expected = EnsembleReordering().process(
+            GeneratePercentilesFromProbabilities().process(
+                self.probability_cube.copy()),
+            self.raw_cube.copy(), random_seed=0)
+        result = Plugin(tile_size=2, random_seed=0).process(
+            self.probability_cube.copy(), self.raw_cube.copy())
+        self.assertEqual(result, expected)
+
+    @ManageWarnings(
+        ignored_messages=["Only a single cube so no differences"])
+    def test_matches_reordering_tied_values(self):
+        """Test that processing by tile gives the same result as reordering
+        the whole cube at once for a fixed random seed, where the ties in
+        the raw ensemble are split using random data."""
+        self.raw_cube.data[:] = 273.15
+        expected = EnsembleReordering().process(
+            GeneratePercentilesFromProbabilities().process(
+                self.probability_cube.copy()),
+            self.raw_cube.copy(), random_seed=0)
+        for tile_size in [1, 2]:
+            result = Plugin(tile_size=tile_size, random_seed=0).process(
+                self.probability_cube.copy(), self.raw_cube.copy())
+            self.assertEqual(result, expected)
+
+    @ManageWarnings(
+        ignored_messages=["Only a single cube so no differences"])
+    def test_matches_random_ordering(self):
+        """Test that processing by tile gives the same result as reordering
+        the whole cube at once randomly for a fixed random seed."""
+        expected = EnsembleReordering().process(
+            GeneratePercentilesFromProbabilities().process(
+                self.probability_cube.copy()),
+            self.raw_cube.copy(), random_ordering=True, random_seed=0)
+        result = Plugin(
+            tile_size=2, random_ordering=True, random_seed=0).process(
+                self.probability_cube.copy(), self.raw_cube.copy())
+        self.assertEqual(result, expected)
+
+    @ManageWarnings(
+        ignored_messages=["Only a single cube so no differences"])
+    def test_mismatched_grid(self):
+        """Test that an error is raised if the raw forecast is not on the
+        same grid as the probabilities."""
+        msg = "must be on the same grid"
+        with self.assertRaisesRegex(ValueError, msg):
+            Plugin().process(self.probability_cube, self.raw_cube[..., :2])
+
+
+if __name__ == '__main__':
+    unittest.main()
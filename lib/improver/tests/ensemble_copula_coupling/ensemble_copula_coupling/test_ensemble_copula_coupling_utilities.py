@@ -45,7 +45,7 @@ from improver.ensemble_copula_coupling.ensemble_copula_coupling_utilities \
     import (choose_set_of_percentiles, create_cube_with_percentiles,
             insert_lower_and_upper_endpoint_to_1d_array,
             concatenate_2d_array_with_2d_array_endpoints,
-            get_bounds_of_distribution,
+            get_bounds_of_distribution, interpolate_multiple_rows,
             restore_non_probabilistic_dimensions)
 from improver.tests.ensemble_calibration.ensemble_calibration. \
     helper_functions import (
@@ -556,5 +556,56 @@ class Test_restore_non_probabilistic_dimensions(IrisTest):
                 cube.data, cube, "nonsense", plen)
 
 
+class Test_interpolate_multiple_rows(IrisTest):
+
+    """Test the interpolate_multiple_rows function."""
+
+    def setUp(self):
+        """Set up arrays of data points."""
+        self.x = np.array([-1., 0., 0.2, 0.5, 0.75, 1., 2.])
+        self.xp = np.array([[0., 0.5, 1.],
+                            [0., 0.25, 1.],
+                            [0.1, 0.5, 0.5]])
+        self.fp = np.array([[10., 20., 30.],
+                            [0., 1., 2.],
+                            [5., np.inf, 7.]])
+
+    def assert_matches_np_interp(self, result, xp, fp):
+        """Check the result is identical to calling np.interp on each
+        row."""
+        xp = np.broadcast_to(np.atleast_2d(xp), result.shape[:1] + (3,))
+        fp = np.broadcast_to(np.atleast_2d(fp), result.shape[:1] + (3,))
+        expected = np.array([np.interp(self.x, xp_row, fp_row)
+                             for xp_row, fp_row in zip(xp, fp)])
+        self.assertArrayEqual(result, expected)
+
+    def test_2d_xp_and_fp(self):
+        """Test interpolation with different data points for each row."""
+        result = interpolate_multiple_rows(self.x, self.xp, self.fp)
+        self.assertEqual(result.shape, (3, 7))
+        self.assertArrayAlmostEqual(
+            result[0], [10., 10., 14., 20., 25., 30., 30.])
+        self.assert_matches_np_interp(result, self.xp, self.fp)
+
+    def test_1d_xp(self):
+        """Test interpolation with the same x-coordinates for each row."""
+        result = interpolate_multiple_rows(self.x, self.xp[0], self.fp)
+        self.assertEqual(result.shape, (3, 7))
+        self.assert_matches_np_interp(result, self.xp[0], self.fp)
+
+    def test_1d_fp(self):
+        """Test interpolation with the same y-coordinates for each row."""
+        result = interpolate_multiple_rows(self.x, self.xp, self.fp[1])
+        self.assertEqual(result.shape, (3, 7))
+        self.assert_matches_np_interp(result, self.xp, self.fp[1])
+
+    def test_non_monotonic_row(self):
+        """Test a row with x-coordinates that are not monotonically
+        increasing gives the same result as np.interp."""
+        self.xp[1] = [0.5, 0., 1.]
+        result = interpolate_multiple_rows(self.x, self.xp, self.fp)
+        self.assert_matches_np_interp(result, self.xp, self.fp)
+
+
 if __name__ == '__main__':
     unittest.main()
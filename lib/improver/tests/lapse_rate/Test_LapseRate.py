@@ -68,63 +68,74 @@ class Test__calc_lapse_rate(IrisTest):
     def setUp(self):
         """Sets up arrays."""
 
-        self.temperature = np.array([280.06, 279.97, 279.90, 280.15, 280.03,
-                                     279.96, 280.25, 280.33, 280.27])
-        self.orography = np.array([174.67, 179.87, 188.46, 155.84, 169.58,
-                                   185.05, 134.90, 144.00, 157.89])
+        self.temperature = np.array([[280.06, 279.97, 279.90],
+                                     [280.15, 280.03, 279.96],
+                                     [280.25, 280.33, 280.27]])
+        self.orography = np.array([[174.67, 179.87, 188.46],
+                                   [155.84, 169.58, 185.05],
+                                   [134.90, 144.00, 157.89]])
 
     def test_returns_expected_values(self):
-        """Test that the function returns expected lapse rate. """
+        """Test that the function returns expected lapse rate at the central
+           point, which uses all of the points in the array. """
 
         expected_out = -0.00765005774676
         result = LapseRate(nbhood_radius=1)._calc_lapse_rate(self.temperature,
                                                              self.orography)
-        self.assertArrayAlmostEqual(result, expected_out)
+        self.assertArrayAlmostEqual(result[1, 1], expected_out)
+
+    def test_matches_least_squares_fit(self):
+        """Test that the function returns the same lapse rate as a
+           least-squares fit to the valid points in the neighbourhood of
+           each point. """
+
+        plugin = LapseRate(nbhood_radius=1)
+        result = plugin._calc_lapse_rate(self.temperature, self.orography)
+        for row, column in [(0, 0), (0, 1), (2, 2)]:
+            rows = slice(max(row - 1, 0), row + 2)
+            columns = slice(max(column - 1, 0), column + 2)
+            x_data = self.orography[rows, columns].flatten()
+            y_data = self.temperature[rows, columns].flatten()
+            matrix = np.stack([x_data, np.ones(len(x_data))], axis=0).T
+            expected_out, _ = np.linalg.lstsq(matrix, y_data, rcond=None)[0]
+            self.assertAlmostEqual(result[row, column], expected_out)
 
     def test_handles_nan(self):
         """Test that the function returns DALR value when central point
            is NaN."""
 
-        self.temperature[4] = np.nan
+        self.temperature[1, 1] = np.nan
         expected_out = DALR
         result = LapseRate(nbhood_radius=1)._calc_lapse_rate(self.temperature,
                                                              self.orography)
-        self.assertArrayAlmostEqual(result, expected_out)
+        self.assertArrayAlmostEqual(result[1, 1], expected_out)
 
+    def test_ignores_nan_neighbour(self):
+        """Test that a neighbour with a NaN temperature is not used."""
 
-class Test__create_heightdiff_mask(IrisTest):
-    """Test the _create_heightdiff_mask function."""
-
-    def setUp(self):
-        """Sets up arrays."""
-
-        self.orography = np.array([[35, 40, 20, 10, 0, 10, 20, -30, -40],
-                                   [35, 40, 20, 10, 0, 10, 20, -30, -40]])
-
-    def test_returns_expected_values(self):
-        """Test that the function returns True at points where the height
-           difference to the central pixel is greater than 35m."""
-
-        expected_out = np.array(
-            [[True, True, False, False, False, False, False, False, True],
-             [True, True, False, False, False, False, False, False, True]])
-
-        result = LapseRate(nbhood_radius=1)._create_heightdiff_mask(
-            self.orography)
-        self.assertArrayAlmostEqual(result, expected_out)
-
-    def test_change_height_thresh(self):
-        """Test that the function performs as expected when the height
-           difference threshold has been changed."""
-
-        expected_out = np.array(
-            [[False, True, False, False, False, False, False, False, True],
-             [False, True, False, False, False, False, False, False, True]])
-
-        result = LapseRate(max_height_diff=40,
-                           nbhood_radius=1)._create_heightdiff_mask(
-            self.orography)
-        self.assertArrayAlmostEqual(result, expected_out)
+        self.temperature[0, 0] = np.nan
+        x_data = self.orography.flatten()[1:]
+        y_data = self.temperature.flatten()[1:]
+        matrix = np.stack([x_data, np.ones(len(x_data))], axis=0).T
+        expected_out, _ = np.linalg.lstsq(matrix, y_data, rcond=None)[0]
+        result = LapseRate(nbhood_radius=1)._calc_lapse_rate(self.temperature,
+                                                             self.orography)
+        self.assertAlmostEqual(result[1, 1], expected_out)
+
+    def test_max_height_diff(self):
+        """Test that neighbours where the height difference to the central
+           point is greater than max_height_diff are not used."""
+
+        # The points with heights of 134.90 and 144.00 differ from the
+        # central point by more than 20m.
+        valid = np.absolute(self.orography - self.orography[1, 1]) < 20
+        x_data = self.orography[valid]
+        y_data = self.temperature[valid]
+        matrix = np.stack([x_data, np.ones(len(x_data))], axis=0).T
+        expected_out, _ = np.linalg.lstsq(matrix, y_data, rcond=None)[0]
+        plugin = LapseRate(max_height_diff=20, nbhood_radius=1)
+        result = plugin._calc_lapse_rate(self.temperature, self.orography)
+        self.assertAlmostEqual(result[1, 1], expected_out)
 
 
 class Test_process(IrisTest):
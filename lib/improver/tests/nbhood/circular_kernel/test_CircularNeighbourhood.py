@@ -36,8 +36,10 @@ import unittest
 from iris.cube import Cube
 from iris.tests import IrisTest
 import numpy as np
+import scipy.ndimage.filters
 
-from improver.nbhood.circular_kernel import CircularNeighbourhood
+from improver.nbhood.circular_kernel import (
+    CircularNeighbourhood, circular_kernel)
 from improver.tests.nbhood.nbhood.test_BaseNeighbourhoodProcessing import (
     SINGLE_POINT_RANGE_2_CENTROID_FLAT, SINGLE_POINT_RANGE_3_CENTROID,
     SINGLE_POINT_RANGE_5_CENTROID, set_up_cube)
@@ -55,6 +57,13 @@ class Test__init__(IrisTest):
         with self.assertRaisesRegex(ValueError, msg):
             CircularNeighbourhood(sum_or_fraction=sum_or_fraction)
 
+    def test_correlation_method(self):
+        """Test that a ValueError is raised if an invalid option is passed
+        in for correlation_method."""
+        msg = "The correlation method nonsense is invalid"
+        with self.assertRaisesRegex(ValueError, msg):
+            CircularNeighbourhood(correlation_method="nonsense")
+
 
 class Test__repr__(IrisTest):
 
@@ -317,6 +326,70 @@ class Test_apply_circular_kernel(IrisTest):
         self.assertArrayAlmostEqual(result.data, expected)
 
 
+class Test__use_fft(IrisTest):
+
+    """Test choosing whether to apply the kernel using an FFT."""
+
+    def setUp(self):
+        """Set up data and kernels for the tests."""
+        self.data = np.ones((20, 20), dtype=np.float32)
+        self.small_kernel = np.ones((3, 3))
+        self.large_kernel = np.ones((11, 11))
+
+    def test_auto(self):
+        """Test that the FFT is only used for large kernels by default."""
+        plugin = CircularNeighbourhood()
+        self.assertFalse(plugin._use_fft(self.data, self.small_kernel))
+        self.assertTrue(plugin._use_fft(self.data, self.large_kernel))
+
+    def test_direct(self):
+        """Test that the FFT is not used if a direct correlation is
+        requested."""
+        plugin = CircularNeighbourhood(correlation_method="direct")
+        self.assertFalse(plugin._use_fft(self.data, self.large_kernel))
+
+    def test_fft(self):
+        """Test that the FFT is used for small kernels if requested."""
+        plugin = CircularNeighbourhood(correlation_method="fft")
+        self.assertTrue(plugin._use_fft(self.data, self.small_kernel))
+
+    def test_non_finite_or_integer_data(self):
+        """Test that the FFT is not used for data containing NaNs or for
+        integer data."""
+        plugin = CircularNeighbourhood(correlation_method="fft")
+        self.data[0, 0] = np.nan
+        self.assertFalse(plugin._use_fft(self.data, self.large_kernel))
+        self.assertFalse(
+            plugin._use_fft(self.data.astype(int), self.large_kernel))
+
+
+class Test_correlate_fft(IrisTest):
+
+    """Test applying a kernel using an FFT."""
+
+    def test_matches_direct(self):
+        """Test that the result matches a direct correlation, including
+        at the edges of the domain."""
+        data = np.random.RandomState(0).rand(2, 30, 40).astype(np.float32)
+        fullranges = np.array([0, 6, 6])
+        kernel = circular_kernel(fullranges, (6, 6), True)
+        expected = scipy.ndimage.filters.correlate(
+            data, kernel, mode='nearest')
+        result = CircularNeighbourhood.correlate_fft(data, kernel)
+        self.assertEqual(result.dtype, np.float32)
+        self.assertArrayAlmostEqual(result, expected, decimal=4)
+
+    def test_no_negative_values(self):
+        """Test that rounding errors in the FFT do not produce values
+        outside the range of the data."""
+        data = np.zeros((30, 30))
+        data[15, 15] = 1.
+        kernel = np.ones((11, 11))
+        result = CircularNeighbourhood.correlate_fft(data, kernel)
+        self.assertTrue(np.all(result >= 0.))
+        self.assertTrue(np.all(result <= np.sum(kernel)))
+
+
 class Test_run(IrisTest):
 
     """Test the run method on the CircularNeighbourhood class."""
@@ -337,6 +410,18 @@ class Test_run(IrisTest):
         self.assertIsInstance(cube, Cube)
         self.assertArrayAlmostEqual(result.data, data)
 
+    def test_fft_matches_direct(self):
+        """Test that the same result is produced using either correlation
+        method."""
+        cube = set_up_cube(
+            zero_point_indices=((0, 0, 7, 7), (0, 1, 3, 12)),
+            num_time_points=2, num_grid_points=16)
+        expected = CircularNeighbourhood(correlation_method="direct").run(
+            cube.copy(), self.RADIUS)
+        result = CircularNeighbourhood(correlation_method="fft").run(
+            cube.copy(), self.RADIUS)
+        self.assertArrayAlmostEqual(result.data, expected.data)
+
     def test_mask_cube(self):
         """Test that a NotImplementedError is raised, if a mask cube is passed
         in when using a circular neighbourhood, as this option is not
@@ -182,6 +182,22 @@ class Test_pad_and_unpad_cube(IrisTest):
         self.assertIsInstance(result, Cube)
         self.assertArrayAlmostEqual(result.data, expected)
 
+    def test_memory_limit(self):
+        """Test that the result is unchanged when the memory limit requires
+        each row to be processed separately."""
+        data = np.random.RandomState(0).rand(5, 5).astype(np.float32)
+        cube = self.cube[0, 0, :, :]
+        cube.data = data
+        kernel = np.array(
+            [[0., 1., 0.],
+             [1., 1., 1.],
+             [0., 1., 0.]])
+        expected = GeneratePercentilesFromACircularNeighbourhood(
+            ).pad_and_unpad_cube(cube, kernel)
+        result = GeneratePercentilesFromACircularNeighbourhood(
+            max_memory_mb=1.0e-6).pad_and_unpad_cube(cube, kernel)
+        self.assertArrayEqual(result.data, expected.data)
+
     def test_single_point_almost_edge(self):
         """Test behaviour for a non-zero grid cell quite near the edge."""
         cube = set_up_cube(
@@ -312,6 +328,28 @@ class Test_pad_and_unpad_cube(IrisTest):
         self.assertArrayAlmostEqual(result.data, expected)
 
 
+class Test__percentiles_over_windows(IrisTest):
+
+    """Test calculating percentiles over a window around each point."""
+
+    def test_basic(self):
+        """Test that the percentiles are calculated using only the points
+        within the kernel, and that the padding is removed."""
+        padded = np.arange(20.).reshape(4, 5)
+        in_kernel = np.array(
+            [[False, True, False],
+             [True, True, True],
+             [False, True, False]])
+        plugin = GeneratePercentilesFromACircularNeighbourhood(
+            percentiles=[0, 50, 100])
+        expected = np.array(
+            [[[1., 2., 3.], [6., 7., 8.]],
+             [[6., 7., 8.], [11., 12., 13.]],
+             [[11., 12., 13.], [16., 17., 18.]]])
+        result = plugin._percentiles_over_windows(padded, in_kernel)
+        self.assertArrayAlmostEqual(result, expected)
+
+
 class Test_run(IrisTest):
 
     """Test the run method within the plugin to calculate percentile values
@@ -277,6 +277,20 @@ class Test__init__(IrisTest):
             neighbourhood_method = CircularNeighbourhood()
             NBHood(neighbourhood_method, radii, lead_times=lead_times)
 
+    def test_invalid_workers(self):
+        """Test that an error is raised if fewer than one worker is
+        requested."""
+        msg = "The number of workers must be at least 1"
+        with self.assertRaisesRegex(ValueError, msg):
+            NBHood(CircularNeighbourhood(), 10000, workers=0)
+
+    def test_invalid_executor(self):
+        """Test that an error is raised for an unknown executor."""
+        msg = "The executor requested: nonsense is not a supported executor"
+        with self.assertRaisesRegex(ValueError, msg):
+            NBHood(CircularNeighbourhood(), 10000, workers=2,
+                   executor="nonsense")
+
 
 class Test__repr__(IrisTest):
 
@@ -342,6 +356,120 @@ class Test__find_radii(IrisTest):
         self.assertArrayAlmostEqual(result, expected_result)
 
 
+class Test__run_grouped_by_radius(IrisTest):
+
+    """Test the _run_grouped_by_radius method."""
+
+    def setUp(self):
+        """Set up a cube with multiple times."""
+        cube = set_up_cube(
+            zero_point_indices=((0, 0, 7, 7), (0, 1, 7, 7,), (0, 2, 7, 7)),
+            num_time_points=3)
+        iris.util.promote_aux_coord_to_dim_coord(cube, "time")
+        time_points = cube.coord("time").points
+        self.cube = add_forecast_reference_time_and_forecast_period(
+            cube, time_point=time_points, fp_point=[2, 3, 4])
+
+    def test_matches_individual_times(self):
+        """Test that grouping times with the same radius gives the same
+        results as processing each time separately."""
+        radii = [5600, 9500, 5600]
+        plugin = NBHood(CircularNeighbourhood(), radii, [2, 3, 4])
+        result = plugin._run_grouped_by_radius(self.cube)
+        for index, time_slice in enumerate(self.cube.slices_over("time")):
+            expected = CircularNeighbourhood().run(time_slice, radii[index])
+            self.assertArrayAlmostEqual(
+                result[:, index].data, expected.data)
+        self.assertEqual(result.coord("time"), self.cube.coord("time"))
+        self.assertEqual(result.coord("forecast_period"),
+                         self.cube.coord("forecast_period"))
+
+    def test_single_group(self):
+        """Test that a single call is made for radii that all correspond to
+        the same number of grid cells, and the result matches the use of a
+        fixed radius."""
+        plugin = NBHood(SquareNeighbourhood(), [6000, 6300], [2, 4])
+        result = plugin._run_grouped_by_radius(self.cube)
+        expected = SquareNeighbourhood().run(self.cube, 6000)
+        self.assertArrayAlmostEqual(result.data, expected.data)
+
+    def test_masked_group(self):
+        """Test that the output is masked if the results for any group
+        are masked."""
+        mask_cube = self.cube[0, 0].copy(
+            data=np.ones(self.cube.shape[-2:], dtype=np.float32))
+        mask_cube.data[0, 0] = 0
+        plugin = NBHood(
+            SquareNeighbourhood(re_mask=True), [2000, 6000], [2, 4])
+        result = plugin._run_grouped_by_radius(
+            self.cube, mask_cube=mask_cube)
+        self.assertIsInstance(result.data, np.ma.MaskedArray)
+        self.assertTrue(result.data.mask[..., 0, 0].all())
+        self.assertFalse(result.data.mask[..., 1, 1].any())
+
+
+class Test__run_in_parallel(IrisTest):
+
+    """Test the _run_in_parallel method."""
+
+    def setUp(self):
+        """Set up a cube with multiple realizations and times."""
+        self.cube = set_up_cube(
+            zero_point_indices=((0, 0, 7, 7), (1, 0, 3, 3), (2, 0, 10, 12)),
+            num_realization_points=3)
+
+    def test_matches_serial(self):
+        """Test that the result is identical to processing the cube with a
+        single worker."""
+        expected = NBHood(SquareNeighbourhood(), 6000).process(self.cube)
+        result = NBHood(
+            SquareNeighbourhood(), 6000, workers=2)._run_in_parallel(
+                self.cube)
+        self.assertArrayEqual(result.data, expected.data)
+        self.assertEqual(result.coord("realization"),
+                         self.cube.coord("realization"))
+
+    def test_process_executor(self):
+        """Test that the result is identical to processing the cube with a
+        single worker when using processes."""
+        expected = NBHood(SquareNeighbourhood(), 6000).process(self.cube)
+        result = NBHood(
+            SquareNeighbourhood(), 6000, workers=2,
+            executor="process")._run_in_parallel(self.cube)
+        self.assertArrayEqual(result.data, expected.data)
+
+    def test_more_workers_than_points(self):
+        """Test that requesting more workers than there are realizations
+        gives the same result as a single worker."""
+        expected = NBHood(CircularNeighbourhood(), 6000).process(self.cube)
+        result = NBHood(
+            CircularNeighbourhood(), 6000, workers=8)._run_in_parallel(
+                self.cube)
+        self.assertArrayAlmostEqual(result.data, expected.data)
+
+    def test_no_leading_dimension(self):
+        """Test that a cube with only x and y dimensions is processed
+        without being divided."""
+        cube = self.cube[0, 0]
+        expected = NBHood(SquareNeighbourhood(), 6000).process(cube)
+        result = NBHood(
+            SquareNeighbourhood(), 6000, workers=2)._run_in_parallel(cube)
+        self.assertArrayEqual(result.data, expected.data)
+
+    def test_mask_cube_with_realizations(self):
+        """Test that a mask cube with a realization dimension is divided
+        in the same way as the cube."""
+        mask_cube = self.cube.copy(
+            data=np.ones(self.cube.shape, dtype=np.float32))
+        mask_cube.data[1, 0, 2:5, 2:5] = 0
+        plugin = NBHood(SquareNeighbourhood(re_mask=True), 6000)
+        expected = plugin.process(self.cube, mask_cube=mask_cube)
+        plugin.workers = 3
+        result = plugin._run_in_parallel(self.cube, mask_cube=mask_cube)
+        self.assertArrayEqual(result.data, expected.data)
+        self.assertArrayEqual(result.data.mask, expected.data.mask)
+
+
 class Test_process(IrisTest):
 
     """Tests for the process method of NeighbourhoodProcessing."""
@@ -358,6 +486,12 @@ class Test_process(IrisTest):
         result = NBHood(neighbourhood_method, self.RADIUS).process(self.cube)
         self.assertIsInstance(result, Cube)
 
+    def test_input_cube_unchanged(self):
+        """Test that the data within the input cube is not modified."""
+        expected = self.cube.data.copy()
+        NBHood(CircularNeighbourhood(), self.RADIUS).process(self.cube)
+        self.assertArrayEqual(self.cube.data, expected)
+
     def test_neighbourhood_method_does_not_exist(self):
         """
         Test that desired error message is raised, if the neighbourhood method
@@ -506,6 +640,35 @@ class Test_process(IrisTest):
         result = plugin.process(cube)
         self.assertArrayAlmostEqual(result.data, expected)
 
+    def test_radii_varying_with_lead_time_non_contiguous_groups(self):
+        """
+        Test that the expected data is produced when the first and last
+        lead times require the same radius, so are processed together.
+        """
+        cube = set_up_cube(
+            zero_point_indices=((0, 0, 7, 7), (0, 1, 7, 7,), (0, 2, 7, 7)),
+            num_time_points=3)
+        expected = np.ones_like(cube.data)
+        for index in [0, 2]:
+            expected[0, index, 6:9, 6:9] = (
+                [0.91666667, 0.875, 0.91666667],
+                [0.875, 0.83333333, 0.875],
+                [0.91666667, 0.875, 0.91666667])
+        expected[0, 1, 5:10, 5:10] = SINGLE_POINT_RANGE_3_CENTROID
+
+        iris.util.promote_aux_coord_to_dim_coord(cube, "time")
+        time_points = cube.coord("time").points
+        fp_points = [2, 3, 4]
+        cube = add_forecast_reference_time_and_forecast_period(
+            cube, time_point=time_points, fp_point=fp_points)
+        radii = [5600, 7600, 5600]
+        lead_times = [2, 3, 4]
+        neighbourhood_method = CircularNeighbourhood()
+        plugin = NBHood(neighbourhood_method, radii, lead_times)
+        result = plugin.process(cube)
+        self.assertArrayAlmostEqual(result.data, expected)
+        self.assertEqual(result.coord("time"), cube.coord("time"))
+
     def test_radii_varying_with_lead_time_with_interpolation(self):
         """Test that a cube is returned for the following conditions:
         1. The radius varies with lead time.
@@ -242,6 +242,17 @@ class Test__recurse_forward(Test_RecursiveFilter):
         self.assertIsInstance(result, np.ndarray)
         self.assertArrayAlmostEqual(result, expected_result)
 
+    def test_leading_dimensions(self):
+        """Test that each slice of an array with leading dimensions is
+        filtered as if it had been filtered separately."""
+        grid = np.stack([self.cube.data[0], 2. * self.cube.data[0]])
+        expected_result = RecursiveFilter()._recurse_forward(
+            self.cube.data[0].copy(), self.alphas_cube.data, 1)
+        result = RecursiveFilter()._recurse_forward(
+            grid, self.alphas_cube.data, 2)
+        self.assertArrayAlmostEqual(result[0], expected_result)
+        self.assertArrayAlmostEqual(result[1], 2. * expected_result)
+
 
 class Test__recurse_backward(Test_RecursiveFilter):
 
@@ -396,6 +407,25 @@ class Test_process(Test_RecursiveFilter):
         expected = 0.11979733
         self.assertAlmostEqual(result.data[0][2][2], expected)
 
+    def test_multiple_slices(self):
+        """Test that each x-y slice of a cube with several slices is filtered
+        independently, and that the original coordinates are retained."""
+        cube = iris.cube.CubeList(
+            [self.cube, self.cube.copy(data=2. * self.cube.data)])
+        cube[1].coord("time").points = [402193.5]
+        cube = cube.concatenate_cube()
+        cube.data[1, 0, 0] = np.nan
+        plugin = RecursiveFilter(alpha_x=self.alpha_x, alpha_y=self.alpha_y,
+                                 iterations=self.iterations, re_mask=True)
+        expected = plugin.process(self.cube.copy())
+        result = plugin.process(cube)
+        self.assertArrayAlmostEqual(result.data[0], expected.data[0])
+        self.assertTrue(np.isnan(result.data.data[1, 0, 0]))
+        self.assertTrue(result.data.mask[1, 0, 0])
+        self.assertFalse(result.data.mask[0, 0, 0])
+        self.assertEqual(result.coord("latitude"), cube.coord("latitude"))
+        self.assertEqual(result.coord("time"), cube.coord("time"))
+
     def test_dimensions_of_output_array_is_as_expected(self):
         """Test that the RecursiveFilter plugin returns a data array with
            the correct dimensions"""
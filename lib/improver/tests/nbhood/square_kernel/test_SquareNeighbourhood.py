@@ -31,6 +31,7 @@
 """Unit tests for the nbhood.square_kernel.SquareNeighbourhood plugin."""
 
 
+import tracemalloc
 import unittest
 
 import iris
@@ -511,6 +512,44 @@ class Test_calculate_neighbourhood(IrisTest):
                                                           self.n_columns))
         self.assertArrayEqual(result, expected)
 
+    def test_compare_rolled_copies(self):
+        """Compare against calculating the neighbourhood totals from four
+        rolled copies of the flattened array. Check that the result is
+        identical and that the peak memory allocated is less than half of
+        that allocated using rolled copies."""
+
+        def rolled_neighbourhood(cube, disps, n_rows, n_columns):
+            """Calculate neighbourhood totals using rolled copies."""
+            flattened = cube.data.flatten()
+            rolled = [np.roll(flattened, -disp) for disp in disps]
+            total = rolled[0] - rolled[1] + rolled[2] - rolled[3]
+            total.resize(n_rows, n_columns)
+            return total
+
+        def measure(function, *args):
+            """Return the result and the peak memory allocated by a call to
+            the function."""
+            tracemalloc.start()
+            result = function(*args)
+            _, peak_memory = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            return result, peak_memory
+
+        n_rows = n_columns = 1000
+        cells = 5
+        cube = Cube(np.random.RandomState(0).rand(n_rows, n_columns))
+        disps = [(cells*n_columns) + cells,
+                 (-1*(cells+1)*n_columns) + cells,
+                 (-1*(cells+1)*n_columns) - cells - 1,
+                 (cells*n_columns) - cells - 1]
+        expected, rolled_memory = measure(
+            rolled_neighbourhood, cube, disps, n_rows, n_columns)
+        result, memory = measure(
+            SquareNeighbourhood.calculate_neighbourhood, cube, *disps,
+            n_rows, n_columns)
+        self.assertArrayEqual(result, expected)
+        self.assertLess(memory, 0.5 * rolled_memory)
+
 
 class Test_mean_over_neighbourhood(IrisTest):
 
@@ -693,6 +732,53 @@ class Test_set_up_cubes_to_be_neighbourhooded(IrisTest):
         self.assertArrayEqual(result_nan_array, expected_nans)
 
 
+class Test_set_up_arrays_to_be_neighbourhooded(IrisTest):
+
+    """Test the set up of arrays prior to neighbourhooding."""
+
+    def test_without_masked_data(self):
+        """Test setting up an array without masked data or NaNs."""
+        data = np.ones((2, 3, 3), dtype=np.float32)
+        result_data, mask, nan_array = (
+            SquareNeighbourhood.set_up_arrays_to_be_neighbourhooded(data))
+        self.assertArrayEqual(result_data, data)
+        self.assertEqual(result_data.dtype, np.float32)
+        self.assertArrayEqual(mask, np.ones((2, 3, 3)))
+        self.assertFalse(nan_array.any())
+
+    def test_with_masked_data_and_nans(self):
+        """Test that masked points and NaNs are set to zero in the data and
+        in the mask of the relevant slice only."""
+        data = np.ma.masked_array(np.ones((2, 3, 3)),
+                                  mask=np.zeros((2, 3, 3)))
+        data.mask[0, 0, 0] = True
+        data[1, 1, 1] = np.nan
+        result_data, mask, nan_array = (
+            SquareNeighbourhood.set_up_arrays_to_be_neighbourhooded(data))
+        self.assertNotIsInstance(result_data, np.ma.MaskedArray)
+        self.assertEqual(result_data[0, 0, 0], 0.)
+        self.assertEqual(result_data[1, 1, 1], 0.)
+        self.assertEqual(mask[0, 0, 0], 0.)
+        self.assertEqual(mask[1, 0, 0], 1.)
+        self.assertEqual(mask[1, 1, 1], 0.)
+        self.assertTrue(nan_array[1, 1, 1])
+
+    def test_with_mask_data(self):
+        """Test that a separate mask is applied to every slice and is not
+        modified."""
+        data = np.ones((2, 3, 3))
+        data[0, 2, 2] = np.nan
+        mask_data = np.ones((3, 3))
+        mask_data[0, 1] = 0.
+        result_data, mask, _ = (
+            SquareNeighbourhood.set_up_arrays_to_be_neighbourhooded(
+                data, mask_data))
+        self.assertArrayEqual(result_data[:, 0, 1], [0., 0.])
+        self.assertArrayEqual(mask[:, 0, 1], [0., 0.])
+        self.assertArrayEqual(mask[:, 2, 2], [0., 1.])
+        self.assertEqual(mask_data[2, 2], 1.)
+
+
 class Test__pad_and_calculate_neighbourhood(IrisTest):
 
     """Test the padding and calculation of neighbourhood processing."""
@@ -887,6 +973,83 @@ class Test__remove_padding_and_mask(IrisTest):
         self.assertArrayAlmostEqual(nbcube.data, expected)
 
 
+class Test__sum_over_neighbourhood(IrisTest):
+
+    """Test calculating the neighbourhood total using a summed-area table."""
+
+    def test_basic(self):
+        """Test that the neighbourhood total is correct for a 3x3
+        neighbourhood, including at the edges of the domain."""
+        data = np.ones((5, 5))
+        data[2, 2] = 0.
+        expected = np.array(
+            [[4., 6., 6., 6., 4.],
+             [6., 8., 8., 8., 6.],
+             [6., 8., 8., 8., 6.],
+             [6., 8., 8., 8., 6.],
+             [4., 6., 6., 6., 4.]])
+        result = SquareNeighbourhood._sum_over_neighbourhood(data, 1, 1)
+        self.assertArrayAlmostEqual(result, expected)
+
+    def test_different_widths(self):
+        """Test that different widths in the x and y directions are
+        handled."""
+        data = np.ones((4, 6))
+        expected = np.array(
+            [[12., 16., 20., 20., 16., 12.],
+             [12., 16., 20., 20., 16., 12.],
+             [12., 16., 20., 20., 16., 12.],
+             [12., 16., 20., 20., 16., 12.]])
+        result = SquareNeighbourhood._sum_over_neighbourhood(data, 2, 5)
+        self.assertArrayAlmostEqual(result, expected)
+
+    def test_leading_dimensions(self):
+        """Test that each x-y slice of an array with leading dimensions is
+        processed independently."""
+        data = np.ones((2, 3, 5, 5))
+        data[1, 2, 2, 2] = 0.
+        result = SquareNeighbourhood._sum_over_neighbourhood(data, 1, 1)
+        self.assertEqual(result.shape, data.shape)
+        self.assertAlmostEqual(result[0, 0, 2, 2], 9.)
+        self.assertAlmostEqual(result[1, 2, 2, 2], 8.)
+        self.assertAlmostEqual(result[1, 1, 2, 2], 9.)
+
+
+class Test__run_on_array(IrisTest):
+
+    """Test applying the square neighbourhood to an array."""
+
+    def test_matches_cube_slices(self):
+        """Test that processing several x-y slices at once gives the same
+        result as processing each slice separately."""
+        cube = set_up_cube(
+            zero_point_indices=((0, 0, 2, 2), (1, 1, 3, 1)),
+            num_time_points=2, num_grid_points=5, num_realization_points=2)
+        cube.data[0, 1, 0, 0] = np.nan
+        plugin = SquareNeighbourhood()
+        result = plugin._run_on_array(cube.data, None, 1, 1)
+        for index in np.ndindex(cube.shape[:2]):
+            expected = plugin._run_on_array(cube.data[index], None, 1, 1)
+            self.assertArrayAlmostEqual(result[index], expected)
+
+    def test_mask_data(self):
+        """Test that an external mask is applied to every x-y slice and that
+        masked points within the data only affect their own slice."""
+        data = np.ones((2, 5, 5))
+        data = np.ma.masked_array(data, mask=np.zeros(data.shape))
+        data.mask[1, 0, 0] = True
+        mask_data = np.ones((5, 5))
+        mask_data[4, 4] = 0.
+        result = SquareNeighbourhood(
+            sum_or_fraction="sum")._run_on_array(data, mask_data, 1, 1)
+        self.assertAlmostEqual(result.data[0, 0, 0], 4.)
+        self.assertAlmostEqual(result.data[1, 0, 0], 3.)
+        self.assertAlmostEqual(result.data[0, 4, 4], 3.)
+        self.assertAlmostEqual(result.data[1, 4, 4], 3.)
+        self.assertTrue(result.mask[1, 0, 0])
+        self.assertFalse(result.mask[0, 0, 0])
+
+
 class Test_run(IrisTest):
 
     """Test the run method on the SquareNeighbourhood class."""
@@ -1202,6 +1365,22 @@ class Test_run(IrisTest):
         self.assertArrayAlmostEqual(result.data[0, 0], expected_1)
         self.assertArrayAlmostEqual(result.data[0, 1], expected_2)
 
+    def test_multiple_realizations_with_mask_cube(self):
+        """Test that the run method produces the same result for each
+        realization when an external mask cube is supplied."""
+        cube = set_up_cube(
+            zero_point_indices=((0, 0, 2, 2), (1, 0, 2, 2)),
+            num_time_points=1, num_grid_points=5, num_realization_points=2)
+        mask_cube = cube[0, 0].copy()
+        mask_cube.data = np.ones((5, 5))
+        mask_cube.data[0, 0] = 0.
+        result = SquareNeighbourhood(re_mask=False).run(
+            cube, self.RADIUS, mask_cube=mask_cube)
+        self.assertArrayAlmostEqual(result.data[0], result.data[1])
+        self.assertAlmostEqual(result.data[0, 0, 1, 1], 0.875)
+        self.assertArrayEqual(mask_cube.data[0, 0], 0.)
+        self.assertArrayEqual(mask_cube.data[1:, 1:], 1.)
+
     def test_metadata(self):
         """Test that a cube with correct metadata is produced by the run
         method."""
@@ -96,52 +96,44 @@ class Test__repr__(IrisTest):
         self.assertEqual(result, '<AdvectField>')
 
 
-class Test__increment_output_array(IrisTest):
-    """Tests for the _increment_output_array method"""
+class Test__source_points(IrisTest):
+    """Tests for the _source_points method"""
 
     def setUp(self):
-        """Create input arrays"""
-        vel_x = set_up_xy_velocity_cube("advection_velocity_x")
-        vel_y = vel_x.copy(data=2.*np.ones(shape=(4, 3)))
-        self.dummy_plugin = AdvectField(vel_x, vel_y)
-
-        self.data = np.array([[2., 3., 4.],
-                              [1., 2., 3.],
-                              [0., 1., 2.],
-                              [0., 0., 1.]])
-        (self.xgrid, self.ygrid) = np.meshgrid(np.arange(3),
-                                               np.arange(4))
-
-    def test_basic(self):
-        """Test one increment from the points negative x-wards and positive
-        y-wards on the source grid, with different directional weightings"""
-        xsrc = np.array([[-1, 0, 1],
-                         [-1, 0, 1],
-                         [-1, 0, 1],
-                         [-1, 0, 1]])
-        ysrc = np.array([[1, 1, 1],
-                         [2, 2, 2],
-                         [3, 3, 3],
-                         [4, 4, 4]])
-        cond = np.array([[False, True, True],
-                         [False, True, True],
-                         [False, True, True],
-                         [False, False, False]])
-        xfrac = np.full((4, 3), 0.5)
-        yfrac = np.full((4, 3), 0.75)
-        outdata = np.zeros(shape=(4, 3))
-
-        expected_output = np.array([[0., 0.375, 0.750],
-                                    [0., 0.000, 0.375],
-                                    [0., 0.000, 0.000],
-                                    [0., 0.000, 0.000]])
-
-        self.dummy_plugin._increment_output_array(
-            self.data, outdata, cond, self.xgrid, self.ygrid,
-            xsrc, ysrc, xfrac, yfrac)
-
-        self.assertIsInstance(outdata, np.ndarray)
-        self.assertArrayAlmostEqual(outdata, expected_output)
+        """Set up dimensionless velocity arrays"""
+        self.grid_vel_x = np.full((4, 3), 0.5)
+        self.grid_vel_y = np.full((4, 3), 0.25)
+
+    def test_in_bounds(self):
+        """Test points are flagged where their source lies within the
+        field"""
+        expected = np.array([[False, False, False],
+                             [False, False, True],
+                             [False, False, True],
+                             [False, False, True]])
+        in_bounds, _ = AdvectField._source_points(
+            self.grid_vel_x, self.grid_vel_y, 4.)
+        self.assertArrayEqual(in_bounds, expected)
+
+    def test_sources(self):
+        """Test the indices and weights of the grid points surrounding a
+        fractional source location"""
+        _, sources = AdvectField._source_points(
+            self.grid_vel_x, self.grid_vel_y, 1.)
+        # The source of point [3, 2] is [2.75, 1.5]
+        indices = [index[3, 2] for index, _, _ in sources]
+        weights = [xwt[3, 2] * ywt[3, 2] for _, xwt, ywt in sources]
+        self.assertArrayEqual(indices, [7, 10, 8, 11])
+        self.assertArrayAlmostEqual(weights, [0.125, 0.375, 0.125, 0.375])
+
+    def test_sources_outside_field(self):
+        """Test surrounding grid points that lie outside of the field are
+        given an index beyond the end of the flattened field"""
+        _, sources = AdvectField._source_points(
+            -self.grid_vel_x, self.grid_vel_y, 1.)
+        # The source of point [3, 2] is [2.75, 2.5]
+        indices = [index[3, 2] for index, _, _ in sources]
+        self.assertArrayEqual(indices, [8, 11, 12, 12])
 
 
 class Test__advect_field(IrisTest):
@@ -203,6 +195,20 @@ class Test__advect_field(IrisTest):
         self.assertArrayAlmostEqual(result[~result.mask],
                                     expected_output[~result.mask])
 
+    def test_stacked_fields(self):
+        """Test a stack of fields is advected in one call, giving the same
+        result as advecting each field separately"""
+        stack = np.stack([self.data, 2.*self.data, self.data + 1.])
+        result = self.dummy_plugin._advect_field(
+            stack, self.grid_vel_x, 2.*self.grid_vel_y, 0.5)
+        self.assertEqual(result.shape, stack.shape)
+        for field, field_result in zip(stack, result):
+            expected = self.dummy_plugin._advect_field(
+                field, self.grid_vel_x, 2.*self.grid_vel_y, 0.5)
+            self.assertArrayEqual(field_result.mask, expected.mask)
+            self.assertArrayEqual(field_result[~expected.mask],
+                                  expected[~expected.mask])
+
     def test_masked_input(self):
         """Test masked data is correctly advected and remasked"""
         mask = np.array([[True, True, True],
@@ -354,5 +360,127 @@ class Test_process(IrisTest):
         self.assertEqual(lead_time[0], self.timestep.total_seconds())
 
 
+def set_up_sequence():
+    """Set up a plugin instance, a cube to advect and a list of time steps
+    for the sequence tests.
+
+    Returns:
+        (tuple): tuple containing:
+            **plugin** (AdvectField):
+                Plugin instance with uniform velocities.
+            **cube** (iris.cube.Cube):
+                Cube of rainfall rates with a scalar time coordinate.
+            **timesteps** (list of datetime.timedelta):
+                Time steps of 5 and 10 minutes.
+    """
+    vel_x = set_up_xy_velocity_cube("advection_velocity_x")
+    vel_y = vel_x.copy(data=2.*np.ones(shape=(4, 3)))
+    vel_y.rename("advection_velocity_y")
+    plugin = AdvectField(vel_x, vel_y)
+    data = np.array([[2., 3., 4.],
+                     [1., 2., 3.],
+                     [0., 1., 2.],
+                     [0., 0., 1.]])
+    cube = iris.cube.Cube(
+        data, standard_name='rainfall_rate', units='mm h-1',
+        dim_coords_and_dims=[(plugin.y_coord, 0), (plugin.x_coord, 1)])
+    cube.add_aux_coord(
+        DimCoord(1519099200, standard_name="time",
+                 units='seconds since 1970-01-01 00:00:00'))
+    timesteps = [datetime.timedelta(seconds=300),
+                 datetime.timedelta(seconds=600)]
+    return plugin, cube, timesteps
+
+
+class Test_iterate_sequence(IrisTest):
+    """Test a sequence of extrapolated cubes is generated"""
+
+    def setUp(self):
+        """Set up plugin instance and a cube to advect"""
+        self.plugin, self.cube, self.timesteps = set_up_sequence()
+
+    def test_matches_process(self):
+        """Test each cube matches the result of the process method"""
+        results = list(
+            self.plugin.iterate_sequence(self.cube, self.timesteps))
+        self.assertEqual(len(results), 2)
+        for result, timestep in zip(results, self.timesteps):
+            expected = self.plugin.process(self.cube, timestep)
+            self.assertEqual(result, expected)
+
+    def test_leading_dimension(self):
+        """Test fields stacked along a leading dimension are advected
+        together"""
+        realization = DimCoord([0, 1], standard_name="realization")
+        cube = iris.cube.CubeList(
+            [self.cube.copy(), self.cube.copy(data=2.*self.cube.data)])
+        for index, member in enumerate(cube):
+            member.add_aux_coord(realization[index])
+        cube = cube.merge_cube()
+        result, = self.plugin.iterate_sequence(cube, self.timesteps[1:])
+        self.assertEqual(result.shape, (2, 4, 3))
+        expected = self.plugin.process(cube[1], self.timesteps[1])
+        self.assertEqual(result[1], expected)
+
+    def test_raises_dimension_order_error(self):
+        """Test error is raised if x and y are not the last dimensions"""
+        cube = self.cube.copy()
+        cube.transpose()
+        msg = "must have spatial y and x as its last two dimensions"
+        with self.assertRaisesRegex(InvalidCubeError, msg):
+            next(self.plugin.iterate_sequence(cube, self.timesteps))
+
+    def test_raises_time_error(self):
+        """Test error is raised if the cube has no time coordinate"""
+        self.cube.remove_coord("time")
+        msg = "Input cube has no time coordinate"
+        with self.assertRaisesRegex(InvalidCubeError, msg):
+            next(self.plugin.iterate_sequence(self.cube, self.timesteps))
+
+
+class Test_extrapolate_sequence(IrisTest):
+    """Test a single cube with a time dimension is returned"""
+
+    def setUp(self):
+        """Set up plugin instance and a cube to advect"""
+        self.plugin, self.cube, self.timesteps = set_up_sequence()
+
+    def test_basic(self):
+        """Test the returned cube has a time dimension with a forecast_period
+        coordinate"""
+        result = self.plugin.extrapolate_sequence(self.cube, self.timesteps)
+        self.assertEqual(result.shape, (2, 4, 3))
+        self.assertEqual(result.coord_dims("time"), (0,))
+        self.assertArrayEqual(result.coord("forecast_period").points,
+                              [300, 600])
+        expected = self.plugin.process(self.cube, self.timesteps[1])
+        self.assertArrayEqual(result[1].data, expected.data)
+
+    def test_raises_unordered_timesteps(self):
+        """Test an error is raised if the time steps are not in increasing
+        order"""
+        timesteps = [self.timesteps[1], self.timesteps[0]]
+        msg = "Time steps must be unique and in increasing order"
+        with self.assertRaisesRegex(ValueError, msg):
+            self.plugin.extrapolate_sequence(self.cube, timesteps)
+
+    def test_raises_repeated_timesteps(self):
+        """Test an error is raised if a time step is repeated"""
+        timesteps = [self.timesteps[0], self.timesteps[1], self.timesteps[1]]
+        msg = "Time steps must be unique and in increasing order"
+        with self.assertRaisesRegex(ValueError, msg):
+            self.plugin.extrapolate_sequence(self.cube, timesteps)
+
+    def test_single_timestep(self):
+        """Test a time dimension is created for a single time step, with the
+        forecast_period coordinate along it"""
+        result = self.plugin.extrapolate_sequence(
+            self.cube, self.timesteps[:1])
+        self.assertEqual(result.shape, (1, 4, 3))
+        self.assertEqual(result.coord_dims("time"), (0,))
+        self.assertEqual(result.coord_dims("forecast_period"), (0,))
+        self.assertArrayEqual(result.coord("forecast_period").points, [300])
+
+
 if __name__ == '__main__':
     unittest.main()
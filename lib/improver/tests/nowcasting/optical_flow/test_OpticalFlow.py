@@ -228,6 +228,27 @@ class Test__make_subboxes(OpticalFlowUtilityTest):
         self.assertArrayAlmostEqual(weights, expected_weights)
 
 
+class Test__box_sum(OpticalFlowUtilityTest):
+    """Test _box_sum function"""
+
+    def test_values(self):
+        """Test the field is summed over each box, including the smaller
+        boxes at the edges of the field"""
+        expected_sums = np.array([[4., 12., 9.],
+                                  [0., 3., 3.]])
+        self.plugin.boxsize = 2
+        result = self.plugin._box_sum(self.plugin.data1)
+        self.assertArrayAlmostEqual(result, expected_sums)
+
+    def test_weights_match_subboxes(self):
+        """Test box weights match those calculated from the subboxes"""
+        self.plugin.boxsize = 2
+        _, expected_weights = self.plugin._make_subboxes(self.plugin.data1)
+        result = self.plugin._box_weights()
+        self.assertSequenceEqual(result.shape, (2, 3))
+        self.assertArrayAlmostEqual(result.flatten(), expected_weights)
+
+
 class OpticalFlowDisplacementTest(IrisTest):
     """Class with shared plugin definition for smoothing and regridding
     tests"""
@@ -377,6 +398,46 @@ class Test_solve_for_uv(IrisTest):
         self.assertAlmostEqual(v, 2.)
 
 
+class Test_solve_for_uv_on_boxes(IrisTest):
+    """Test solve_for_uv_on_boxes function"""
+
+    def setUp(self):
+        """Define input matrices for two boxes, the second of which is the
+        same as that used in the solve_for_uv tests"""
+        self.I_xy = np.array([[[1., 0.], [0., 1.]],
+                              [[2., 3.], [1., -2.]]])
+        self.I_t = np.array([[0.5, -1.5],
+                             [-8., 3.]])
+
+    def box_sums(self, I_xy, I_t):
+        """Calculate the sums over each box of the derivative products"""
+        I_x, I_y = I_xy[..., 0], I_xy[..., 1]
+        return [np.sum(I_x*I_x, axis=-1), np.sum(I_x*I_y, axis=-1),
+                np.sum(I_y*I_y, axis=-1), np.sum(I_x*I_t, axis=-1),
+                np.sum(I_y*I_t, axis=-1)]
+
+    def test_values(self):
+        """Test output values match those from solving each box
+        separately"""
+        umat, vmat = OpticalFlow().solve_for_uv_on_boxes(
+            *self.box_sums(self.I_xy, self.I_t))
+        self.assertArrayAlmostEqual(umat, [-0.5, 1.])
+        self.assertArrayAlmostEqual(vmat, [1.5, 2.])
+        for index in range(2):
+            u, v = OpticalFlow().solve_for_uv(
+                self.I_xy[index], self.I_t[index])
+            self.assertAlmostEqual(umat[index], u)
+            self.assertAlmostEqual(vmat[index], v)
+
+    def test_singular(self):
+        """Test displacements are zero for a box with a singular matrix"""
+        self.I_xy[0] = 0.
+        umat, vmat = OpticalFlow().solve_for_uv_on_boxes(
+            *self.box_sums(self.I_xy, self.I_t))
+        self.assertArrayAlmostEqual(umat, [0., 1.])
+        self.assertArrayAlmostEqual(vmat, [0., 2.])
+
+
 class Test_extreme_value_check(IrisTest):
     """Test extreme_value_check function"""
 
@@ -45,7 +45,7 @@ import numpy as np
 
 from improver.spotdata.common_functions import (
     ConditionalListExtract, nearest_n_neighbours,
-    node_edge_check, index_of_minimum_difference,
+    node_edge_check, nearest_n_neighbours_windows, index_of_minimum_difference,
     list_entry_from_index, construct_neighbour_hash,
     apply_bias, extract_ad_at_time)
 from improver.utilities.warnings_handler import ManageWarnings
@@ -379,6 +379,57 @@ class Test_node_edge_check(Test_common_functions):
         self.assertArrayEqual(expected, result)
 
 
+class Test_nearest_n_neighbours_windows(Test_common_functions):
+    """
+    Test the construction of arrays of neighbouring indices for several sites
+    at once, including the treatment of domain edges.
+
+    """
+
+    def setUp(self):
+        """Set up neighbours for a central site and an edgepoint site."""
+        super(Test_nearest_n_neighbours_windows, self).setUp()
+        self.neighbours = np.array(
+            [(5, 5, 0., False), (0, 0, 0., True)],
+            dtype=[('i', 'i8'), ('j', 'i8'), ('dz', 'f8'),
+                   ('edgepoint', 'bool_')])
+
+    def test_matches_node_lists(self):
+        """
+        Test that the valid indices for each site match those given by
+        nearest_n_neighbours and node_edge_check. The i (latitude) nodes < 0
+        about the edgepoint are invalid, whilst the j (longitude) nodes < 0
+        are wrapped around the global cylindrical grid.
+
+        """
+        i_nodes, j_nodes, valid = nearest_n_neighbours_windows(
+            self.neighbours, 9, self.cube)
+        self.assertEqual(i_nodes.shape, (2, 9))
+        self.assertArrayEqual(valid[0], np.ones(9, dtype=bool))
+        self.assertArrayEqual(valid[1], [False]*3 + [True]*6)
+        for i_site, (i, j, _, edgepoint) in enumerate(self.neighbours):
+            expected = nearest_n_neighbours(i, j, 9)
+            if edgepoint:
+                expected = node_edge_check(expected, self.cube)
+            result = [i_nodes[i_site][valid[i_site]].tolist(),
+                      j_nodes[i_site][valid[i_site]].tolist()]
+            self.assertArrayEqual(result, expected)
+
+    def test_invalid_indices(self):
+        """Test that invalid nodes are given the nearest neighbour indices,
+        so that the arrays may still be used for indexing."""
+        i_nodes, j_nodes, valid = nearest_n_neighbours_windows(
+            self.neighbours, 9, self.cube)
+        self.assertArrayEqual(i_nodes[1][~valid[1]], [0, 0, 0])
+        self.assertArrayEqual(j_nodes[1][~valid[1]], [0, 0, 0])
+
+    def test_invalid_no_neighbours(self):
+        """Test that an invalid no_neighbours raises an exception."""
+        msg = 'Invalid nearest no. of neighbours request.'
+        with self.assertRaisesRegex(ValueError, msg):
+            nearest_n_neighbours_windows(self.neighbours, 20, self.cube)
+
+
 class Test_index_of_minimum_difference(Test_common_functions):
     """
     Test ability to identify the index of a minimum value in an array,
@@ -418,6 +418,44 @@ class Test_orography_derived_temperature_lapse_rate(Test_setup):
         self.different_projection(self.method, self.ancillary_data, None,
                                   expected)
 
+    def test_multiple_sites(self):
+        """Test that the plugin returns the correct values for several sites
+        at once. The second site's neighbouring grid points all have the
+        same altitude, so the least-squares fit has no unique solution; the
+        minimum norm solution, T = 4, is used as by numpy.linalg.lstsq."""
+
+        self.sites.update(
+            {'200': {
+                'latitude': -71.05,
+                'longitude': -142.11,
+                'altitude': 10,
+                'utc_offset': 0,
+                'wmo_site': 0
+                }}
+            )
+        neighbour_list = np.empty(2, dtype=self.neighbour_list.dtype)
+        neighbour_list[0] = self.neighbour_list[0]
+        neighbour_list[1] = 2, 2, 0, False
+        self.neighbour_list = neighbour_list
+        expected = [[20.5, 4.]]
+        self.extracted_value(self.method, self.ancillary_data, None, expected)
+
+    def test_multiple_times(self):
+        """Test that the plugin returns the correct values for a cube with
+        several forecast times, with the fits for all times calculated at
+        once. The temperatures at the second time are 1K greater."""
+
+        later_cube = self.cube.copy(data=self.cube.data + 1)
+        later_cube.coord('time').points = (
+            self.cube.coord('time').points + 3600)
+        cube = iris.cube.CubeList([self.cube, later_cube]).concatenate_cube()
+        plugin = Plugin(self.method)
+        result = plugin.process(cube, self.sites, self.neighbour_list,
+                                self.ancillary_data, None)
+        self.assertArrayAlmostEqual(result.data, [[20.5], [21.5]])
+        self.assertArrayEqual(result.coord('forecast_period').points,
+                              [0, 3600])
+
     def test_missing_ancillary_data(self):
         """
         Test with missing ancillary data which is required for this method.
@@ -41,7 +41,7 @@ from iris.tests import IrisTest
 from iris.cube import Cube
 
 from improver.spotdata.main import run_spotdata as Function
-from improver.spotdata.main import process_diagnostic
+from improver.spotdata.main import process_diagnostic, iterate_diagnostics
 
 
 class Test_main(IrisTest):
@@ -143,7 +143,7 @@ class Test_run_spotdata(Test_main):
         """Test a typical run of the routine completes successfully
         when multiprocessing is enabled."""
         kwargs = {
-            'use_multiprocessing': False
+            'use_multiprocessing': True
             }
         result = Function(*self.args, **kwargs)
         self.assertEqual(len(result), 2)
@@ -151,6 +151,20 @@ class Test_run_spotdata(Test_main):
         self.assertEqual(result[0][0].name(), 'air_temperature')
         self.assertEqual(result[1][0], None)
 
+    def test_multiprocessing_several_diagnostics(self):
+        """Test that several diagnostics processed in parallel give the same
+        results, in the same order, as when they are processed serially."""
+        diagnostic = self.diagnostic_recipe['temperature'].copy()
+        diagnostic['interpolation_method'] = (
+            'orography_derived_temperature_lapse_rate')
+        self.diagnostic_recipe['lapse_rate_temperature'] = diagnostic
+        expected = Function(*self.args, **self.kwargs)
+        result = Function(*self.args, use_multiprocessing=True, n_workers=2)
+        self.assertEqual(len(result[0]), 2)
+        for result_cube, expected_cube in zip(result[0], expected[0]):
+            self.assertEqual(result_cube, expected_cube)
+        self.assertEqual(result[1], expected[1])
+
     def test_nominal_run_without_kwargs(self):
         """Test a typical run of the routine completes as intended.
         If there are no keyword arguments then the current time will be used
@@ -180,5 +194,50 @@ class Test_process_diagnostic(Test_main):
         self.assertEqual(result[1], None)
 
 
+class Test_iterate_diagnostics(Test_main):
+    """Test the iterate_diagnostics function."""
+
+    def setUp(self):
+        """Set up the neighbours of the site."""
+        super(Test_iterate_diagnostics, self).setUp()
+        self.neighbours = {
+            'fast_nearest_neighbour-None-False':
+                np.array([(15, 10, 9.0, False)],
+                         dtype=[('i', '<i8'), ('j', '<i8'),
+                                ('dz', '<f8'), ('edgepoint', '?')])}
+
+    def test_serial(self):
+        """Test that a single worker yields the result for each diagnostic
+        in turn."""
+        result = list(iterate_diagnostics(
+            self.diagnostic_recipe, self.neighbours, self.sites,
+            self.ancillary_data, n_workers=1))
+        self.assertEqual(len(result), 1)
+        self.assertEqual(result[0][0], 'temperature')
+        self.assertIsInstance(result[0][1][0], Cube)
+
+    def test_parallel(self):
+        """Test that the results from several workers match those found
+        serially."""
+        self.diagnostic_recipe['temperature_copy'] = (
+            self.diagnostic_recipe['temperature'])
+        args = (self.diagnostic_recipe, self.neighbours, self.sites,
+                self.ancillary_data)
+        expected = dict(iterate_diagnostics(*args, n_workers=1))
+        result = dict(iterate_diagnostics(*args, n_workers=2))
+        self.assertEqual(sorted(result.keys()), sorted(expected.keys()))
+        for key in expected:
+            self.assertEqual(result[key][0], expected[key][0])
+
+    def test_invalid_n_workers(self):
+        """Test that an exception is raised if fewer than one worker is
+        requested."""
+        msg = 'The number of workers must be at least 1'
+        with self.assertRaisesRegex(ValueError, msg):
+            list(iterate_diagnostics(
+                self.diagnostic_recipe, self.neighbours, self.sites,
+                self.ancillary_data, n_workers=0))
+
+
 if __name__ == '__main__':
     unittest.main()
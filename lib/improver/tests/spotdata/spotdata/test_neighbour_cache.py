@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# (C) British Crown Copyright 2017-2018 Met Office.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holder nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+"""Unit tests for the spotdata.NeighbourCache plugin."""
+
+import os
+import shutil
+from tempfile import mkdtemp
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from improver.spotdata.neighbour_cache import NeighbourCache as Plugin
+from improver.spotdata.neighbour_finding import PointSelection
+from improver.tests.spotdata.spotdata.test_neighbour_finding import (
+    Test_PointSelection)
+
+
+class Test_NeighbourCache(Test_PointSelection):
+
+    """Set up a cache directory and neighbour finding options."""
+
+    def setUp(self):
+        """Create a temporary cache directory, and the grid, sites and
+        ancillary data used for neighbour finding."""
+        super(Test_NeighbourCache, self).setUp()
+        self.directory = mkdtemp()
+        self.cache_dir = os.path.join(self.directory, 'cache')
+        self.neighbour_finding = {'method': 'fast_nearest_neighbour',
+                                  'vertical_bias': None,
+                                  'land_constraint': False}
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        shutil.rmtree(self.directory)
+
+    def cache_key(self, neighbour_finding=None, no_neighbours=None):
+        """Return the cache key for the current inputs."""
+        if neighbour_finding is None:
+            neighbour_finding = self.neighbour_finding
+        return Plugin.cache_key(self.cube, self.sites, self.ancillary_data,
+                                neighbour_finding,
+                                no_neighbours=no_neighbours)
+
+
+class Test__repr__(Test_NeighbourCache):
+
+    """Test the repr method."""
+
+    def test_basic(self):
+        """Test that the __repr__ returns the expected string."""
+        result = str(Plugin(self.cache_dir))
+        msg = '<NeighbourCache: cache_dir: {}>'.format(self.cache_dir)
+        self.assertEqual(result, msg)
+
+
+class Test_cache_key(Test_NeighbourCache):
+
+    """Test the cache_key method."""
+
+    def test_unchanged_inputs(self):
+        """Test that the same key is returned for the same inputs, including
+        for copies of the cubes."""
+        expected = self.cache_key()
+        self.cube = self.cube.copy()
+        self.ancillary_data['orography'] = (
+            self.ancillary_data['orography'].copy())
+        self.assertEqual(self.cache_key(), expected)
+
+    def test_grid_changed(self):
+        """Test that the key changes if the grid coordinates change."""
+        expected = self.cache_key()
+        self.cube.coord('latitude').points = (
+            self.cube.coord('latitude').points + 0.1)
+        self.assertNotEqual(self.cache_key(), expected)
+
+    def test_orography_changed(self):
+        """Test that the key changes if the orography changes."""
+        expected = self.cache_key()
+        self.ancillary_data['orography'].data[10, 10] = 1.
+        self.assertNotEqual(self.cache_key(), expected)
+
+    def test_sites_changed(self):
+        """Test that the key changes if a site changes."""
+        expected = self.cache_key()
+        self.sites['100']['altitude'] = 20
+        self.assertNotEqual(self.cache_key(), expected)
+
+    def test_options_changed(self):
+        """Test that the key changes if the neighbour finding options or the
+        number of neighbours change."""
+        expected = self.cache_key()
+        neighbour_finding = {'method': 'minimum_height_error_neighbour',
+                             'vertical_bias': None,
+                             'land_constraint': False}
+        self.assertNotEqual(self.cache_key(neighbour_finding), expected)
+        self.assertNotEqual(self.cache_key(no_neighbours=25), expected)
+
+    def test_land_mask(self):
+        """Test that the land mask only changes the key if a land constraint
+        is used."""
+        land_neighbour_finding = {'method': 'minimum_height_error_neighbour',
+                                  'vertical_bias': None,
+                                  'land_constraint': True}
+        expected = self.cache_key()
+        expected_land = self.cache_key(land_neighbour_finding)
+        self.ancillary_data['land_mask'].data[10, 10] = 0.
+        self.assertEqual(self.cache_key(), expected)
+        self.assertNotEqual(self.cache_key(land_neighbour_finding),
+                            expected_land)
+
+
+class Test_process(Test_NeighbourCache):
+
+    """Test the process method."""
+
+    def test_neighbours_cached(self):
+        """Test that the neighbours are found and saved to the cache, and
+        that they are then loaded from the cache without being found
+        again."""
+        plugin = Plugin(self.cache_dir)
+        expected = PointSelection(**self.neighbour_finding).process(
+            self.cube, self.sites, self.ancillary_data)
+
+        result = plugin.process(self.cube, self.sites, self.ancillary_data,
+                                self.neighbour_finding)
+        self.assertArrayEqual(result, expected)
+        self.assertTrue(os.path.exists(plugin.filepath(self.cache_key())))
+
+        with patch.object(PointSelection, 'process') as mock_process:
+            result = plugin.process(self.cube, self.sites,
+                                    self.ancillary_data,
+                                    self.neighbour_finding)
+        self.assertEqual(mock_process.call_count, 0)
+        self.assertIsInstance(result, np.memmap)
+        self.assertEqual(result.dtype, expected.dtype)
+        self.assertArrayEqual(result, expected)
+
+    def test_default_neighbours_not_modified(self):
+        """Test that read-only default neighbours, as loaded from the cache,
+        can be used to find neighbours with another method, and are not
+        modified."""
+        plugin = Plugin(self.cache_dir)
+        self.ancillary_data['orography'].data[16, 10] = 10.
+        default_neighbours = plugin.process(
+            self.cube, self.sites, self.ancillary_data,
+            self.neighbour_finding)
+        default_neighbours = plugin.process(
+            self.cube, self.sites, self.ancillary_data,
+            self.neighbour_finding)
+        expected = np.array(default_neighbours)
+
+        neighbour_finding = {'method': 'minimum_height_error_neighbour',
+                             'vertical_bias': None,
+                             'land_constraint': False}
+        result = plugin.process(self.cube, self.sites, self.ancillary_data,
+                                neighbour_finding,
+                                default_neighbours=default_neighbours)
+        self.assertEqual(result['i'], 16)
+        self.assertEqual(result['dz'], 0.)
+        self.assertArrayEqual(default_neighbours, expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
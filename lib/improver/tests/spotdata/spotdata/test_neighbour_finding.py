@@ -181,6 +181,36 @@ class Test_fast_nearest_neighbour(Test_PointSelection):
         """
         self.without_ancillary_data(self.method)
 
+    def test_multiple_sites(self):
+        """
+        Nearest neighbouring grid points for several sites, found at once,
+        match those found using the iris nearest_neighbour_index method for
+        each site in turn.
+        """
+        self.ancillary_data['orography'].data = (
+            np.arange(400.).reshape(20, 20))
+        for site_id, (latitude, longitude) in enumerate(
+                [(-30., 100.), (89., -179.), (0., 0.), (-90., 180.)]):
+            self.sites.update({str(site_id): {'latitude': latitude,
+                                              'longitude': longitude,
+                                              'altitude': 10,
+                                              'gmtoffset': 0}})
+        plugin = Plugin(self.method)
+        result = plugin.process(self.cube, self.sites, self.ancillary_data)
+        self.assertEqual(len(result), 5)
+        for i_site, site in enumerate(self.sites.values()):
+            i_expected = self.cube.coord('latitude').nearest_neighbour_index(
+                site['latitude'])
+            j_expected = self.cube.coord('longitude').nearest_neighbour_index(
+                site['longitude'])
+            dz_expected = (site['altitude'] -
+                           self.ancillary_data['orography'].data[
+                               i_expected, j_expected])
+            self.assertEqual(result['i'][i_site], i_expected)
+            self.assertEqual(result['j'][i_site], j_expected)
+            self.assertEqual(result['dz'][i_site], dz_expected)
+            self.assertFalse(result['edgepoint'][i_site])
+
 
 class Test_minimum_height_error_neighbour_no_bias(Test_PointSelection):
     """
@@ -487,6 +517,36 @@ class Test_minimum_height_error_neighbour_land_no_bias(Test_PointSelection):
         self.ancillary_data['land_mask'].data[16, 10] = 0.
         self.correct_neighbour(self.method, 14, 10, 2., land_constraint=True)
 
+    def test_multiple_sites(self):
+        """
+        Neighbours for several sites, found at once, are each chosen as they
+        would be for that site alone. The first site must select a land
+        point, the second site has no land constraint applied to its
+        neighbours, and the third site is a sea point so is left unchanged.
+
+        """
+        for site_id, (latitude, longitude, altitude) in enumerate(
+                [(-50., 100., 20.), (0., -100., 5.)]):
+            self.sites.update({str(site_id): {'latitude': latitude,
+                                              'longitude': longitude,
+                                              'altitude': altitude,
+                                              'gmtoffset': 0}})
+        nearest = Plugin().process(self.cube, self.sites, self.ancillary_data)
+        (i_1, i_2), (j_1, j_2) = nearest['i'][1:], nearest['j'][1:]
+
+        self.ancillary_data['orography'].data[14, 10] = 9.
+        self.ancillary_data['orography'].data[16, 10] = 11.
+        self.ancillary_data['land_mask'].data[14, 10] = 0.
+        self.ancillary_data['orography'].data[i_1 + 1, j_1 - 1] = 20.
+        self.ancillary_data['orography'].data[i_2 - 1, j_2] = 5.
+        self.ancillary_data['land_mask'].data[i_2, j_2] = 0.
+
+        plugin = Plugin(self.method, land_constraint=True)
+        result = plugin.process(self.cube, self.sites, self.ancillary_data)
+        self.assertArrayEqual(result['i'], [16, i_1 + 1, i_2])
+        self.assertArrayEqual(result['j'], [10, j_1 - 1, j_2])
+        self.assertArrayEqual(result['dz'], [-1., 0., 5.])
+
 
 class Test_minimum_height_error_neighbour_land_bias_above(Test_PointSelection):
     """
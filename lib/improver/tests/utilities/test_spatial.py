@@ -46,7 +46,7 @@ from improver.utilities.spatial import (
     check_if_grid_is_equal_area, convert_distance_into_number_of_grid_cells,
     convert_number_of_grid_cells_into_distance,
     lat_lon_determine, lat_lon_transform, transform_grid_to_lat_lon,
-    get_nearest_coords)
+    get_nearest_coords, nearest_neighbour_indices)
 from improver.tests.spotdata.spotdata.test_common_functions import (
     Test_common_functions)
 
@@ -286,6 +286,25 @@ class Test_lat_lon_transform(Test_common_functions):
         self.assertAlmostEqual(expected_x, result_x)
         self.assertAlmostEqual(expected_y, result_y)
 
+    def test_projection_transform_arrays(self):
+        """
+        Test transformation of arrays of lookup coordinates gives the same
+        results as transforming each coordinate pair in turn.
+
+        """
+        trg_crs = ccrs.LambertConformal(central_longitude=50,
+                                        central_latitude=10)
+        latitudes = np.array([10., 20., -5.])
+        longitudes = np.array([50., 45., 60.])
+
+        result_x, result_y = lat_lon_transform(trg_crs, latitudes, longitudes)
+        for index, (latitude, longitude) in enumerate(
+                zip(latitudes, longitudes)):
+            expected_x, expected_y = lat_lon_transform(
+                trg_crs, latitude, longitude)
+            self.assertAlmostEqual(expected_x, result_x[index])
+            self.assertAlmostEqual(expected_y, result_y[index])
+
 
 class Test_transform_grid_to_lat_lon(IrisTest):
     """
@@ -330,6 +349,112 @@ class Test_get_nearest_coords(Test_common_functions):
                         'latitude', 'longitude')
         self.assertEqual(expected, result)
 
+    def test_nearest_coords_arrays(self):
+        """Test correct indices are returned for arrays of coordinates."""
+        longitudes = np.array([80, -10, 175])
+        latitudes = np.array([-25, 0, 60])
+        expected_i = [self.cube.coord('latitude').nearest_neighbour_index(
+            latitude) for latitude in latitudes]
+        expected_j = [self.cube.coord('longitude').nearest_neighbour_index(
+            longitude) for longitude in longitudes]
+        result_i, result_j = get_nearest_coords(
+            self.cube, latitudes, longitudes, 'latitude', 'longitude')
+        self.assertArrayEqual(result_i, expected_i)
+        self.assertArrayEqual(result_j, expected_j)
+
+
+class Test_nearest_neighbour_indices(IrisTest):
+    """Test the vectorised equivalent of
+    iris.coords.Coord.nearest_neighbour_index."""
+
+    def setUp(self):
+        """Set up values to look up, including values beyond the coordinate
+        points and values half way between points."""
+        self.values = np.array([-200., -180., -170., -9., 0., 9., 10., 40.,
+                                175., 180., 185., 360.])
+
+    def assert_matches_iris(self, coord):
+        """Check the indices returned match nearest_neighbour_index."""
+        expected = [coord.nearest_neighbour_index(value)
+                    for value in self.values]
+        result = nearest_neighbour_indices(coord, self.values)
+        self.assertArrayEqual(result, expected)
+
+    def test_points(self):
+        """Test a coordinate without bounds."""
+        coord = DimCoord(np.linspace(-180, 180, 20), 'longitude',
+                         units='degrees')
+        self.assert_matches_iris(coord)
+
+    def test_equally_close(self):
+        """Test that the lower point is returned for a value equally close
+        to two points."""
+        coord = DimCoord([0., 10., 20.], 'longitude', units='degrees')
+        result = nearest_neighbour_indices(coord, np.array([5., 15.]))
+        self.assertArrayEqual(result, [0, 1])
+
+    def test_descending_points(self):
+        """Test a coordinate with descending points."""
+        coord = DimCoord(np.linspace(180, -180, 20), 'longitude',
+                         units='degrees')
+        self.assert_matches_iris(coord)
+
+    def test_descending_equally_close(self):
+        """Test that the first occurring point is returned for a value
+        equally close to two points of a descending coordinate."""
+        coord = DimCoord([20., 10., 0.], 'longitude', units='degrees')
+        self.values = np.array([5., 15.])
+        self.assert_matches_iris(coord)
+        result = nearest_neighbour_indices(coord, self.values)
+        self.assertArrayEqual(result, [1, 0])
+
+    def test_descending_circular_equally_close(self):
+        """Test that ties are resolved as iris does for a descending circular
+        coordinate, including half way between the lowest point and the
+        highest point wrapped."""
+        coord = DimCoord(np.arange(340., -20., -20.), 'longitude',
+                         units='degrees', circular=True)
+        self.values = np.arange(-10., 370., 10.)
+        self.assert_matches_iris(coord)
+
+    def test_bounds(self):
+        """Test a coordinate with bounds."""
+        coord = DimCoord(np.linspace(-180, 180, 20), 'longitude',
+                         units='degrees')
+        coord.guess_bounds()
+        self.assert_matches_iris(coord)
+
+    def test_circular(self):
+        """Test a circular coordinate, where values near the top of the range
+        can be nearest to the lowest point."""
+        coord = DimCoord(np.arange(0., 360., 20.), 'longitude',
+                         units='degrees', circular=True)
+        self.assert_matches_iris(coord)
+        result = nearest_neighbour_indices(coord, np.array([355., -5.]))
+        self.assertArrayEqual(result, [0, 0])
+
+    def test_circular_equally_close(self):
+        """Test that ties are resolved as iris does for an ascending circular
+        coordinate."""
+        coord = DimCoord(np.arange(0., 360., 20.), 'longitude',
+                         units='degrees', circular=True)
+        self.values = np.arange(-10., 370., 10.)
+        self.assert_matches_iris(coord)
+
+    def test_scalar(self):
+        """Test that a single value returns a single index."""
+        coord = DimCoord([0., 10., 20.], 'longitude', units='degrees')
+        result = nearest_neighbour_indices(coord, 12.)
+        self.assertEqual(result, 1)
+
+    def test_fails_multidimensional(self):
+        """Test that an error is raised for a multi-dimensional
+        coordinate."""
+        coord = AuxCoord(np.zeros((2, 2)), 'longitude', units='degrees')
+        msg = 'one-dimensional coordinates'
+        with self.assertRaisesRegex(ValueError, msg):
+            nearest_neighbour_indices(coord, self.values)
+
 
 if __name__ == '__main__':
     unittest.main()
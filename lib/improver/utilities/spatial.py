@@ -436,23 +436,28 @@ def lat_lon_transform(trg_crs, latitude, longitude):
         trg_crs (cartopy.crs/None):
             Target coordinate system in cartopy format or None.
 
-        latitude (float):
-            Latitude coordinate.
+        latitude (float or np.array):
+            Latitude coordinate(s).
 
-        longitude (float):
-            Longitude coordinate.
+        longitude (float or np.array):
+            Longitude coordinate(s).
 
     Returns:
-        x, y (floats):
+        x, y (floats or np.arrays):
             Longitude and latitude transformed into the target coordinate
-            system.
+            system. Arrays of coordinates are transformed in a single call.
 
     """
     if trg_crs is None:
         return longitude, latitude
-    else:
+    elif np.ndim(latitude) == 0 and np.ndim(longitude) == 0:
         return trg_crs.transform_point(longitude, latitude,
                                        ccrs.PlateCarree())
+    else:
+        points = trg_crs.transform_points(
+            ccrs.PlateCarree(), np.asarray(longitude, dtype=float),
+            np.asarray(latitude, dtype=float))
+        return points[..., 0], points[..., 1]
 
 
 def transform_grid_to_lat_lon(cube):
@@ -494,24 +499,113 @@ def transform_grid_to_lat_lon(cube):
 
 def get_nearest_coords(cube, latitude, longitude, iname, jname):
     """
-    Uses the iris cube method nearest_neighbour_index to find the nearest grid
-    points to a given latitude-longitude position.
+    Uses the nearest_neighbour_indices function, equivalent to the iris
+    coordinate method nearest_neighbour_index, to find the nearest grid
+    points to given latitude-longitude positions.
 
     Args:
         cube (iris.cube.Cube):
             Cube containing a representative grid.
 
-        latitude/longitude (floats):
-            Latitude/longitude coordinates of spot data site of interest.
+        latitude/longitude (floats or np.arrays):
+            Latitude/longitude coordinates of spot data site(s) of interest.
 
         iname/jname (strings):
             Strings giving the names of the y/x coordinates to be searched.
 
     Returns:
-        i_latitude/j_latitude (int):
-            Grid coordinates of the nearest grid point to the spot data site.
+        i_latitude/j_latitude (int or np.array of ints):
+            Grid coordinates of the nearest grid point to the spot data
+            site(s).
 
     """
-    i_latitude = cube.coord(iname).nearest_neighbour_index(latitude)
-    j_longitude = cube.coord(jname).nearest_neighbour_index(longitude)
+    i_latitude = nearest_neighbour_indices(cube.coord(iname), latitude)
+    j_longitude = nearest_neighbour_indices(cube.coord(jname), longitude)
     return i_latitude, j_longitude
+
+
+def nearest_neighbour_indices(coord, values):
+    """
+    Find the index of the nearest point of a one-dimensional coordinate to
+    each of an array of values. This gives the same results as the iris
+    coordinate method nearest_neighbour_index, which handles a single
+    value, but searches the sorted coordinate for all values at once.
+
+    If the coordinate has bounds, these are made complete and
+    non-overlapping by moving adjacent bounds to their average, and the
+    first cell containing each value is returned. Otherwise the closest
+    point is returned, or the first if two are equally close. Values are
+    wrapped onto the range of circular coordinates.
+
+    Args:
+        coord (iris.coords.Coord):
+            One-dimensional coordinate to be searched.
+
+        values (float or np.array):
+            Values for which to find the nearest points of the coordinate.
+
+    Returns:
+        indices (int or np.array of ints):
+            Indices of the nearest points of the coordinate, with the same
+            shape as values.
+
+    Raises:
+        ValueError: If the coordinate is not one-dimensional.
+
+    """
+    if coord.ndim != 1:
+        msg = ('Nearest neighbour indices can only be found for '
+               'one-dimensional coordinates, {} has {} dimensions.'.format(
+                   coord.name(), coord.ndim))
+        raise ValueError(msg)
+
+    values = np.asarray(values, dtype=float)
+    points = coord.points
+    bounds = coord.bounds if coord.has_bounds() else np.array([])
+
+    circular = getattr(coord, 'circular', False)
+    if circular:
+        modulus = coord.units.modulus
+        origin = np.min(np.hstack((points, bounds.flatten())))
+        values = origin + (values - origin) % modulus
+
+    if coord.has_bounds():
+        # Sort the cells by their centres, and find the boundaries between
+        # adjacent cells. The first cell whose upper boundary is not below
+        # the value contains it.
+        sort_inds = np.argsort(np.mean(bounds, axis=1))
+        bounds = np.sort(bounds[sort_inds], axis=1)
+        boundaries = 0.5 * (bounds[:-1, 1] + bounds[1:, 0])
+        result_index = np.searchsorted(boundaries, values, side='left')
+    else:
+        sort_inds = np.argsort(points)
+        sorted_points = points[sort_inds]
+        # The position of each sorted point in the coordinate, used to pick
+        # the first occurring of two equally close points.
+        order = sort_inds
+        if circular:
+            # Add the lowest point, wrapped, so that values can be nearest
+            # to it from the top of the range. Like iris, the wrapped point
+            # comes last for an ascending coordinate and first for a
+            # descending one.
+            sorted_points = np.hstack(
+                (sorted_points, sorted_points[0] + modulus))
+            wrapped_order = len(points) if points[-1] >= points[0] else -1
+            order = np.hstack((order, wrapped_order))
+        if len(sorted_points) == 1:
+            result_index = np.zeros(values.shape, dtype=int)
+        else:
+            # The closest point is one of the two either side of the value.
+            # Take the first occurring of these if they are equally close.
+            upper_index = np.clip(np.searchsorted(sorted_points, values),
+                                  1, len(sorted_points) - 1)
+            lower_index = upper_index - 1
+            upper_distance = np.absolute(sorted_points[upper_index] - values)
+            lower_distance = np.absolute(values - sorted_points[lower_index])
+            use_upper = (
+                (upper_distance < lower_distance) |
+                ((upper_distance == lower_distance) &
+                 (order[upper_index] < order[lower_index])))
+            result_index = (np.where(use_upper, upper_index, lower_index) %
+                            len(points))
+    return sort_inds[result_index]
@@ -40,6 +40,8 @@ usage: improver-ensemble-calibration [-h] [--profile]
                                      [--num_realizations NUMBER_OF_REALIZATIONS]
                                      [--random_ordering]
                                      [--random_seed RANDOM_SEED]
+                                     [--calibration_state STATE_FILE]
+                                     [--window_length WINDOW_LENGTH]
                                      ENSEMBLE_CALIBRATION_METHOD
                                      UNITS_TO_CALIBRATE_IN DISTRIBUTION
                                      INPUT_FILE HISTORIC_DATA_FILE
@@ -101,6 +103,20 @@ optional arguments:
                         ensemble, or for splitting tied values within the raw
                         ensemble, so that the values from the input
                         percentiles can be ordered to match the raw ensemble.
+  --calibration_state STATE_FILE
+                        Optional path to a file holding the state of the
+                        calibration, i.e. the ensemble mean and variance of
+                        previous historic forecasts, the matching truth and
+                        the previous coefficients, for each forecast period.
+                        If used, the historic forecasts and truth provided are
+                        added to the state, so only the newest historic
+                        forecasts need to be provided. The file is created if
+                        it does not exist. Only the ensemble mean is supported
+                        as the predictor of the mean.
+  --window_length WINDOW_LENGTH
+                        Optional maximum number of training dates to hold in
+                        the calibration state for each forecast period.
+                        Default will be to hold all dates.
 __HELP__
   [[ "$output" == "$expected" ]]
 }
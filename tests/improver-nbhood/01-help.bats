@@ -43,7 +43,8 @@ usage: improver-nbhood [-h] [--profile] [--profile_file PROFILE_FILE]
                        [--input_filepath_alphas_x_cube ALPHAS_X_FILE]
                        [--input_filepath_alphas_y_cube ALPHAS_Y_FILE]
                        [--alpha_x ALPHA_X] [--alpha_y ALPHA_Y]
-                       [--iterations ITERATIONS]
+                       [--iterations ITERATIONS] [--workers WORKERS]
+                       [--executor {thread,process}]
                        NEIGHBOURHOOD_OUTPUT NEIGHBOURHOOD_SHAPE INPUT_FILE
                        OUTPUT_FILE
 
@@ -145,6 +146,14 @@ optional arguments:
   --iterations ITERATIONS
                         Number of times to apply the filter, default=1
                         (typically < 5)
+  --workers WORKERS     Number of workers used to process the realizations or
+                        thresholds within the input file concurrently,
+                        default=1. The output is identical to that from a
+                        single worker.
+  --executor {thread,process}
+                        The type of worker to use if more than one worker is
+                        requested. Threads share the input data in memory.
+                        "thread" is the default option.
 __HELP__
   [[ "$output" == "$expected" ]]
 }
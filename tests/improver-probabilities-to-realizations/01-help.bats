@@ -36,6 +36,9 @@
 usage: improver-probabilities-to-realizations [-h] [--profile]
                                               [--profile_file PROFILE_FILE]
                                               [--no-of-realizations NUMBER_OF_REALIZATIONS]
+                                              [--raw-forecast-filepath RAW_FORECAST_FILE]
+                                              [--random-seed RANDOM_SEED]
+                                              [--tile-size TILE_SIZE]
                                               INPUT_FILE OUTPUT_FILE
 
 Convert a dataset containing probabilities into one containing ensemble
@@ -56,6 +59,19 @@ optional arguments:
                         through an intermediate percentile representation.
                         These percentiles will be distributed regularly with
                         the aim of dividing into blocks of equal probability.
+  --raw-forecast-filepath RAW_FORECAST_FILE
+                        Optional path to a raw ensemble forecast NetCDF file.
+                        If given, the realizations are reordered to match the
+                        ranking of the raw ensemble, rather than rebadged from
+                        the percentiles.
+  --random-seed RANDOM_SEED
+                        Optional random seed used to split tied values within
+                        the raw ensemble when reordering.
+  --tile-size TILE_SIZE
+                        Optional number of grid points along each spatial axis
+                        of a tile. If given, the input is read, converted and
+                        written one spatial tile at a time, which limits the
+                        memory required for large domains.
 __HELP__
   [[ "$output" == "$expected" ]]
 }
@@ -41,6 +41,7 @@ usage: improver-spot-extract [-h] [--profile] [--profile_file PROFILE_FILE]
                              [--longitudes (-180,180) [(-180,180 ...]]
                              [--altitudes ALTITUDES [ALTITUDES ...]]
                              [--multiprocess]
+                             [--neighbour_cache_dir NEIGHBOUR_CACHE_DIR]
                              config_file_path data_path ancillary_path
                              output_path
 __TEXT__
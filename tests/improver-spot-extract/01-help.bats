@@ -40,7 +40,8 @@ usage: improver-spot-extract [-h] [--profile] [--profile_file PROFILE_FILE]
                              [--latitudes -90,90) [(-90,90) ...]]
                              [--longitudes (-180,180) [(-180,180 ...]]
                              [--altitudes ALTITUDES [ALTITUDES ...]]
-                             [--multiprocess]
+                             [--multiprocess] [--n_workers N_WORKERS]
+                             [--neighbour_cache_dir NEIGHBOUR_CACHE_DIR]
                              config_file_path data_path ancillary_path
                              output_path
 
@@ -79,6 +80,18 @@ optional arguments:
   --altitudes ALTITUDES [ALTITUDES ...]
                         List of altitudes of sites of interest.
   --multiprocess        Process diagnostics using multiprocessing.
+  --n_workers N_WORKERS
+                        The number of worker processes to use when processing
+                        diagnostics with --multiprocess. Each diagnostic is
+                        processed by a single worker. Defaults to the number
+                        of CPUs.
+  --neighbour_cache_dir NEIGHBOUR_CACHE_DIR
+                        Path to a directory in which to cache the grid point
+                        neighbours of the sites. Neighbours are loaded from
+                        the cache if the grid, orography, sites and neighbour
+                        finding options are unchanged, otherwise they are
+                        found and added to the cache. The cache can be built
+                        in advance using improver spot-neighbours.
 __HELP__
   [[ "$output" == "$expected" ]]
 }
@@ -0,0 +1,71 @@
+#!/usr/bin/env bats
+# -----------------------------------------------------------------------------
+# (C) British Crown Copyright 2017-2018 Met Office.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holder nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+@test "spot-neighbours -h" {
+  run improver spot-neighbours -h
+  [[ "$status" -eq 0 ]]
+  read -d '' expected <<'__HELP__' || true
+usage: improver-spot-neighbours [-h] [--profile] [--profile_file PROFILE_FILE]
+                                [--diagnostics DIAGNOSTICS [DIAGNOSTICS ...]]
+                                [--constants_path CONSTANTS_PATH]
+                                config_file_path ancillary_path site_path
+                                neighbour_cache_dir
+
+Find the grid point neighbours of SpotData sites for the neighbour finding
+methods used by the diagnostics configurations, and save them to a cache.
+Later runs of improver spot-extract with the same cache directory, grid,
+orography, sites and options load the cached neighbours instead of finding
+them.
+
+positional arguments:
+  config_file_path      Path to a json file defining the recipes for
+                        extracting diagnostics at SpotData sites from gridded
+                        data.
+  ancillary_path        Path to ancillary (time invariant) data files.
+  site_path             Path to site data file.
+  neighbour_cache_dir   Path to the directory in which to cache the
+                        neighbours.
+
+optional arguments:
+  -h, --help            show this help message and exit
+  --profile             Switch on profiling information.
+  --profile_file PROFILE_FILE
+                        Dump profiling info to a file. Implies --profile.
+  --diagnostics DIAGNOSTICS [DIAGNOSTICS ...]
+                        A list of diagnostics for which neighbours are to be
+                        found. If unset, all diagnostics defined in the
+                        config_file will be used; e.g. temperature wind_speed
+  --constants_path CONSTANTS_PATH
+                        Path to json file containing constants to use in
+                        SpotData methods.
+__HELP__
+  [[ "$output" == "$expected" ]]
+}